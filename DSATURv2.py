@@ -1,24 +1,27 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, Canvas
-import pandas as pd
-import numpy as np
 from collections import defaultdict
-import heapq
 import os
+import base64
+import time
 from datetime import datetime
 
-# Cố gắng import để vẽ đồ thị
-try:
-    import networkx as nx
-    import matplotlib.pyplot as plt
-    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-    HAS_GRAPH = True
-except:
-    HAS_GRAPH = False
+from enrollment_cache import EnrollmentCache
+from graph_view import HAS_GRAPH, LayoutCache, render_png
+from jobs import JobRunner
+from run_stats import STARTUP, RunStats, run_log_path
+from student_search import DebouncedSearch, StudentSearchIndex
+from table_writers import HAS_PARQUET
+from virtual_tree import VirtualTreeview
+from warmup import WarmUp
+from scheduler_engine import (load_enrollments, build_model, dsatur, improve_schedule,
+                              lower_bound, slot_loads, conflict_report, export_schedule,
+                              improve_counters)
 
 
 class ExamSchedulerPro:
     def __init__(self, root):
+        started = time.perf_counter()
         self.root = root
         self.root.title("🎓 Xếp Lịch Thi Thông Minh - DSatur Pro v3.0")
         self.root.geometry("1600x950")
@@ -26,12 +29,26 @@ class ExamSchedulerPro:
         self.root.state('zoomed')
 
         # Dữ liệu
-        self.data = None
+        self.model = None   # EnrollmentModel: MSSV / môn mã hoá int32, CSR (không giữ DataFrame)
+        self.n_rows = 0     # số dòng đăng ký đọc được
         self.subjects = []
         self.student_subjects = defaultdict(set)
         self.subject_students = defaultdict(set)
         self.conflict_graph = defaultdict(set)
+        self.shared_counts = {}  # (môn a, môn b) -> số SV chung
+        self.student_names = {}
+        self.student_row_range = {}  # MSSV -> (dòng đầu, dòng cuối) trong bảng lịch SV
+        self.search = DebouncedSearch(self.root, self.apply_search_result)
         self.schedule = {}
+        self.improve_stats = []  # thống kê từng worker của lần tối ưu gần nhất
+        self.lower_bound = 0     # cận dưới số ca = kích thước clique lớn nhất tìm được
+        self.capacity = 0        # số chỗ tối đa mỗi ca của lần xếp lịch gần nhất (0 = không giới hạn)
+        self.cache = EnrollmentCache()
+        self.run_stats = RunStats()  # thời gian / bộ đếm / bộ nhớ của file đang mở
+        self.layout_cache = LayoutCache()
+        self.graph_image = None
+        # Các bước nặng chạy ở thread nền, giao diện chỉ nhận tiến độ và kết quả
+        self.jobs = JobRunner(self.root, on_progress=self.show_progress, on_state=self.set_busy)
 
         # Màu sắc hiện đại & dễ thương
         self.colors = {
@@ -52,6 +69,11 @@ class ExamSchedulerPro:
 
         self.setup_styles()
         self.create_ui()
+        STARTUP['window'] = time.perf_counter() - started
+
+        # pandas / networkx / matplotlib chỉ import khi cần; nạp sẵn ở thread nền sau khi cửa sổ hiện
+        self.warm_up = WarmUp()
+        self.root.after_idle(self.warm_up.start)
 
     def setup_styles(self):
         style = ttk.Style()
@@ -150,6 +172,17 @@ class ExamSchedulerPro:
         run_frame = tk.Frame(left, bg=self.colors['card'])
         run_frame.pack(pady=30, padx=30, fill='x')
         
+        # Giới hạn số chỗ ngồi mỗi ca (0 = không giới hạn)
+        capacity_row = tk.Frame(run_frame, bg=self.colors['card'])
+        capacity_row.pack(fill='x', pady=(0, 10))
+        tk.Label(capacity_row,
+                text="🪑 Số chỗ / ca (0 = không giới hạn):",
+                bg=self.colors['card'],
+                font=('Segoe UI', 10)).pack(side='left')
+        self.capacity_var = tk.IntVar(value=0)
+        tk.Spinbox(capacity_row, from_=0, to=1000000, increment=100, textvariable=self.capacity_var,
+                   width=8, font=('Segoe UI', 10)).pack(side='left', padx=(5, 0))
+
         run_btn = tk.Button(run_frame,
                            text="🚀 CHẠY DSATUR",
                            command=self.run_dsatur,
@@ -164,6 +197,55 @@ class ExamSchedulerPro:
         run_btn.pack(fill='x')
         self._add_hover_effect(run_btn, self.colors['success'], self.colors['success_light'])
 
+        # Tối ưu thêm: giảm số ca trong thời gian cho phép
+        improve_row = tk.Frame(run_frame, bg=self.colors['card'])
+        improve_row.pack(fill='x', pady=(10, 0))
+        tk.Label(improve_row,
+                text="⏱️ Giây:",
+                bg=self.colors['card'],
+                font=('Segoe UI', 10)).pack(side='left')
+        self.improve_var = tk.IntVar(value=30)
+        tk.Spinbox(improve_row, from_=5, to=3600, increment=5, textvariable=self.improve_var,
+                   width=6, font=('Segoe UI', 10)).pack(side='left', padx=(5, 10))
+        improve_btn = tk.Button(improve_row,
+                               text="🔁 TỐI ƯU SỐ CA",
+                               command=self.run_improve,
+                               bg=self.colors['info'],
+                               fg='white',
+                               font=('Segoe UI', 10, 'bold'),
+                               relief='flat',
+                               cursor='hand2',
+                               activebackground=self.colors['primary_light'])
+        improve_btn.pack(side='left', fill='x', expand=True)
+        self._add_hover_effect(improve_btn, self.colors['info'], self.colors['primary_light'])
+
+        # Tiến độ tác vụ nền + nút huỷ
+        progress_frame = tk.Frame(left, bg=self.colors['card'])
+        progress_frame.pack(padx=30, fill='x')
+
+        self.progress_bar = ttk.Progressbar(progress_frame, mode='determinate', maximum=1.0)
+        self.progress_bar.pack(fill='x')
+
+        status_row = tk.Frame(progress_frame, bg=self.colors['card'])
+        status_row.pack(fill='x', pady=(5, 0))
+        self.status_label = tk.Label(status_row,
+                                     text="Sẵn sàng",
+                                     bg=self.colors['card'],
+                                     fg='#6b7280',
+                                     font=('Segoe UI', 9),
+                                     anchor='w')
+        self.status_label.pack(side='left', fill='x', expand=True)
+        self.cancel_btn = tk.Button(status_row,
+                                    text="✖ HỦY",
+                                    command=self.jobs.cancel,
+                                    bg=self.colors['danger'],
+                                    fg='white',
+                                    font=('Segoe UI', 9, 'bold'),
+                                    relief='flat',
+                                    cursor='hand2',
+                                    state='disabled')
+        self.cancel_btn.pack(side='right')
+
         # Thống kê
         stats_frame = self._create_card_frame(left, "📊 THỐNG KÊ")
         stats_frame.pack(fill='both', expand=True, padx=20, pady=10)
@@ -234,9 +316,9 @@ class ExamSchedulerPro:
         tree_frame2 = tk.Frame(tab2, bg='white')
         tree_frame2.pack(fill='both', expand=True, padx=15, pady=(0, 15))
         
-        self.tree_student = ttk.Treeview(tree_frame2,
-                                        columns=('MSSV', 'Tên', 'Ca', 'Môn'),
-                                        show='headings')
+        # Bảng ảo: chỉ tạo các dòng đang nhìn thấy, chịu được hàng trăm nghìn dòng
+        self.student_table = VirtualTreeview(tree_frame2, columns=('MSSV', 'Tên', 'Ca', 'Môn'))
+        self.tree_student = self.student_table.tree
         self.tree_student.heading('MSSV', text='🆔 MSSV')
         self.tree_student.heading('Tên', text='👤 Họ Tên')
         self.tree_student.heading('Ca', text='🎯 Ca Thi')
@@ -246,12 +328,7 @@ class ExamSchedulerPro:
         self.tree_student.column('Ca', width=100, anchor='center')
         self.tree_student.column('Môn', width=300)
         
-        scrollbar2 = ttk.Scrollbar(tree_frame2, orient='vertical',
-                                  command=self.tree_student.yview)
-        self.tree_student.configure(yscrollcommand=scrollbar2.set)
-        
-        self.tree_student.pack(side='left', fill='both', expand=True)
-        scrollbar2.pack(side='right', fill='y')
+        self.student_table.pack(fill='both', expand=True)
 
         # Tab 3: Đồ thị
         tab3 = self._create_tab(notebook, '🎨 Đồ Thị Xung Đột')
@@ -326,122 +403,96 @@ class ExamSchedulerPro:
         button.bind("<Enter>", on_enter)
         button.bind("<Leave>", on_leave)
 
+    def show_progress(self, name, fraction, message):
+        """Nhận tiến độ từ job nền (chạy trên thread Tk)"""
+        if fraction is None:
+            if self.progress_bar['mode'] != 'indeterminate':
+                self.progress_bar.config(mode='indeterminate')
+                self.progress_bar.start(15)
+        else:
+            if self.progress_bar['mode'] != 'determinate':
+                self.progress_bar.stop()
+                self.progress_bar.config(mode='determinate')
+            self.progress_bar['value'] = fraction
+        if message:
+            self.status_label.config(text=f"{name}: {message}")
+
+    def set_busy(self, busy):
+        self.cancel_btn.config(state='normal' if busy else 'disabled')
+        if not busy:
+            self.progress_bar.stop()
+            self.progress_bar.config(mode='determinate')
+            self.progress_bar['value'] = 0
+            self.status_label.config(text="Sẵn sàng")
+
+    def start_job(self, name, work, on_done, on_error=None):
+        """Gửi job cho thread nền; báo nếu đang có tác vụ khác chạy"""
+        if not self.jobs.submit(name, work, on_done, on_error or self.show_job_error):
+            messagebox.showwarning("⚠️ Cảnh báo", "Đang chạy tác vụ khác, vui lòng chờ hoặc bấm HỦY!")
+            return False
+        return True
+
+    def show_job_error(self, error):
+        messagebox.showerror("Lỗi", f"Chi tiết lỗi:\n{str(error)}")
+
     def load_file(self):
         path = filedialog.askopenfilename(filetypes=[("Excel files", "*.xlsx *.xls")])
         if not path:
             return
 
-        try:
-            all_dfs = []
-            excel = pd.ExcelFile(path, engine='openpyxl')
-            
-            for sheet in excel.sheet_names:
-                try:
-                    df = pd.read_excel(excel, sheet_name=sheet, header=None, dtype=str, engine='openpyxl')
-                    df = df.fillna('')
-                    
-                    header_row = None
-                    for idx in range(min(5, len(df))):
-                        row_text = ' '.join(df.iloc[idx].astype(str).str.lower().tolist())
-                        if 'mã sv' in row_text or 'mssv' in row_text or 'ma sv' in row_text:
-                            header_row = idx
-                            break
-                    
-                    if header_row is None:
-                        continue
-                    
-                    subject_name = sheet
-                    if header_row > 0:
-                        first_cell = str(df.iloc[0, 0]).strip()
-                        if first_cell and len(first_cell) > 0:
-                            subject_name = first_cell
-                    
-                    df.columns = df.iloc[header_row]
-                    df = df.iloc[header_row + 1:].reset_index(drop=True)
-                    
-                    masv_col = None
-                    hoten_col = None
-                    
-                    for col in df.columns:
-                        col_str = str(col).lower().strip()
-                        if 'mã sv' in col_str or 'mssv' in col_str or 'ma sv' in col_str:
-                            masv_col = col
-                        if 'họ' in col_str and 'tên' in col_str:
-                            hoten_col = col
-                        elif 'tên' in col_str and hoten_col is None:
-                            hoten_col = col
-                    
-                    if masv_col is None:
-                        continue
-                    
-                    if hoten_col:
-                        df_clean = df[[masv_col, hoten_col]].copy()
-                        df_clean.columns = ['MaSV', 'HoTen']
-                    else:
-                        df_clean = df[[masv_col]].copy()
-                        df_clean.columns = ['MaSV']
-                        df_clean['HoTen'] = 'N/A'
-                    
-                    df_clean['MaSV'] = df_clean['MaSV'].astype(str).str.strip()
-                    df_clean = df_clean.loc[df_clean['MaSV'].str.len() > 0].copy()
-                    
-                    mask_numeric = df_clean['MaSV'].str.match(r'^\d+$', na=False)
-                    df_clean = df_clean.loc[mask_numeric].copy()
-                    
-                    if len(df_clean) > 0:
-                        df_clean['ChuongTrinh'] = subject_name
-                        all_dfs.append(df_clean)
-                        print(f"✓ Đọc thành công sheet '{sheet}': {len(df_clean)} sinh viên")
-                
-                except Exception as e:
-                    print(f"Lỗi đọc sheet {sheet}: {str(e)}")
-                    continue
-            
-            if not all_dfs:
+        def work(job):
+            stats = RunStats()
+            stats.info['file'] = path
+            job.progress(0.0, "Đang đọc file...")
+            with stats.stage('load'):
+                data, n_sheets = load_enrollments(
+                    path, log=job.log, workers=None, cache=self.cache, sheet_rows=stats.sheet_rows,
+                    progress=lambda done, total: job.progress(done / total, f"Sheet {done}/{total}"),
+                    check=job.check)
+            if data is None:
+                return None
+            job.progress(None, "Đang xây dựng đồ thị xung đột...")
+            with stats.stage('process'):
+                model = build_model(data)
+            stats.info['model_mb'] = model.nbytes() / 2**20
+            return model, len(data), n_sheets, stats
+
+        def done(result):
+            if result is None:
                 messagebox.showerror("Lỗi", "Không tìm thấy dữ liệu hợp lệ!")
                 return
-            
-            self.data = pd.concat(all_dfs, ignore_index=True)
-            self.data.drop_duplicates(subset=['MaSV', 'ChuongTrinh'], inplace=True)
-            
+            model, self.n_rows, n_sheets, self.run_stats = result
+            self.schedule = {}
+
             self.file_label.config(
-                text=f"✅ ĐÃ TẢI: {os.path.basename(path)}\n📊 {len(self.data)} dòng • 📚 {self.data['ChuongTrinh'].nunique()} môn",
+                text=f"✅ ĐÃ TẢI: {os.path.basename(path)}\n📊 {self.n_rows} dòng • 📚 {len(model.subjects)} môn",
                 fg=self.colors['success'],
                 font=('Segoe UI', 10, 'bold')
             )
-            
+
+            self.process_data(model)
+
             messagebox.showinfo("🎉 Thành công!", 
                 f"Đã tải thành công!\n\n"
-                f"📄 {len(self.data):,} bản ghi\n"
-                f"📑 {len(excel.sheet_names)} sheet\n"
-                f"👥 {self.data['MaSV'].nunique()} sinh viên\n"
-                f"📚 {self.data['ChuongTrinh'].nunique()} môn học")
-            
-            self.process_data()
-
-        except Exception as e:
+                f"📄 {self.n_rows:,} bản ghi\n"
+                f"📑 {n_sheets} sheet\n"
+                f"👥 {len(self.student_subjects)} sinh viên\n"
+                f"📚 {len(self.subjects)} môn học")
+
+        def error(e):
             messagebox.showerror("Lỗi đọc file", f"Chi tiết lỗi:\n{str(e)}")
 
-    def process_data(self):
-        """Xử lý dữ liệu và xây dựng đồ thị xung đột"""
-        self.subjects = self.data['ChuongTrinh'].unique().tolist()
-        self.student_subjects.clear()
-        self.subject_students.clear()
-        self.conflict_graph.clear()
-
-        for _, row in self.data.iterrows():
-            sid = str(row['MaSV']).strip()
-            subj = row['ChuongTrinh']
-            self.student_subjects[sid].add(subj)
-            self.subject_students[subj].add(sid)
-
-        # Xây đồ thị xung đột - 2 môn xung đột nếu có sinh viên chung
-        for subs in self.student_subjects.values():
-            subs = list(subs)
-            for i in range(len(subs)):
-                for j in range(i+1, len(subs)):
-                    self.conflict_graph[subs[i]].add(subs[j])
-                    self.conflict_graph[subs[j]].add(subs[i])
+        self.start_job("Tải dữ liệu", work, done, error)
+
+    def process_data(self, model):
+        """Dùng mô hình đăng ký đã xây ở thread nền: các bảng tra là view trên mảng CSR"""
+        self.model = model
+        (self.subjects, self.student_subjects, self.subject_students,
+         self.conflict_graph, self.shared_counts) = model.graph()
+        self.student_names = model.name_index()  # MSSV -> họ tên
+        self.student_row_range = {}
+        self.student_table.set_rows([])
+        self.search.set_index(StudentSearchIndex(self.student_names))
 
         self.update_stats()
 
@@ -451,11 +502,26 @@ class ExamSchedulerPro:
         text += "═" * 40 + "\n\n"
         text += f"👥 Sinh viên:      {len(self.student_subjects):,}\n"
         text += f"📚 Môn học:        {len(self.subjects):,}\n"
-        text += f"⚠️ Xung đột:      {sum(len(v) for v in self.conflict_graph.values())//2:,} cạnh\n"
+        text += f"⚠️ Xung đột:      {len(self.shared_counts):,} cạnh\n"
         
         if self.schedule:
-            text += f"\n🎯 Số ca thi:      {max(self.schedule.values())}\n"
+            num_slots = max(self.schedule.values())
+            optimal = " ✓ tối ưu" if num_slots <= self.lower_bound else ""
+            text += f"\n🎯 Số ca thi:      {num_slots}  (cận dưới {self.lower_bound}{optimal})\n"
             text += f"✅ Đã xếp lịch:    {len(self.schedule)} môn"
+            if self.capacity:
+                sizes = {s: len(self.subject_students[s]) for s in self.schedule}
+                busiest = max(slot_loads(self.schedule, sizes).values())
+                text += f"\n🪑 Ca đông nhất:   {busiest:,} / {self.capacity:,} chỗ"
+
+        if self.improve_stats:
+            restarts = sum(s['restarts'] for s in self.improve_stats)
+            speed = sum(s['moves_per_s'] for s in self.improve_stats)
+            text += f"\n\n🔁 Tối ưu: {len(self.improve_stats)} worker, {restarts} lần khởi động lại"
+            text += f"\n   Tabu: {speed:,.0f} bước/giây"
+
+        if self.run_stats.stages:
+            text += "\n\n⏱️ ĐO ĐẠC\n" + self.run_stats.report()
         
         self.stats_text.delete(1.0, 'end')
         self.stats_text.insert('end', text)
@@ -463,55 +529,111 @@ class ExamSchedulerPro:
 
     def run_dsatur(self):
         """Chạy thuật toán DSatur để tô màu đồ thị - Đảm bảo không trùng ca"""
-        if self.data is None or self.data.empty or len(self.subjects) == 0:
+        if self.model is None or len(self.subjects) == 0:
             messagebox.showwarning("⚠️ Cảnh báo", "Chưa tải dữ liệu!")
             return
 
-        self.schedule.clear()
+        try:
+            capacity = max(0, int(self.capacity_var.get()))
+        except (tk.TclError, ValueError):
+            messagebox.showerror("Lỗi", "Số chỗ không hợp lệ!")
+            return
 
-        # DSatur Algorithm - Tối ưu bằng heap
-        degree = {s: len(self.conflict_graph[s]) for s in self.subjects}
-        saturation = {s: 0 for s in self.subjects}
-        color_of = {}
-        
-        # Heap: (-saturation, -degree, subject)
-        heap = [(-0, -degree[s], s) for s in self.subjects]
-        heapq.heapify(heap)
-        colored = set()
-
-        for _ in range(len(self.subjects)):
-            # Lấy node có saturation cao nhất (nếu bằng nhau thì lấy degree cao nhất)
-            while heap:
-                _, _, subj = heapq.heappop(heap)
-                if subj not in colored:
-                    break
-            
-            # Tìm màu nhỏ nhất chưa được dùng bởi các hàng xóm
-            used_colors = {color_of.get(neighbor) 
-                          for neighbor in self.conflict_graph[subj] 
-                          if neighbor in color_of}
-            
-            color = 1
-            while color in used_colors:
-                color += 1
-            
-            color_of[subj] = color
-            colored.add(subj)
-
-            # Cập nhật saturation của các hàng xóm chưa được tô
-            for neighbor in self.conflict_graph[subj]:
-                if neighbor not in colored:
-                    saturation[neighbor] += 1
-                    heapq.heappush(heap, (-saturation[neighbor], -degree[neighbor], neighbor))
+        subjects, conflict_graph = self.subjects, self.conflict_graph
+        student_subjects, subject_students = self.student_subjects, self.subject_students
+        sizes = {s: len(subject_students[s]) for s in subjects}
+        stats = self.run_stats
+
+        def work(job):
+            job.progress(None, "Đang tô màu đồ thị...")
+            counters = {} if stats.enabled else None
+            with stats.stage('dsatur'):
+                color_of = dsatur(subjects, conflict_graph, workers=None, sizes=sizes, capacity=capacity,
+                                  counters=counters)
+            if counters is not None:
+                stats.update(counters, 'dsatur.')
+            job.progress(None, "Đang tính cận dưới số ca...")
+            with stats.stage('bound'):
+                bound = lower_bound(subjects, conflict_graph, sizes=sizes, capacity=capacity, quick=True)[0]
+            job.progress(None, "Đang kiểm tra xung đột...")
+            with stats.stage('check'):
+                conflicts = conflict_report(student_subjects, subject_students, conflict_graph,
+                                            color_of, limit=50)
+            return color_of, conflicts, bound
+
+        def done(result):
+            color_of, conflicts, self.lower_bound = result
+            self.capacity = capacity
+            self.improve_stats = []
+            self.show_schedule((color_of, conflicts))
+
+        self.start_job("Xếp lịch", work, done)
+
+    def run_improve(self):
+        """Giảm số ca: DSatur ngẫu nhiên + tabu trên mọi nhân CPU, giữ lịch tốt nhất tìm được"""
+        if not self.schedule:
+            messagebox.showwarning("⚠️ Cảnh báo", "Chưa chạy thuật toán!")
+            return
+        try:
+            budget = max(1, int(self.improve_var.get()))
+        except (tk.TclError, ValueError):
+            messagebox.showerror("Lỗi", "Số giây không hợp lệ!")
+            return
 
+        subjects, conflict_graph, schedule = self.subjects, self.conflict_graph, dict(self.schedule)
+        student_subjects, subject_students = self.student_subjects, self.subject_students
+        before = max(schedule.values())
+        if before <= self.lower_bound:
+            messagebox.showinfo("✨ Đã tối ưu", f"Số ca ({before}) đã bằng cận dưới, không thể giảm thêm!")
+            return
+        if self.capacity:
+            messagebox.showinfo("ℹ️ Thông báo", "Tối ưu số ca chưa hỗ trợ giới hạn số chỗ mỗi ca!")
+            return
+
+        run_stats = self.run_stats
+
+        def work(job):
+            # Cận sau khi xếp lịch chỉ là clique tham lam: tìm clique lớn hơn trước khi tối ưu
+            job.progress(None, "Đang tính cận dưới số ca...")
+            with run_stats.stage('bound'):
+                full = lower_bound(subjects, conflict_graph)[0]
+            if before <= full:
+                color_of, stats = schedule, []
+            else:
+                start = time.time()
+                job.progress(0.0, f"Đang tối ưu ({before} ca)...")
+                # Bấm HỦY chỉ dừng sớm: vẫn giữ lịch tốt nhất đã tìm được
+                on_improve = lambda k, worker: job.progress(
+                    min(1.0, (time.time() - start) / budget), f"Tốt nhất: {k} ca (worker {worker})",
+                    check=False)
+                with run_stats.stage('improve'):
+                    color_of, stats = improve_schedule(subjects, conflict_graph, schedule, budget=budget,
+                                                       on_improve=on_improve,
+                                                       should_stop=lambda: job.cancelled, bound=full)
+                run_stats.update(improve_counters(stats), 'improve.')
+            job.progress(None, "Đang kiểm tra xung đột...", check=False)
+            conflicts = conflict_report(student_subjects, subject_students, conflict_graph,
+                                        color_of, limit=50)
+            return color_of, conflicts, stats, full
+
+        def done(result):
+            color_of, conflicts, self.improve_stats, self.lower_bound = result
+            self.show_schedule((color_of, conflicts))
+
+        self.start_job("Tối ưu", work, done)
+
+    def show_schedule(self, result):
+        """Áp dụng kết quả DSatur từ thread nền lên giao diện"""
+        color_of, conflicts = result
         self.schedule = color_of
         
         # Kiểm tra xung đột
-        conflict_found = self.check_conflicts()
+        conflict_found = self.check_conflicts(conflicts)
         
-        self.display_results()
-        self.draw_graph()
+        with self.run_stats.stage('display'):
+            self.display_results()
         self.update_stats()
+        self.draw_graph()
         
         if not conflict_found:
             messagebox.showinfo("🎉 HOÀN THÀNH!", 
@@ -528,8 +650,6 @@ class ExamSchedulerPro:
         # Xóa dữ liệu cũ
         for i in self.tree_schedule.get_children():
             self.tree_schedule.delete(i)
-        for i in self.tree_student.get_children():
-            self.tree_student.delete(i)
 
         # Hiển thị lịch thi theo ca - ĐÃ SẮP XẾP
         ca_dict = defaultdict(list)
@@ -548,61 +668,59 @@ class ExamSchedulerPro:
         self.tree_schedule.tag_configure('oddrow', background='white')
 
         # Hiển thị lịch sinh viên
+        self.student_table.set_rows(self.build_student_rows())
+        self.filter_students()
+
+    def build_student_rows(self):
+        """Tạo toàn bộ dòng (MSSV, tên, ca, môn) cho bảng ảo, nhớ khoảng dòng của từng SV"""
+        rows = []
+        self.student_row_range = {}
         for sid, subs in self.student_subjects.items():
-            name_df = self.data.loc[self.data['MaSV'] == sid, 'HoTen']
-            name = name_df.iloc[0] if len(name_df) > 0 else "N/A"
-            
+            name = self.student_names.get(sid, "N/A")
+            start = len(rows)
             for sub in sorted(subs):
                 ca = self.schedule.get(sub, "?")
-                self.tree_student.insert('', 'end', 
-                                        values=(sid, name, f'Ca {ca}', sub))
+                rows.append((sid, name, f'Ca {ca}', sub))
+            self.student_row_range[sid] = (start, len(rows))
+        return rows
 
     def filter_students(self, *args):
-        """Lọc sinh viên theo từ khóa"""
-        search = self.search_var.get().lower()
-        for i in self.tree_student.get_children():
-            self.tree_student.delete(i)
-        
-        for sid, subs in self.student_subjects.items():
-            name_df = self.data.loc[self.data['MaSV'] == sid, 'HoTen']
-            name = name_df.iloc[0] if len(name_df) > 0 else "N/A"
-            
-            if search in sid.lower() or search in name.lower():
-                for sub in sorted(subs):
-                    ca = self.schedule.get(sub, "?")
-                    self.tree_student.insert('', 'end', 
-                                            values=(sid, name, f'Ca {ca}', sub))
-
-    def check_conflicts(self):
-        """Kiểm tra xung đột - sinh viên có bị trùng ca không"""
+        """Lọc sinh viên theo từ khóa (tìm ở thread nền, có debounce)"""
+        if self.student_table.row_count() == 0 and self.student_subjects:
+            self.student_table.set_rows(self.build_student_rows())
+        self.search.request(self.search_var.get())
+
+    def apply_search_result(self, student_ids):
+        """Nhận kết quả tìm kiếm (list MSSV, None = tất cả) và lọc bảng lịch SV"""
+        if student_ids is None:
+            self.student_table.set_filter(None)
+            return
+        indices = []
+        for sid in student_ids:
+            start, end = self.student_row_range.get(sid, (0, 0))
+            indices.extend(range(start, end))
+        self.student_table.set_filter(indices)
+
+    def check_conflicts(self, report=None):
+        """Kiểm tra xung đột - sinh viên có bị trùng ca không (report: kết quả conflict_report đã có)"""
         self.warning_text.delete(1.0, 'end')
         conflicts = []
+        if report is None:
+            report = conflict_report(self.student_subjects, self.subject_students,
+                                     self.conflict_graph, self.schedule, limit=50)
+        found, total = report
         
-        for sid, subs in self.student_subjects.items():
-            cas = [self.schedule.get(s) for s in subs]
-            # Kiểm tra trùng ca
-            if len(cas) != len(set(cas)):
-                name_df = self.data.loc[self.data['MaSV'] == sid, 'HoTen']
-                name = name_df.iloc[0] if len(name_df) > 0 else "N/A"
-                
-                # Tìm các môn bị trùng
-                ca_dict = defaultdict(list)
-                for sub in subs:
-                    ca = self.schedule.get(sub)
-                    ca_dict[ca].append(sub)
-                
-                duplicate_info = []
-                for ca, subj_list in ca_dict.items():
-                    if len(subj_list) > 1:
-                        duplicate_info.append(f"  Ca {ca}: {', '.join(subj_list)}")
-                
-                conflicts.append(f"⚠️ {sid} - {name}\n" + "\n".join(duplicate_info))
+        for sid, ca_dict in found:
+            name = self.student_names.get(sid, "N/A")
+            duplicate_info = [f"  Ca {ca}: {', '.join(subj_list)}" for ca, subj_list in ca_dict.items()]
+            conflicts.append(f"⚠️ {sid} - {name}\n" + "\n".join(duplicate_info))
 
         if conflicts:
             self.warning_text.insert('1.0', 
                 "🚨 PHÁT HIỆN XUNG ĐỘT!\n" + 
+                f"Hiển thị {len(found)} / {total} sinh viên bị trùng ca\n" +
                 "═" * 50 + "\n\n" +
-                "\n\n".join(conflicts[:50]))
+                "\n\n".join(conflicts))
             self.warning_text.config(fg=self.colors['danger'])
             return True
         else:
@@ -618,136 +736,71 @@ class ExamSchedulerPro:
             return False
 
     def draw_graph(self):
-        """Vẽ đồ thị xung đột với màu sắc đẹp"""
+        """Vẽ đồ thị xung đột ở thread nền (layout được cache, đồ thị lớn vẽ dạng ma trận)"""
         if not HAS_GRAPH or not self.schedule:
             return
-        
-        for widget in self.graph_canvas.winfo_children():
-            widget.destroy()
 
-        G = nx.Graph()
-        G.add_nodes_from(self.subjects)
-        for u, vs in self.conflict_graph.items():
-            G.add_edges_from((u, v) for v in vs)
+        subjects, conflict_graph, schedule = self.subjects, self.conflict_graph, dict(self.schedule)
+        size = (max(self.graph_canvas.winfo_width(), 800), max(self.graph_canvas.winfo_height(), 600))
 
-        # Tạo figure với background đẹp
-        fig = plt.figure(figsize=(12, 9), facecolor='white')
-        ax = plt.gca()
-        ax.set_facecolor('#fafafa')
+        def work(job):
+            job.progress(None, "Đang vẽ đồ thị...")
+            return render_png(subjects, conflict_graph, schedule, size=size, cache=self.layout_cache)
 
-        # Layout đẹp hơn
-        if len(G.nodes()) < 20:
-            pos = nx.spring_layout(G, k=3, iterations=100, seed=42)
-        else:
-            pos = nx.spring_layout(G, k=2.5, iterations=80, seed=42)
-
-        # Màu sắc tươi sáng và đẹp mắt
-        colors_palette = [
-            '#7c3aed', '#ec4899', '#10b981', '#f59e0b', 
-            '#3b82f6', '#ef4444', '#8b5cf6', '#14b8a6',
-            '#f97316', '#06b6d4', '#84cc16', '#f43f5e',
-            '#6366f1', '#a855f7', '#22c55e', '#eab308'
-        ]
-        
-        node_colors = [colors_palette[(self.schedule.get(n, 1) - 1) % len(colors_palette)] 
-                      for n in G.nodes()]
-
-        # Vẽ edges với màu nhạt
-        nx.draw_networkx_edges(G, pos, 
-                              edge_color="#343453D5",
-                              width=2,
-                              alpha=0.4)
-
-        # Vẽ nodes với màu sắc đẹp
-        nx.draw_networkx_nodes(G, pos,
-                              node_color=node_colors,
-                              node_size=2000,
-                              alpha=1,
-                              edgecolors='gray',
-                              linewidths=1)
-
-        # Labels đẹp hơn
-        nx.draw_networkx_labels(G, pos,
-                               font_size=8,
-                               font_weight='bold',
-                               font_color='black',
-                               font_family='sans-serif')
-
-        plt.title("🎨 ĐỒ THỊ XUNG ĐỘT - MỖI MÀU = 1 CA THI",
-                 fontsize=18,
-                 fontweight='bold',
-                 pad=20,
-                 color="#000000")
-        
-        plt.axis('off')
-        plt.tight_layout()
+        self.start_job("Vẽ đồ thị", work, self.show_graph_image)
 
-        canvas = FigureCanvasTkAgg(fig, master=self.graph_canvas)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill='both', expand=True)
+    def show_graph_image(self, png):
+        """Hiển thị ảnh PNG đã vẽ xong lên tab Đồ thị"""
+        for widget in self.graph_canvas.winfo_children():
+            widget.destroy()
+        self.graph_image = tk.PhotoImage(data=base64.b64encode(png))  # giữ tham chiếu để ảnh không bị xoá
+        tk.Label(self.graph_canvas, image=self.graph_image, bg='white').pack(fill='both', expand=True)
 
     def export_all(self):
-        """Xuất file Excel với lịch thi đã sắp xếp"""
+        """Xuất lịch thi đã sắp xếp ra Excel (hoặc CSV / Parquet cho hệ thống khác)"""
         if not self.schedule:
             messagebox.showwarning("⚠️ Cảnh báo", "Chưa chạy thuật toán!")
             return
         
+        filetypes = [("Excel", "*.xlsx"), ("CSV (mỗi bảng 1 file)", "*.csv")]
+        if HAS_PARQUET:
+            filetypes.append(("Parquet (mỗi bảng 1 file)", "*.parquet"))
         path = filedialog.asksaveasfilename(
             defaultextension=".xlsx",
-            filetypes=[("Excel", "*.xlsx")],
+            filetypes=filetypes,
             initialfile=f"LichThi_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
         )
         if not path:
             return
         
-        try:
-            with pd.ExcelWriter(path, engine='openpyxl') as writer:
-                # Sheet 1: Lịch thi theo ca - ĐÃ SẮP XẾP
-                rows = []
-                for subj, ca in sorted(self.schedule.items(), key=lambda x: (x[1], x[0])):
-                    rows.append({
-                        "Ca thi": ca,
-                        "Môn học": subj,
-                        "Số SV": len(self.subject_students[subj])
-                    })
-                df_schedule = pd.DataFrame(rows)
-                df_schedule.to_excel(writer, sheet_name="LichThi", index=False)
-
-                # Sheet 2: Lịch sinh viên
-                sv_rows = []
-                for sid in sorted(self.student_subjects.keys()):
-                    subs = self.student_subjects[sid]
-                    name_df = self.data.loc[self.data['MaSV'] == sid, 'HoTen']
-                    name = name_df.iloc[0] if len(name_df) > 0 else "N/A"
-                    
-                    for s in sorted(subs):
-                        sv_rows.append({
-                            "MSSV": sid,
-                            "Họ tên": name,
-                            "Ca thi": self.schedule.get(s, ""),
-                            "Môn học": s
-                        })
-                df_student = pd.DataFrame(sv_rows)
-                df_student = df_student.sort_values(['MSSV', 'Ca thi'])
-                df_student.to_excel(writer, sheet_name="LichSinhVien", index=False)
-
-                # Sheet 3: Thống kê
-                stats_rows = [
-                    {"Chỉ số": "Tổng số môn học", "Giá trị": len(self.subjects)},
-                    {"Chỉ số": "Tổng số sinh viên", "Giá trị": len(self.student_subjects)},
-                    {"Chỉ số": "Số ca thi", "Giá trị": max(self.schedule.values())},
-                    {"Chỉ số": "Số xung đột", "Giá trị": sum(len(v) for v in self.conflict_graph.values())//2},
-                ]
-                pd.DataFrame(stats_rows).to_excel(writer, sheet_name="ThongKe", index=False)
-
+        args = (path, self.student_names, self.subjects, self.student_subjects,
+                self.subject_students, self.conflict_graph, dict(self.schedule))
+        stats = self.run_stats
+
+        def work(job):
+            job.progress(None, "Đang ghi file...")
+            with stats.stage('export'):
+                paths = export_schedule(*args)
+            stats.info['outputs'] = paths
+            stats.write_json(run_log_path(path))
+            return paths
+
+        def done(paths):
+            self.update_stats()
+            if len(paths) == 1:
+                detail = (f"📂 Vị trí: {os.path.basename(path)}\n"
+                          f"📊 3 sheet: LichThi, LichSinhVien, ThongKe")
+            else:
+                detail = "📂 Các file:\n" + "\n".join(f"   • {os.path.basename(p)}" for p in paths)
+            detail += f"\n📝 Log: {os.path.basename(run_log_path(path))}"
             messagebox.showinfo("🎉 Thành công!",
-                              f"✅ Đã xuất file thành công!\n\n"
-                              f"📂 Vị trí: {os.path.basename(path)}\n"
-                              f"📊 3 sheet: LichThi, LichSinhVien, ThongKe")
-        
-        except Exception as e:
+                              f"✅ Đã xuất file thành công!\n\n{detail}")
+
+        def error(e):
             messagebox.showerror("Lỗi", f"Không thể xuất file:\n{str(e)}")
 
+        self.start_job("Xuất file", work, done, error)
+
 
 if __name__ == "__main__":
     root = tk.Tk()
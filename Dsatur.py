@@ -1,38 +1,56 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import pandas as pd
 from collections import defaultdict
-import heapq
 import os
+import base64
+import time
 from datetime import datetime, timedelta
 
-# Cố gắng import để vẽ đồ thị
-try:
-    import networkx as nx
-    import matplotlib.pyplot as plt
-    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-    HAS_GRAPH = True
-except Exception:
-    HAS_GRAPH = False
+from day_planner import plan_days
+from enrollment_cache import EnrollmentCache
+from graph_view import HAS_GRAPH, LayoutCache, render_png
+from jobs import JobRunner
+from run_stats import STARTUP, RunStats, run_log_path
+from scheduler_engine import (build_model, conflict_report, dsatur, iter_student_rows, load_enrollments,
+                              lower_bound)
+from student_search import DebouncedSearch, StudentSearchIndex
+from table_writers import write_tables
+from virtual_tree import VirtualTreeview
+from warmup import WarmUp
 
 
 class ExamSchedulerPro:
     def __init__(self, root):
+        started = time.perf_counter()
         self.root = root
         self.root.title("Xếp Lịch Thi Thông Minh - DSatur Pro v2.1")
         # Khởi tạo kích thước an toàn (người dùng có thể resize)
         self.root.geometry("1200x800")
 
         # Dữ liệu
-        self.data = None
+        self.model = None   # EnrollmentModel: MSSV / môn mã hoá int32, CSR (không giữ DataFrame)
+        self.n_rows = 0     # số dòng đăng ký đọc được
         self.subjects = []
         self.student_subjects = defaultdict(set)
         self.subject_students = defaultdict(set)
         self.conflict_graph = defaultdict(set)
+        self.shared_counts = {}  # (môn a, môn b) -> số SV chung
+        self.student_names = {}
+        self.student_row_range = {}  # MSSV -> (dòng đầu, dòng cuối) trong bảng lịch SV
+        self.search = DebouncedSearch(self.root, self.apply_search_result)
         self.schedule = {}
-        self.schedule_by_day = {}  # Lưu lịch theo ngày
+        self.schedule_by_day = {}  # Lưu lịch theo ngày: {ngày: {ca trong ngày: [môn...]}}
+        self.slot_days = {}  # ca -> (chỉ số ngày, ca trong ngày) do day_planner sắp xếp
+        self.day_stats = {}
+        self.lower_bound = 0  # cận dưới số ca = kích thước clique lớn nhất tìm được
         self.max_exams_per_day = 3
         self.start_date = datetime.now()  # Ngày bắt đầu thi
+        self.run_stats = RunStats()  # thời gian / bộ đếm / bộ nhớ của file đang mở
+        self.cache = EnrollmentCache()  # dữ liệu đã đọc theo nội dung file (mở lại file cũ không cần đọc Excel)
+        self.layout_cache = LayoutCache()
+        self.graph_image = None
+        # Tải file / xếp lịch / xuất file chạy ở thread nền
+        self.jobs = JobRunner(self.root, on_progress=self.show_progress, on_state=self.set_busy)
 
         # Style hiện đại
         self.colors = {
@@ -48,6 +66,11 @@ class ExamSchedulerPro:
 
         self.setup_styles()
         self.create_ui()
+        STARTUP['window'] = time.perf_counter() - started
+
+        # pandas / networkx / matplotlib chỉ import khi cần; nạp sẵn ở thread nền sau khi cửa sổ hiện
+        self.warm_up = WarmUp()
+        self.root.after_idle(self.warm_up.start)
 
     def setup_styles(self):
         style = ttk.Style()
@@ -112,6 +135,19 @@ class ExamSchedulerPro:
                   bg=self.colors['success'], fg='white', font=('Segoe UI', 12, 'bold'),
                   relief='flat', padx=10, pady=10, cursor='hand2').pack(pady=18, padx=12, fill='x')
 
+        # Tiến độ tác vụ nền + nút huỷ
+        self.progress_bar = ttk.Progressbar(left, mode='determinate', maximum=1.0)
+        self.progress_bar.pack(fill='x', padx=12)
+        status_row = tk.Frame(left, bg=self.colors['card'])
+        status_row.pack(fill='x', padx=12, pady=(4, 0))
+        self.status_label = tk.Label(status_row, text="Sẵn sàng", bg=self.colors['card'], fg='gray',
+                                     font=('Segoe UI', 9), anchor='w')
+        self.status_label.pack(side='left', fill='x', expand=True)
+        self.cancel_btn = tk.Button(status_row, text="HỦY", command=self.jobs.cancel,
+                                    bg=self.colors['danger'], fg='white', font=('Segoe UI', 9, 'bold'),
+                                    relief='flat', cursor='hand2', state='disabled')
+        self.cancel_btn.pack(side='right')
+
         # Thống kê
         stats_frame = tk.LabelFrame(left, text="THỐNG KÊ", bg=self.colors['card'], fg=self.colors['dark'], font=('Segoe UI', 11, 'bold'))
         stats_frame.pack(fill='both', expand=True, padx=12, pady=8)
@@ -166,7 +202,9 @@ class ExamSchedulerPro:
         self.search_var = tk.StringVar()
         tk.Entry(search_frame, textvariable=self.search_var, width=40, font=('Segoe UI', 10)).pack(side='left', padx=6)
         self.search_var.trace('w', self.filter_students)
-        self.tree_student = ttk.Treeview(tab3, columns=('MSSV', 'Tên', 'Ngày', 'Ca', 'Môn'), show='headings')
+        # Bảng ảo: chỉ tạo các dòng đang nhìn thấy
+        self.student_table = VirtualTreeview(tab3, columns=('MSSV', 'Tên', 'Ngày', 'Ca', 'Môn'))
+        self.tree_student = self.student_table.tree
         self.tree_student.heading('MSSV', text='MSSV')
         self.tree_student.heading('Tên', text='Họ Tên')
         self.tree_student.heading('Ngày', text='Ngày Thi')
@@ -177,10 +215,7 @@ class ExamSchedulerPro:
         self.tree_student.column('Ngày', width=120)
         self.tree_student.column('Ca', width=80)
         self.tree_student.column('Môn', width=340)
-        scroll_student = ttk.Scrollbar(tab3, orient='vertical', command=self.tree_student.yview)
-        self.tree_student.pack(side='left', fill='both', expand=True, padx=8, pady=8)
-        scroll_student.pack(side='right', fill='y')
-        self.tree_student.configure(yscrollcommand=scroll_student.set)
+        self.student_table.pack(fill='both', expand=True, padx=8, pady=8)
 
         # Tab 4: Đồ thị
         tab4 = tk.Frame(notebook, bg='white')
@@ -198,135 +233,95 @@ class ExamSchedulerPro:
         self.warning_text = tk.Text(tab5, height=12, bg='#fff5f5', fg='red', font=('Segoe UI', 10))
         self.warning_text.pack(fill='both', expand=True, padx=8, pady=8)
 
+    def show_progress(self, name, fraction, message):
+        """Nhận tiến độ từ job nền (chạy trên thread Tk)"""
+        if fraction is None:
+            if self.progress_bar['mode'] != 'indeterminate':
+                self.progress_bar.config(mode='indeterminate')
+                self.progress_bar.start(15)
+        else:
+            if self.progress_bar['mode'] != 'determinate':
+                self.progress_bar.stop()
+                self.progress_bar.config(mode='determinate')
+            self.progress_bar['value'] = fraction
+        if message:
+            self.status_label.config(text=f"{name}: {message}")
+
+    def set_busy(self, busy):
+        self.cancel_btn.config(state='normal' if busy else 'disabled')
+        if not busy:
+            self.progress_bar.stop()
+            self.progress_bar.config(mode='determinate')
+            self.progress_bar['value'] = 0
+            self.status_label.config(text="Sẵn sàng")
+
+    def start_job(self, name, work, on_done, on_error):
+        """Gửi job cho thread nền; trả về False (và báo) nếu đang có tác vụ khác chạy"""
+        if not self.jobs.submit(name, work, on_done, on_error):
+            messagebox.showwarning("Cảnh báo", "Đang chạy tác vụ khác, vui lòng chờ hoặc bấm HỦY!")
+            return False
+        return True
+
+    def read_workbook(self, path, job, stats):
+        """Đọc tất cả sheet (song song, có cache) và dựng đồ thị (chạy ở thread nền)
+
+        Trả về (EnrollmentModel, số dòng đăng ký, số sheet) hoặc None.
+        """
+        with stats.stage('load'):
+            data, n_sheets = load_enrollments(
+                path, log=job.log, workers=None, cache=self.cache, sheet_rows=stats.sheet_rows,
+                progress=lambda done, total: job.progress(done / total, f"Sheet {done}/{total}"),
+                check=job.check)
+        if data is None:
+            return None
+
+        job.progress(None, "Đang xây dựng đồ thị xung đột...")
+        with stats.stage('process'):
+            model = build_model(data)
+        stats.info['model_mb'] = model.nbytes() / 2**20
+        return model, len(data), n_sheets
+
     def load_file(self):
         path = filedialog.askopenfilename(filetypes=[("Excel files", "*.xlsx *.xls")])
         if not path:
             return
 
-        try:
-            all_dfs = []
-            excel = pd.ExcelFile(path, engine='openpyxl')
-
-            for sheet in excel.sheet_names:
-                try:
-                    # Đọc toàn bộ sheet như string
-                    df = pd.read_excel(excel, sheet_name=sheet, header=None, dtype=str, engine='openpyxl')
-                    df = df.fillna('')
-
-                    # Tìm dòng header (chứa "Mã SV" hoặc "MSSV")
-                    header_row = None
-                    for idx in range(min(5, len(df))):  # Chỉ tìm trong 5 dòng đầu
-                        row_text = ' '.join(df.iloc[idx].astype(str).str.lower().tolist())
-                        if 'mã sv' in row_text or 'mssv' in row_text or 'ma sv' in row_text:
-                            header_row = idx
-                            break
-
-                    if header_row is None:
-                        # Nếu không tìm thấy header, thử đọc sheet như 1 cột danh sách MSSV
-                        # Giả sử sheet là danh sách MSSV dưới header mặc định
-                        df2 = pd.read_excel(excel, sheet_name=sheet, dtype=str, engine='openpyxl')
-                        if df2.shape[1] >= 1:
-                            col0 = df2.columns[0]
-                            tmp = df2[[col0]].dropna()
-                            tmp.columns = ['MaSV']
-                            tmp['HoTen'] = 'N/A'
-                            tmp['ChuongTrinh'] = sheet
-                            all_dfs.append(tmp)
-                            continue
-                        else:
-                            continue
-
-                    # Lấy tên môn học (dòng đầu tiên hoặc tên sheet)
-                    subject_name = sheet
-                    if header_row > 0:
-                        first_cell = str(df.iloc[0, 0]).strip()
-                        if len(first_cell) > 0:
-                            subject_name = first_cell
-
-                    # Đặt header
-                    df.columns = df.iloc[header_row]
-                    df = df.iloc[header_row + 1:].reset_index(drop=True)
-
-                    # Tìm cột Mã SV và Họ Tên
-                    masv_col = None
-                    hoten_col = None
-
-                    for col in df.columns:
-                        col_str = str(col).lower().strip()
-                        if 'mã sv' in col_str or 'mssv' in col_str or 'ma sv' in col_str or 'mssv' in col_str:
-                            masv_col = col
-                        if 'họ' in col_str and 'tên' in col_str:
-                            hoten_col = col
-                        elif 'tên' in col_str and hoten_col is None:
-                            hoten_col = col
-
-                    if masv_col is None:
-                        # Bỏ qua sheet nếu không có cột mã
-                        continue
-
-                    # Lọc dữ liệu
-                    if hoten_col:
-                        df_clean = df[[masv_col, hoten_col]].copy()
-                        df_clean.columns = ['MaSV', 'HoTen']
-                    else:
-                        df_clean = df[[masv_col]].copy()
-                        df_clean.columns = ['MaSV']
-                        df_clean['HoTen'] = 'N/A'
-
-                    df_clean['MaSV'] = df_clean['MaSV'].astype(str).str.strip()
-                    df_clean = df_clean.loc[df_clean['MaSV'].str.len() > 0].copy()
-                    mask_numeric = df_clean['MaSV'].str.match(r'^\d+$', na=False)
-                    df_clean = df_clean.loc[mask_numeric].copy()
-
-                    if len(df_clean) > 0:
-                        df_clean['ChuongTrinh'] = subject_name
-                        all_dfs.append(df_clean)
-
-                except Exception as e:
-                    print(f"Lỗi đọc sheet {sheet}: {e}")
-                    continue
-
-            if not all_dfs:
+        def done(result):
+            if result is None:
                 messagebox.showerror("Lỗi", "Không tìm thấy dữ liệu hợp lệ!\n\nKiểm tra:\n- File có cột 'Mã SV'\n- Có ít nhất 1 sinh viên")
                 return
 
-            self.data = pd.concat(all_dfs, ignore_index=True)
-            self.data.drop_duplicates(subset=['MaSV', 'ChuongTrinh'], inplace=True)
+            model, self.n_rows, n_sheets = result
+            self.run_stats = stats
+            self.schedule = {}
+            self.schedule_by_day = {}
+            self.slot_days, self.day_stats = {}, {}
 
             self.file_label.config(
-                text=f"ĐÃ TẢI: {os.path.basename(path)}\n{len(self.data)} dòng • {self.data['ChuongTrinh'].nunique()} môn",
+                text=f"ĐÃ TẢI: {os.path.basename(path)}\n{self.n_rows} dòng • {len(model.subjects)} môn",
                 fg='green'
             )
 
-            messagebox.showinfo("Thành công",
-                                f"Đã tải thành công!\n\n• {len(self.data):,} bản ghi\n• {len(excel.sheet_names)} sheet\n• {self.data['MaSV'].nunique()} sinh viên\n• {self.data['ChuongTrinh'].nunique()} môn học")
+            self.process_data(model)
 
-            self.process_data()
+            messagebox.showinfo("Thành công",
+                                f"Đã tải thành công!\n\n• {self.n_rows:,} bản ghi\n• {n_sheets} sheet\n• {len(self.student_subjects)} sinh viên\n• {len(self.subjects)} môn học")
 
-        except Exception as e:
+        def error(e):
             messagebox.showerror("Lỗi đọc file", f"Chi tiết lỗi:\n{str(e)}")
 
-    def process_data(self):
-        self.subjects = sorted(self.data['ChuongTrinh'].unique().tolist())
-        self.student_subjects.clear()
-        self.subject_students.clear()
-        self.conflict_graph.clear()
-
-        for _, row in self.data.iterrows():
-            sid = str(row['MaSV']).strip()
-            subj = row['ChuongTrinh']
-            self.student_subjects[sid].add(subj)
-            self.subject_students[subj].add(sid)
-
-        # Xây đồ thị xung đột
-        for subs in self.student_subjects.values():
-            subs = list(subs)
-            for i in range(len(subs)):
-                for j in range(i+1, len(subs)):
-                    a = subs[i]
-                    b = subs[j]
-                    self.conflict_graph[a].add(b)
-                    self.conflict_graph[b].add(a)
+        stats = RunStats()
+        stats.info['file'] = path
+        self.start_job("Tải dữ liệu", lambda job: self.read_workbook(path, job, stats), done, error)
+
+    def process_data(self, model):
+        self.model = model
+        (self.subjects, self.student_subjects, self.subject_students,
+         self.conflict_graph, self.shared_counts) = model.graph()
+        self.student_names = model.name_index()  # MSSV -> họ tên
+        self.student_row_range = {}
+        self.student_table.set_rows([])
+        self.search.set_index(StudentSearchIndex(self.student_names))
 
         self.update_stats()
 
@@ -335,7 +330,7 @@ class ExamSchedulerPro:
         text += f"{'='*40}\n"
         text += f"Sinh viên: {len(self.student_subjects):,}\n"
         text += f"Môn học: {len(self.subjects):,}\n"
-        text += f"Xung đột cạnh: {sum(len(v) for v in self.conflict_graph.values())//2:,}\n"
+        text += f"Xung đột cạnh: {len(self.shared_counts):,}\n"
 
         if self.schedule:
             total_slots = max(self.schedule.values())
@@ -343,66 +338,74 @@ class ExamSchedulerPro:
             text += f"\n{'='*40}\n"
             text += f"LỊCH THI\n"
             text += f"{'='*40}\n"
-            text += f"Tổng ca thi: {total_slots}\n"
+            optimal = ", tối ưu" if total_slots <= self.lower_bound else ""
+            text += f"Tổng ca thi: {total_slots} (cận dưới {self.lower_bound}{optimal})\n"
             text += f"Ca/ngày: {self.max_exams_per_day}\n"
             text += f"Tổng số ngày: {total_days}\n"
+            if self.day_stats:
+                before, after = self.day_stats['before_counts'], self.day_stats['after_counts']
+                text += f"Thi 2 môn cùng ngày: {before['same_day']:,} -> {after['same_day']:,} lượt\n"
+                text += f"Thi 2 ca liền nhau: {before['back_to_back']:,} -> {after['back_to_back']:,} lượt\n"
+                text += f"Thi 2 ngày liên tiếp: {before['next_day']:,} -> {after['next_day']:,} lượt\n"
+
+        if self.run_stats.stages:
+            text += f"\n{'='*40}\nĐO ĐẠC\n{'='*40}\n{self.run_stats.report()}\n"
 
         self.stats_text.delete(1.0, 'end')
         self.stats_text.insert('end', text)
 
     def run_dsatur(self):
-        if self.data is None or self.data.empty or len(self.subjects) == 0:
+        if self.model is None or len(self.subjects) == 0:
             messagebox.showwarning("Cảnh báo", "Chưa tải dữ liệu!")
             return
 
         # Lấy ngày bắt đầu
         try:
-            self.start_date = datetime(int(self.year_var.get()), int(self.month_var.get()), int(self.day_var.get()))
+            start_date = datetime(int(self.year_var.get()), int(self.month_var.get()), int(self.day_var.get()))
         except Exception:
             messagebox.showerror("Lỗi", "Ngày tháng không hợp lệ!")
             return
 
-        self.max_exams_per_day = int(self.max_var.get())
-        self.schedule.clear()
-        self.schedule_by_day.clear()
-
-        # DSatur algorithm
-        degree = {s: len(self.conflict_graph[s]) for s in self.subjects}
-        saturation = {s: 0 for s in self.subjects}
-        color_of = {}
-
-        # Build initial heap: use (-saturation, -degree, subject) so we pop highest sat then highest degree
-        heap = [(-saturation[s], -degree[s], s) for s in self.subjects]
-        heapq.heapify(heap)
-        colored = set()
-
-        while heap:
-            _, _, subj = heapq.heappop(heap)
-            if subj in colored:
-                continue
-            # choose smallest color not used by neighbors
-            used = {color_of.get(n) for n in self.conflict_graph[subj] if n in color_of}
-            c = 1
-            while c in used:
-                c += 1
-            color_of[subj] = c
-            colored.add(subj)
-
-            # update neighbors' saturation and push back
-            for nei in self.conflict_graph[subj]:
-                if nei not in colored:
-                    # recompute saturation as number of distinct colors in neighbors
-                    neigh_colors = {color_of.get(n) for n in self.conflict_graph[nei] if n in color_of}
-                    saturation[nei] = len(neigh_colors)
-                    heapq.heappush(heap, (-saturation[nei], -degree[nei], nei))
-
+        # Lịch / tham số cũ giữ nguyên tới khi job xong (job bị từ chối hoặc lỗi thì không mất gì)
+        subjects, conflict_graph, shared_counts = self.subjects, self.conflict_graph, self.shared_counts
+        per_day = int(self.max_var.get())
+        stats = self.run_stats
+
+        def work(job):
+            job.progress(None, "Đang tô màu đồ thị...")
+            counters = {} if stats.enabled else None
+            with stats.stage('dsatur'):
+                color_of = dsatur(subjects, conflict_graph, workers=None, counters=counters)
+            if counters is not None:
+                stats.update(counters, 'dsatur.')
+            job.progress(None, "Đang tính cận dưới số ca...")
+            with stats.stage('bound'):
+                bound = lower_bound(subjects, conflict_graph, quick=True)[0]
+            job.progress(None, "Đang xếp ca thi vào các ngày...")
+            with stats.stage('days'):
+                days = plan_days(color_of, shared_counts, per_day, should_stop=lambda: job.cancelled)
+            return color_of, bound, days
+
+        def error(e):
+            messagebox.showerror("Lỗi", f"Không thể xếp lịch:\n{str(e)}")
+
+        self.start_job("Xếp lịch", work, lambda result: self.show_schedule(result, start_date, per_day), error)
+
+    def show_schedule(self, result, start_date, per_day):
+        """Áp dụng kết quả DSatur từ thread nền lên giao diện (chỉ khi job thành công)"""
+        color_of, self.lower_bound, (self.slot_days, self.day_stats) = result
+        self.start_date = start_date
+        self.max_exams_per_day = per_day
         self.schedule = color_of
 
         # Tính toán lịch theo ngày
         self.calculate_schedule_by_day()
 
-        self.display_results()
-        self.check_conflicts()
+        with self.run_stats.stage('display'):
+            self.display_results()
+        with self.run_stats.stage('check'):
+            self.check_conflicts()
+        self.update_stats()
         self.draw_graph()
 
         total_days = (max(color_of.values()) + self.max_exams_per_day - 1) // self.max_exams_per_day
@@ -412,31 +415,33 @@ class ExamSchedulerPro:
                             f"• Số ca/ngày: {self.max_exams_per_day}\n"
                             f"• Tổng số ngày thi: {total_days}")
 
-    def calculate_schedule_by_day(self):
-        """Tính toán lịch thi theo ngày dựa trên số ca tối đa mỗi ngày"""
-        self.schedule_by_day.clear()
-
-        for subject, slot in self.schedule.items():
-            # Tính ngày thi (slot 1,2,3 = ngày 1, slot 4,5,6 = ngày 2,...)
+    def slot_date(self, slot):
+        """Ngày thi (dd/mm/yyyy) và ca trong ngày của 1 ca thi"""
+        if slot in self.slot_days:
+            day_index, session_in_day = self.slot_days[slot]
+        else:
+            # Chưa tối ưu: slot 1,2,3 = ngày 1, slot 4,5,6 = ngày 2,...
             day_index = (slot - 1) // self.max_exams_per_day
             session_in_day = ((slot - 1) % self.max_exams_per_day) + 1
+        exam_date = self.start_date + timedelta(days=day_index)
+        return exam_date.strftime("%d/%m/%Y"), session_in_day
 
-            exam_date = self.start_date + timedelta(days=day_index)
-            date_str = exam_date.strftime("%d/%m/%Y")
-
-            if date_str not in self.schedule_by_day:
-                self.schedule_by_day[date_str] = {}
+    def calculate_schedule_by_day(self):
+        """Tính toán lịch thi theo ngày dựa trên vị trí (ngày, ca) của từng ca thi"""
+        self.schedule_by_day.clear()
 
-            # In trường hợp nhiều môn rơi vào cùng ca trong ngày (hiếm nếu slot mapping trùng), sắp xếp bằng slot
-            self.schedule_by_day[date_str][session_in_day] = {
+        for subject, slot in self.schedule.items():
+            date_str, session_in_day = self.slot_date(slot)
+            # Các môn cùng ca thi chung 1 buổi: giữ cả list, không ghi đè nhau
+            self.schedule_by_day.setdefault(date_str, {}).setdefault(session_in_day, []).append({
                 'subject': subject,
                 'students': len(self.subject_students[subject]),
                 'slot': slot
-            }
+            })
 
     def display_results(self):
         # Xóa dữ liệu cũ
-        for tree in [self.tree_day, self.tree_schedule, self.tree_student]:
+        for tree in [self.tree_day, self.tree_schedule]:
             for i in tree.get_children():
                 tree.delete(i)
 
@@ -444,13 +449,13 @@ class ExamSchedulerPro:
         for date in sorted(self.schedule_by_day.keys(), key=lambda x: datetime.strptime(x, "%d/%m/%Y")):
             sessions = self.schedule_by_day[date]
             for session in sorted(sessions.keys()):
-                info = sessions[session]
-                self.tree_day.insert('', 'end', values=(
-                    date,
-                    f'Ca {session}',
-                    info['subject'],
-                    info['students']
-                ))
+                for info in sorted(sessions[session], key=lambda x: -x['students']):
+                    self.tree_day.insert('', 'end', values=(
+                        date,
+                        f'Ca {session}',
+                        info['subject'],
+                        info['students']
+                    ))
 
         # Tab 2: Lịch theo ca
         ca_dict = defaultdict(list)
@@ -461,9 +466,18 @@ class ExamSchedulerPro:
                 self.tree_schedule.insert('', 'end', values=(f'Ca {ca}', subj, count))
 
         # Tab 3: Lịch SV
+        self.student_table.set_rows(self.build_student_rows())
+        self.filter_students()
+
+        self.update_stats()
+
+    def build_student_rows(self):
+        """Tạo toàn bộ dòng (MSSV, tên, ngày, ca, môn) cho bảng ảo, nhớ khoảng dòng của từng SV"""
+        rows = []
+        self.student_row_range = {}
         for sid, subs in self.student_subjects.items():
-            name_df = self.data.loc[self.data['MaSV'] == sid, 'HoTen']
-            name = name_df.iloc[0] if len(name_df) > 0 else "N/A"
+            name = self.student_names.get(sid, "N/A")
+            start = len(rows)
 
             for sub in sorted(subs):
                 slot = self.schedule.get(sub, 0)
@@ -471,51 +485,41 @@ class ExamSchedulerPro:
                     date_str = ""
                     session_in_day = ""
                 else:
-                    day_index = (slot - 1) // self.max_exams_per_day
-                    session_in_day = ((slot - 1) % self.max_exams_per_day) + 1
-                    exam_date = self.start_date + timedelta(days=day_index)
-                    date_str = exam_date.strftime("%d/%m/%Y")
+                    date_str, session_in_day = self.slot_date(slot)
 
-                self.tree_student.insert('', 'end', values=(sid, name, date_str, f'Ca {session_in_day}', sub))
-
-        self.update_stats()
+                rows.append((sid, name, date_str, f'Ca {session_in_day}', sub))
+            self.student_row_range[sid] = (start, len(rows))
+        return rows
 
     def filter_students(self, *args):
-        search = self.search_var.get().lower()
-        for i in self.tree_student.get_children():
-            self.tree_student.delete(i)
-
-        for sid, subs in self.student_subjects.items():
-            name_df = self.data.loc[self.data['MaSV'] == sid, 'HoTen']
-            name = name_df.iloc[0] if len(name_df) > 0 else "N/A"
-
-            if search in sid.lower() or search in name.lower():
-                for sub in sorted(subs):
-                    slot = self.schedule.get(sub, 0)
-                    if slot == 0:
-                        date_str = ""
-                        session_in_day = ""
-                    else:
-                        day_index = (slot - 1) // self.max_exams_per_day
-                        session_in_day = ((slot - 1) % self.max_exams_per_day) + 1
-                        exam_date = self.start_date + timedelta(days=day_index)
-                        date_str = exam_date.strftime("%d/%m/%Y")
-
-                    self.tree_student.insert('', 'end', values=(sid, name, date_str, f'Ca {session_in_day}', sub))
+        if self.student_table.row_count() == 0 and self.student_subjects:
+            self.student_table.set_rows(self.build_student_rows())
+        self.search.request(self.search_var.get())
+
+    def apply_search_result(self, student_ids):
+        """Nhận kết quả tìm kiếm (list MSSV, None = tất cả) và lọc bảng lịch SV"""
+        if student_ids is None:
+            self.student_table.set_filter(None)
+            return
+        indices = []
+        for sid in student_ids:
+            start, end = self.student_row_range.get(sid, (0, 0))
+            indices.extend(range(start, end))
+        self.student_table.set_filter(indices)
 
     def check_conflicts(self):
         self.warning_text.delete(1.0, 'end')
         conflicts = []
 
-        for sid, subs in self.student_subjects.items():
-            cas = [self.schedule.get(s) for s in subs]
-            if len([c for c in cas if c is not None]) != len(set([c for c in cas if c is not None])):
-                name_df = self.data.loc[self.data['MaSV'] == sid, 'HoTen']
-                name = name_df.iloc[0] if len(name_df) > 0 else "N/A"
-                conflicts.append(f"TRÙNG: {sid} - {name}")
+        found, total = conflict_report(self.student_subjects, self.subject_students,
+                                       self.conflict_graph, self.schedule, limit=200)
+        for sid, _ in found:
+            name = self.student_names.get(sid, "N/A")
+            conflicts.append(f"TRÙNG: {sid} - {name}")
 
         if conflicts:
-            self.warning_text.insert('1.0', "CÓ LỖI TRÙNG CA!\n" + "\n".join(conflicts[:200]))
+            self.warning_text.insert('1.0', f"CÓ LỖI TRÙNG CA! (hiển thị {len(found)} / {total} sinh viên)\n"
+                                    + "\n".join(conflicts))
             self.warning_text.config(fg='red')
         else:
             self.warning_text.insert(
@@ -526,45 +530,79 @@ class ExamSchedulerPro:
             )
 
     def draw_graph(self):
-        # Vẽ đồ thị xung đột nếu thư viện có sẵn
-        self.graph_canvas.delete('all')
-        if not HAS_GRAPH:
+        # Vẽ đồ thị xung đột nếu thư viện có sẵn (ở thread nền, layout được cache)
+        if not HAS_GRAPH or not self.schedule:
             return
 
-        try:
-            G = nx.Graph()
-            for subj in self.subjects:
-                G.add_node(subj)
-            for a, neighs in self.conflict_graph.items():
-                for b in neighs:
-                    if a != b:
-                        G.add_edge(a, b)
-
-            plt.clf()
-            fig = plt.figure(figsize=(8, 6))
-            ax = fig.add_subplot(111)
-            ax.axis('off')
-
-            # position
-            pos = nx.spring_layout(G, seed=42)
-
-            # color nodes by assigned slot (if any)
-            node_colors = []
-            max_slot = max(self.schedule.values()) if self.schedule else 1
-            for n in G.nodes():
-                slot = self.schedule.get(n, 0)
-                node_colors.append(slot if slot > 0 else 0)
-
-            nx.draw_networkx_nodes(G, pos, node_size=300, cmap=plt.cm.tab20, node_color=node_colors)
-            nx.draw_networkx_edges(G, pos, alpha=0.4)
-            nx.draw_networkx_labels(G, pos, font_size=8)
-
-            # embed to tkinter
-            canvas = FigureCanvasTkAgg(fig, master=self.graph_canvas)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill='both', expand=True)
-        except Exception as e:
-            print("Lỗi vẽ đồ thị:", e)
+        subjects, conflict_graph, schedule = self.subjects, self.conflict_graph, dict(self.schedule)
+        size = (max(self.graph_canvas.winfo_width(), 640), max(self.graph_canvas.winfo_height(), 480))
+
+        def work(job):
+            job.progress(None, "Đang vẽ đồ thị...")
+            return render_png(subjects, conflict_graph, schedule, size=size, cache=self.layout_cache)
+
+        def error(e):
+            messagebox.showerror("Lỗi vẽ đồ thị", f"Không thể vẽ đồ thị xung đột.\nChi tiết: {str(e)}")
+
+        self.start_job("Vẽ đồ thị", work, self.show_graph_image, error)
+
+    def show_graph_image(self, png):
+        """Hiển thị ảnh PNG đã vẽ xong lên tab Đồ thị"""
+        for widget in self.graph_canvas.winfo_children():
+            widget.destroy()
+        self.graph_image = tk.PhotoImage(data=base64.b64encode(png))  # giữ tham chiếu để ảnh không bị xoá
+        tk.Label(self.graph_canvas, image=self.graph_image, bg='white').pack(fill='both', expand=True)
+
+    def export_tables(self):
+        """Các bảng xuất file (tên sheet, header, dòng, kiểu cột); dòng được sinh dần khi ghi
+
+        Trên thread Tk chỉ chụp lại lịch và ngày của từng ca, các bảng lớn (lịch từng SV)
+        được sinh trong job ghi file, không dựng list / DataFrame trong bộ nhớ.
+        """
+        schedule = dict(self.schedule)
+        student_names, student_subjects = self.student_names, self.student_subjects
+        sizes = {s: len(self.subject_students[s]) for s in schedule}
+        slot_dates = {slot: self.slot_date(slot) for slot in set(schedule.values())}
+        # Thứ tự thật của các ca (ngày, ca trong ngày): sau day_planner không còn trùng với mã số ca
+        day_key = {slot: (datetime.strptime(date, "%d/%m/%Y"), session)
+                   for slot, (date, session) in slot_dates.items()}
+
+        # --- Lịch theo ngày: sắp xếp ngày ↑, trong ngày ca ↑, môn đông trước ---
+        def day_rows():
+            for subj in sorted(schedule, key=lambda s: (day_key[schedule[s]], -sizes[s])):
+                date, session = slot_dates[schedule[subj]]
+                yield date, f'Ca {session}', subj, sizes[subj]
+
+        # --- Lịch theo ca toàn bộ ---
+        def slot_rows():
+            for subj in sorted(schedule, key=lambda s: (schedule[s], -sizes[s])):
+                yield f'Ca {schedule[subj]}', subj, sizes[subj]
+
+        # --- Lịch chi tiết theo sinh viên (theo MSSV, trong mỗi SV theo ngày thi) ---
+        def student_rows():
+            for sid, name, slot, subj in iter_student_rows(student_names, student_subjects, schedule,
+                                                           order=day_key):
+                if slot:
+                    date_str, session_in_day = slot_dates[slot]
+                    yield sid, name, subj, date_str, f'Ca {session_in_day}'
+                else:
+                    yield sid, name, subj, "", ""
+
+        # --- Sheet tóm tắt ---
+        summary = [(len(student_subjects), len(self.subjects), max(schedule.values()),
+                    self.max_exams_per_day, self.start_date.strftime("%d/%m/%Y"))]
+
+        return [
+            ('Lich_Theo_Ngay', ('Ngày', 'Ca thi trong ngày', 'Môn', 'Số SV'), day_rows(),
+             ('string', 'string', 'string', 'int32')),
+            ('Lich_Theo_Ca', ('Toàn bộ ca thi', 'Môn', 'Số SV'), slot_rows(),
+             ('string', 'string', 'int32')),
+            ('Lich_SinhVien', ('MSSV', 'Họ Tên', 'Môn', 'Ngày Thi', 'Ca trong ngày'), student_rows(),
+             ('string',) * 5),
+            ('ThongTin_TomTat', ('Tổng sinh viên', 'Tổng môn', 'Tổng ca (toàn bộ)',
+                                 'Số ca/ngày (cấu hình)', 'Ngày bắt đầu'), summary,
+             ('int64', 'int64', 'int64', 'int64', 'string')),
+        ]
 
     def export_all(self):
         """Xuất file Excel: Lịch theo ngày (top-down), Lịch theo ca, Lịch sinh viên"""
@@ -572,97 +610,36 @@ class ExamSchedulerPro:
             messagebox.showwarning("Chú ý", "Chưa có lịch để xuất. Vui lòng chạy DSatur trước.")
             return
 
-        # đảm bảo schedule_by_day được cập nhật theo max_exams_per_day hiện tại
-        self.calculate_schedule_by_day()
-
         # Chọn file lưu
         path = filedialog.asksaveasfilename(defaultextension=".xlsx",
-                                            filetypes=[("Excel files", "*.xlsx *.xls")],
+                                            filetypes=[("Excel files", "*.xlsx")],
                                             title="Lưu file lịch thi")
         if not path:
             return
 
-        # --- Lịch theo ngày: sắp xếp ngày ↑, trong ngày ca ↑ ---
-        day_rows = []
-        sorted_dates = sorted(self.schedule_by_day.keys(),
-                              key=lambda x: datetime.strptime(x, "%d/%m/%Y"))
-        for date in sorted_dates:
-            sessions = self.schedule_by_day[date]
-            for session in sorted(sessions.keys()):
-                info = sessions[session]
-                day_rows.append({
-                    'Ngày': date,
-                    'Ca thi trong ngày': f'Ca {session}',
-                    'Môn': info['subject'],
-                    'Số SV': info['students']
-                })
-        df_day = pd.DataFrame(day_rows)
-
-        # --- Lịch theo ca toàn bộ ---
-        ca_rows = []
-        ca_dict = defaultdict(list)
-        for subj, ca in self.schedule.items():
-            ca_dict[ca].append((subj, len(self.subject_students[subj])))
-        for ca in sorted(ca_dict.keys()):
-            for subj, count in sorted(ca_dict[ca], key=lambda x: -x[1]):
-                ca_rows.append({
-                    'Toàn bộ ca thi': f'Ca {ca}',
-                    'Môn': subj,
-                    'Số SV': count
-                })
-        df_ca = pd.DataFrame(ca_rows)
-
-        # --- Lịch chi tiết theo sinh viên ---
-        stu_rows = []
-        for sid, subs in self.student_subjects.items():
-            name_df = self.data.loc[self.data['MaSV'] == sid, 'HoTen']
-            name = name_df.iloc[0] if len(name_df) > 0 else "N/A"
-            for sub in sorted(subs):
-                slot = self.schedule.get(sub, 0)
-                if slot == 0:
-                    date_str = ""
-                    ca_in_day = ""
-                    ca_full = ""
-                else:
-                    day_index = (slot - 1) // self.max_exams_per_day
-                    session_in_day = ((slot - 1) % self.max_exams_per_day) + 1
-                    exam_date = self.start_date + timedelta(days=day_index)
-                    date_str = exam_date.strftime("%d/%m/%Y")
-                    ca_in_day = f'Ca {session_in_day}'
-                    ca_full = f'Ca {slot}'
-                stu_rows.append({
-                    'MSSV': sid,
-                    'Họ Tên': name,
-                    'Môn': sub,
-                    'Ngày Thi': date_str,
-                    'Ca trong ngày': ca_in_day,
-                })
-        df_stu = pd.DataFrame(stu_rows)
-
-        # --- Sheet tóm tắt ---
-        summary = {
-            'Tổng sinh viên': [len(self.student_subjects)],
-            'Tổng môn': [len(self.subjects)],
-            'Tổng ca (toàn bộ)': [max(self.schedule.values())],
-            'Số ca/ngày (cấu hình)': [self.max_exams_per_day],
-            'Ngày bắt đầu': [self.start_date.strftime("%d/%m/%Y")]
-        }
-        df_sum = pd.DataFrame(summary)
+        tables = self.export_tables()
+        stats = self.run_stats
 
-        # Ghi ra Excel
-        try:
-            with pd.ExcelWriter(path, engine='openpyxl') as writer:
-                df_day.to_excel(writer, sheet_name='Lich_Theo_Ngay', index=False)
-                df_ca.to_excel(writer, sheet_name='Lich_Theo_Ca', index=False)
-                df_stu.to_excel(writer, sheet_name='Lich_SinhVien', index=False)
-                df_sum.to_excel(writer, sheet_name='ThongTin_TomTat', index=False)
+        def work(job):
+            job.progress(None, "Đang ghi file Excel...")
+            # Các dòng được sinh và ghi streaming ngay trong job, không qua DataFrame
+            with stats.stage('export'):
+                paths = write_tables(path, tables)
+            stats.info['outputs'] = paths
+            stats.write_json(run_log_path(path))
 
+        def done(_):
+            self.update_stats()
             messagebox.showinfo("Xuất thành công",
-                                f"Đã xuất lịch thi ra file:\n{os.path.basename(path)}")
-        except Exception as e:
+                                f"Đã xuất lịch thi ra file:\n{os.path.basename(path)}\n"
+                                f"Log: {os.path.basename(run_log_path(path))}")
+
+        def error(e):
             messagebox.showerror("Lỗi xuất file",
                                  f"Không thể xuất file Excel.\nChi tiết: {str(e)}")
 
+        self.start_job("Xuất file", work, done, error)
+
 
 if __name__ == "__main__":
     root = tk.Tk()
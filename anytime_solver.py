@@ -0,0 +1,224 @@
+"""Giảm số ca thi: DSatur khởi động lại nhiều lần + tìm kiếm tabu (TabuCol)
+
+Mỗi tiến trình con lặp lại cho tới khi hết thời gian:
+1. Chạy DSatur với thứ tự hoà ngẫu nhiên (cùng bậc thì xếp ngẫu nhiên) -> 1 lời giải hợp lệ.
+2. Từ lời giải tốt nhất của nó, thử tô lại bằng k-1 màu bằng TabuCol; thành công thì
+   tiếp tục với k-2..., thất bại (hết số bước) thì quay lại bước 1.
+Mỗi khi tìm được lời giải ít ca hơn, tiến trình con báo ngay số ca về tiến trình chính;
+bản thân lời giải tốt nhất được trả về qua kết quả của future khi worker dừng (hết thời gian
+hoặc người dùng huỷ), nên dừng lúc nào cũng có lời giải tốt nhất tới thời điểm đó.
+Nếu biết cận dưới (clique_bound), tìm kiếm dừng ngay khi đạt cận dưới vì không thể tốt hơn.
+"""
+import os
+import queue
+import time
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, wait
+
+import numpy as np
+
+from dsatur_core import dsatur_buckets
+
+
+TABU_MAX_ITERS = 20000   # số bước tabu tối đa cho mỗi lần thử k-1 màu
+CHECK_EVERY = 256        # số bước giữa 2 lần kiểm tra hết giờ / huỷ
+POLL_SECONDS = 0.1
+
+
+def randomized_order(adj, rng):
+    """Thứ tự ưu tiên DSatur: bậc giảm dần, các đỉnh cùng bậc xếp ngẫu nhiên"""
+    ties = rng.random(len(adj))
+    return sorted(range(len(adj)), key=lambda v: (-len(adj[v]), ties[v]))
+
+
+def tabucol(nbrs, colors, k, rng, max_iters=TABU_MAX_ITERS, should_stop=None):
+    """Tìm cách tô k màu không xung đột bắt đầu từ colors, trả về (list màu hoặc None, số bước)
+
+    gamma[v, c] = số hàng xóm của v đang có màu c; mỗi bước chọn nước đi (v, c) giảm
+    số cạnh xung đột nhiều nhất trong các đỉnh đang xung đột, cấm đưa v về màu cũ trong
+    1 số bước (tabu), trừ khi nước đi đó cho kết quả tốt nhất từ trước tới giờ.
+    """
+    n = len(nbrs)
+    color = np.asarray(colors, dtype=np.int64).copy()
+    over = color >= k
+    color[over] = rng.integers(0, k, size=int(over.sum()))
+
+    src = np.repeat(np.arange(n), [len(a) for a in nbrs])
+    dst = np.concatenate(nbrs) if n else np.zeros(0, dtype=np.int64)
+    gamma = np.zeros((n, k), dtype=np.int64)
+    np.add.at(gamma, (src, color[dst]), 1)
+
+    rows = np.arange(n)
+    tabu = np.zeros((n, k), dtype=np.int64)
+    big = n * n + 1
+    conflicts = int(gamma[rows, color].sum()) // 2
+    best = conflicts
+
+    for it in range(max_iters):
+        if conflicts == 0:
+            return color.tolist(), it
+        if should_stop is not None and it % CHECK_EVERY == 0 and should_stop():
+            break
+
+        own = gamma[rows, color]
+        cand = np.flatnonzero(own > 0)
+        delta = gamma[cand] - own[cand][:, None]
+        delta[np.arange(len(cand)), color[cand]] = big
+        blocked = (tabu[cand] > it) & (conflicts + delta >= best)
+        delta[blocked] = big
+
+        m = int(delta.min())
+        if m >= big:
+            # Mọi nước đi đều bị cấm: đổi màu ngẫu nhiên 1 đỉnh đang xung đột
+            i, c = int(rng.integers(len(cand))), int(rng.integers(k))
+            if c == color[cand[i]]:
+                continue
+            m = int(gamma[cand[i], c] - own[cand[i]])
+        else:
+            flat = np.flatnonzero(delta.ravel() == m)
+            i, c = divmod(int(flat[rng.integers(len(flat))]), k)
+
+        v = cand[i]
+        old = color[v]
+        gamma[nbrs[v], old] -= 1
+        gamma[nbrs[v], c] += 1
+        color[v] = c
+        conflicts += m
+        tabu[v, old] = it + int(0.6 * len(cand)) + int(rng.integers(10))
+        best = min(best, conflicts)
+
+    return None, max_iters
+
+
+def search(adj, seed, deadline, should_stop=None, report=None, initial=None, lower_bound=0):
+    """Vòng lặp khởi động lại + tabu của 1 worker, trả về (màu tốt nhất, thống kê)"""
+    rng = np.random.default_rng(seed)
+    nbrs = [np.asarray(a, dtype=np.int64) for a in adj]
+    start = time.time()
+    stats = {'restarts': 0, 'tabu_runs': 0, 'tabu_moves': 0, 'improvements': 0}
+
+    best = list(initial) if initial is not None else None
+    best_k = max(best) + 1 if best else len(adj) + 1
+    stop = lambda: (best_k <= lower_bound or time.time() >= deadline
+                    or (should_stop is not None and should_stop()))
+
+    def improved(colors, k):
+        nonlocal best, best_k
+        best, best_k = colors, k
+        stats['improvements'] += 1
+        if report is not None:
+            report(k, colors)
+
+    while adj and not stop():
+        colors = dsatur_buckets(adj, randomized_order(adj, rng))
+        stats['restarts'] += 1
+        k = max(colors) + 1
+        if k < best_k:
+            improved(colors, k)
+
+        while best_k > 1 and not stop():
+            result, moves = tabucol(nbrs, best, best_k - 1, rng, should_stop=stop)
+            stats['tabu_runs'] += 1
+            stats['tabu_moves'] += moves
+            if result is None:
+                break
+            improved(result, best_k - 1)
+
+    seconds = time.time() - start
+    stats['seconds'] = seconds
+    stats['best_slots'] = best_k if best else 0
+    stats['moves_per_s'] = stats['tabu_moves'] / seconds if seconds > 0 else 0.0
+    return best, stats
+
+
+# --- Chạy song song bằng process pool ---
+# Hàng đợi updates và cờ stop được truyền cho tiến trình con qua initializer.
+# Hàng đợi chỉ chở thông báo nhỏ (worker, số ca); màu đi qua kết quả future, vì 1 tiến trình
+# con còn dữ liệu lớn chưa gửi hết qua pipe sẽ bị kẹt lúc thoát trong khi tiến trình chính
+# đang chờ nó ở shutdown.
+
+_updates = None
+_stop = None
+
+
+def _init_worker(updates, stop):
+    global _updates, _stop
+    _updates, _stop = updates, stop
+    # Không chờ feeder thread của hàng đợi khi thoát: thông báo chưa gửi kịp có thể bỏ
+    _updates.cancel_join_thread()
+
+
+def _search_job(args):
+    worker, adj, seed, deadline, initial, lower_bound = args
+    report = lambda k, colors: _updates.put((worker, k))
+    colors, stats = search(adj, seed, deadline, should_stop=_stop.is_set, report=report,
+                      initial=initial, lower_bound=lower_bound)
+    stats['worker'] = worker
+    return colors, stats
+
+
+def improve_coloring(adj, budget=10.0, workers=None, seed=0, initial=None,
+                     on_improve=None, should_stop=None, lower_bound=0):
+    """Tìm cách tô ít màu hơn trong budget giây, trả về (màu tốt nhất 0-based, thống kê từng worker)
+
+    on_improve(số màu, worker) được gọi ở tiến trình chính mỗi khi có lời giải tốt hơn;
+    should_stop() trả về True để dừng sớm (vẫn giữ lời giải tốt nhất đã có).
+    lower_bound: cận dưới số màu đã biết, đạt tới thì dừng tất cả worker.
+    """
+    workers = workers or os.cpu_count() or 1
+    deadline = time.time() + budget
+    best = list(initial) if initial is not None else None
+    best_k = max(best) + 1 if best else len(adj) + 1
+    if best_k <= lower_bound:
+        return best, []  # lời giải ban đầu đã tối ưu
+
+    if workers <= 1:
+        def report(k, colors):
+            if on_improve is not None:
+                on_improve(k, 0)
+        colors, stats = search(adj, seed, deadline, should_stop, report, initial, lower_bound)
+        stats['worker'] = 0
+        return colors if colors is not None else best, [stats]
+
+    ctx = mp.get_context()
+    updates = ctx.Queue()
+    stop = ctx.Event()
+
+    reported_k = best_k
+
+    def drain():
+        nonlocal reported_k
+        while True:
+            try:
+                worker, k = updates.get_nowait()
+            except queue.Empty:
+                return
+            if k < reported_k:
+                reported_k = k
+                if on_improve is not None:
+                    on_improve(k, worker)
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                             initializer=_init_worker, initargs=(updates, stop)) as pool:
+        futures = [pool.submit(_search_job, (w, adj, seed + w, deadline, initial, lower_bound))
+                   for w in range(workers)]
+        try:
+            while wait(futures, timeout=POLL_SECONDS).not_done:
+                drain()
+                if reported_k <= lower_bound or (should_stop is not None and should_stop()):
+                    stop.set()
+        finally:
+            stop.set()  # lỗi ở tiến trình chính cũng phải dừng các worker
+        drain()
+        results = [f.result() for f in futures]
+
+    stats = []
+    best_worker = None
+    for colors, worker_stats in results:
+        stats.append(worker_stats)
+        if colors and max(colors) + 1 < best_k:
+            best, best_k, best_worker = colors, max(colors) + 1, worker_stats['worker']
+    # Thông báo cuối của worker có thể chưa kịp tới: báo lời giải tốt nhất thật sự
+    if best_k < reported_k and on_improve is not None:
+        on_improve(best_k, best_worker)
+    return best, stats
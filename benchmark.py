@@ -0,0 +1,301 @@
+"""Đo thời gian từng bước xếp lịch trên dữ liệu giả lập, so sánh với baseline đã lưu
+
+Mỗi kích thước chạy trong 1 tiến trình con riêng để đo đúng bộ nhớ đỉnh (peak RSS).
+Các bước tương ứng với các nút trên giao diện:
+    load (load_file), process (process_data), dsatur (run_dsatur), bound,
+    check (check_conflicts), display (dựng bảng lịch SV), export_xlsx / export_csv (export_all)
+và các cách làm cũ để so sánh:
+    load_pandas    - đọc từng sheet bằng pandas (Dsatur.py / DSATURfinal ban đầu)
+    process_legacy - iterrows + ghép cặp môn từng SV (DSATURfinal)
+    dsatur_legacy  - vòng DSatur của Dsatur.py / DSATURfinal ban đầu: heap, mỗi lần tô 1 môn thì
+                     đếm lại số màu khác nhau quanh từng hàng xóm (O(bậc²) mỗi bước)
+    dsatur_v2heap  - vòng DSatur của DSATURv2 ban đầu: heap lười, độ bão hoà = số hàng xóm đã tô
+                     (cộng 1 mỗi lần, không phải số màu khác nhau)
+    dsatur_buckets - DSatur bucket trên cả đồ thị (DSATURv2 / Dsatur.py trước khi tách thành phần)
+
+Baseline mặc định nằm trong thư mục dữ liệu giả lập (~/.cache/exam_scheduler/bench), không
+ghi vào thư mục mã nguồn; dùng --baseline để chọn file khác.
+
+Ví dụ:
+    python benchmark.py --save-baseline          # lưu kết quả máy chuẩn làm baseline
+    python benchmark.py                          # so sánh, chậm hơn baseline thì exit code 1
+    python benchmark.py --sizes small,large --tolerance 0.5
+"""
+import argparse
+import heapq
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from run_stats import peak_rss_mb
+
+
+SIZES = {                 # tên: (số SV, số môn)
+    'small': (2000, 60),
+    'medium': (20000, 300),
+    'large': (80000, 1000),
+}
+DEFAULT_SIZES = ('small', 'medium')
+LEGACY_MAX_ROWS = 150000  # trên ngưỡng này bỏ qua các cách làm cũ (quá chậm)
+DATA_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'exam_scheduler', 'bench')
+BASELINE_FILE = os.path.join(DATA_DIR, 'bench_baseline.json')
+
+
+# --- Các cách làm cũ (chép lại từ DSATURfinal / Dsatur.py / DSATURv2 ban đầu để so sánh) ---
+
+def legacy_process(data):
+    student_subjects = defaultdict(set)
+    conflict_graph = defaultdict(set)
+    for _, row in data.iterrows():
+        student_subjects[str(row['MaSV']).strip()].add(row['ChuongTrinh'])
+    for subs in student_subjects.values():
+        subs = list(subs)
+        for i in range(len(subs)):
+            for j in range(i + 1, len(subs)):
+                conflict_graph[subs[i]].add(subs[j])
+                conflict_graph[subs[j]].add(subs[i])
+    return conflict_graph
+
+
+def legacy_dsatur(subjects, conflict_graph):
+    """run_dsatur của Dsatur.py / DSATURfinal: tính lại độ bão hoà từng hàng xóm mỗi bước"""
+    degree = {s: len(conflict_graph[s]) for s in subjects}
+    color_of = {}
+    heap = [(0, -degree[s], s) for s in subjects]
+    heapq.heapify(heap)
+    colored = set()
+    while heap:
+        _, _, subj = heapq.heappop(heap)
+        if subj in colored:
+            continue
+        used = {color_of.get(n) for n in conflict_graph[subj] if n in color_of}
+        c = 1
+        while c in used:
+            c += 1
+        color_of[subj] = c
+        colored.add(subj)
+        for nei in conflict_graph[subj]:
+            if nei not in colored:
+                sat = len({color_of.get(n) for n in conflict_graph[nei] if n in color_of})
+                heapq.heappush(heap, (-sat, -degree[nei], nei))
+    return color_of
+
+
+def legacy_dsatur_v2(subjects, conflict_graph):
+    """run_dsatur của DSATURv2: heap lười, độ bão hoà tăng 1 cho mỗi hàng xóm được tô"""
+    degree = {s: len(conflict_graph[s]) for s in subjects}
+    saturation = {s: 0 for s in subjects}
+    color_of = {}
+    heap = [(0, -degree[s], s) for s in subjects]
+    heapq.heapify(heap)
+    colored = set()
+    for _ in range(len(subjects)):
+        while heap:
+            _, _, subj = heapq.heappop(heap)
+            if subj not in colored:
+                break
+        used = {color_of.get(n) for n in conflict_graph[subj] if n in color_of}
+        c = 1
+        while c in used:
+            c += 1
+        color_of[subj] = c
+        colored.add(subj)
+        for nei in conflict_graph[subj]:
+            if nei not in colored:
+                saturation[nei] += 1
+                heapq.heappush(heap, (-saturation[nei], -degree[nei], nei))
+    return color_of
+
+
+# --- Chạy trong tiến trình con: đo 1 file ---
+
+def measure(path):
+    """Chạy lần lượt các bước trên 1 file, trả về dict timings / slots / peak_mb"""
+    from dsatur_core import dsatur_buckets, to_adjacency
+    from scheduler_engine import (build_model, dsatur, export_schedule, find_conflicts, iter_student_rows,
+                                  lower_bound, read_enrollments)
+
+    timings, slots = {}, {}
+    quiet = lambda msg: None
+
+    @contextmanager
+    def stage(name):
+        start = time.perf_counter()
+        yield
+        timings[name] = time.perf_counter() - start
+
+    with stage('load'):
+        data, _ = read_enrollments(path, log=quiet, workers=1)
+    with stage('load_parallel'):
+        read_enrollments(path, log=quiet, workers=None)
+    legacy = len(data) <= LEGACY_MAX_ROWS
+    if legacy:
+        with stage('load_pandas'):
+            read_enrollments(path, log=quiet, streaming=False)
+
+    with stage('process'):
+        model = build_model(data)
+        subjects, student_subjects, subject_students, conflict_graph, _ = model.graph()
+        names = model.name_index()
+    if legacy:
+        with stage('process_legacy'):
+            legacy_process(data)
+
+    if legacy:
+        with stage('dsatur_legacy'):
+            slots['dsatur_legacy'] = max(legacy_dsatur(subjects, conflict_graph).values())
+        with stage('dsatur_v2heap'):
+            slots['dsatur_v2heap'] = max(legacy_dsatur_v2(subjects, conflict_graph).values())
+    with stage('dsatur_buckets'):
+        slots['dsatur_buckets'] = max(dsatur_buckets(to_adjacency(subjects, conflict_graph))) + 1
+    with stage('dsatur'):
+        schedule = dsatur(subjects, conflict_graph)
+    slots['dsatur'] = max(schedule.values())
+    with stage('bound'):
+        slots['bound'] = lower_bound(subjects, conflict_graph)[0]
+
+    with stage('check'):
+        conflicts = find_conflicts(student_subjects, subject_students, conflict_graph, schedule)
+    if conflicts:
+        raise RuntimeError(f"Lịch có {len(conflicts)} SV bị trùng ca!")
+    with stage('display'):
+        for _ in iter_student_rows(names, student_subjects, schedule):
+            pass
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        for ext in ('xlsx', 'csv'):
+            with stage(f'export_{ext}'):
+                export_schedule(os.path.join(out_dir, f'LichThi.{ext}'), names, subjects,
+                                student_subjects, subject_students, conflict_graph, schedule)
+
+    return {'rows': len(data), 'students': len(student_subjects), 'subjects': len(subjects),
+            'edges': len(model.adj_indices) // 2, 'model_mb': model.nbytes() / 2**20,
+            'timings': timings, 'slots': slots, 'peak_mb': peak_rss_mb()}
+
+
+def run_size(name, data_dir, seed=0):
+    """Sinh file (nếu chưa có) rồi đo trong tiến trình con"""
+    from synthetic_data import write_workbook
+
+    n_students, n_subjects = SIZES[name]
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f'bench_{name}_{n_students}_{n_subjects}_{seed}.xlsx')
+    if not os.path.exists(path):
+        print(f"Đang sinh {os.path.basename(path)}...", flush=True)
+        write_workbook(path + '.tmp', n_students, n_subjects, seed)
+        os.replace(path + '.tmp', path)
+
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', path],
+                          capture_output=True, text=True, encoding='utf-8')
+    if proc.returncode != 0:
+        raise RuntimeError(f"Đo {name} thất bại:\n{proc.stderr}")
+    return json.loads(proc.stdout.splitlines()[-1])
+
+
+# --- Báo cáo / so sánh baseline ---
+
+def report(results):
+    names = list(results)
+    stages = []
+    for res in results.values():
+        stages += [s for s in res['timings'] if s not in stages]
+
+    lines = [f"{'':<16}" + ''.join(f"{n:>14}" for n in names)]
+    lines.append(f"{'SV / môn':<16}" + ''.join(
+        f"{results[n]['students']:,} / {results[n]['subjects']:,}".rjust(14) for n in names))
+    for stage in stages:
+        cells = [results[n]['timings'].get(stage) for n in names]
+        lines.append(f"{stage:<16}" + ''.join(f"{c:>13.3f}s" if c is not None else f"{'-':>14}"
+                                             for c in cells))
+    for key in ('dsatur_legacy', 'dsatur_v2heap', 'dsatur_buckets', 'dsatur', 'bound'):
+        cells = [results[n]['slots'].get(key) for n in names]
+        lines.append(f"{'ca ' + key:<16}" + ''.join(f"{c:>14}" if c is not None else f"{'-':>14}"
+                                                    for c in cells))
+    lines.append(f"{'peak RSS':<16}" + ''.join(
+        f"{results[n]['peak_mb']:>11.0f} MB" if results[n]['peak_mb'] else f"{'-':>14}" for n in names))
+    return "\n".join(lines)
+
+
+def compare(results, baseline, tolerance, min_seconds):
+    """Danh sách các chỉ số tệ hơn baseline quá tolerance (tỉ lệ) và quá min_seconds giây"""
+    failures = []
+    for name, res in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for stage, secs in res['timings'].items():
+            old = base['timings'].get(stage)
+            if old is not None and secs > old * (1 + tolerance) and secs - old > min_seconds:
+                failures.append(f"{name}/{stage}: {secs:.3f}s (baseline {old:.3f}s)")
+        old, new = base.get('peak_mb'), res.get('peak_mb')
+        if old and new and new > old * (1 + tolerance):
+            failures.append(f"{name}/peak RSS: {new:.0f} MB (baseline {old:.0f} MB)")
+        old, new = base['slots'].get('dsatur'), res['slots'].get('dsatur')
+        if old is not None and new is not None and new > old:
+            failures.append(f"{name}/số ca: {new} (baseline {old})")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Đo hiệu năng từng bước xếp lịch trên dữ liệu giả lập")
+    parser.add_argument('--sizes', default=','.join(DEFAULT_SIZES),
+                        help=f"Các kích thước cần đo, cách nhau dấu phẩy ({', '.join(SIZES)})")
+    parser.add_argument('--data-dir', default=DATA_DIR, help="Thư mục chứa file giả lập")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="File baseline JSON")
+    parser.add_argument('--save-baseline', action='store_true', help="Ghi kết quả lần này làm baseline")
+    parser.add_argument('--tolerance', type=float, default=0.3,
+                        help="Cho phép chậm / tốn bộ nhớ hơn baseline bao nhiêu (0.3 = 30%%)")
+    parser.add_argument('--min-seconds', type=float, default=0.1,
+                        help="Bỏ qua chênh lệch thời gian nhỏ hơn chừng này giây")
+    parser.add_argument('--child', metavar='FILE', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(measure(args.child)))
+        return 0
+
+    names = [n.strip() for n in args.sizes.split(',') if n.strip()]
+    unknown = [n for n in names if n not in SIZES]
+    if unknown:
+        parser.error(f"Không có kích thước {', '.join(unknown)}")
+
+    results = {}
+    for name in names:
+        print(f"Đang đo {name} {SIZES[name]}...", flush=True)
+        results[name] = run_size(name, args.data_dir)
+    print()
+    print(report(results))
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    if args.save_baseline:
+        baseline.update(results)
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2, ensure_ascii=False)
+        print(f"\nĐã lưu baseline: {args.baseline}")
+        return 0
+
+    if not baseline:
+        print("\nChưa có baseline, chạy lại với --save-baseline để lưu.")
+        return 0
+    failures = compare(results, baseline, args.tolerance, args.min_seconds)
+    if failures:
+        print("\nCHẬM HƠN BASELINE:", file=sys.stderr)
+        for line in failures:
+            print(f"  {line}", file=sys.stderr)
+        return 1
+    print("\nKhông có bước nào chậm hơn baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
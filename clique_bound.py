@@ -0,0 +1,123 @@
+"""Cận dưới số ca thi = kích thước 1 clique trong đồ thị xung đột
+
+Mọi môn trong 1 clique đôi một có sinh viên chung nên phải thi ở các ca khác nhau:
+số ca >= kích thước clique. Tìm clique bằng tham lam từ các đỉnh bậc cao, sau đó
+nhánh cận (kiểu MCQ: tô màu tham lam để chặn) trong thời gian cho phép.
+Các tập đỉnh được biểu diễn bằng bitmask (số nguyên Python), đỉnh v là bit v.
+"""
+import time
+
+try:
+    popcount = int.bit_count
+except AttributeError:  # Python < 3.10
+    def popcount(x):
+        return bin(x).count('1')
+
+
+GREEDY_SEEDS = 64   # số đỉnh bậc cao dùng làm điểm xuất phát cho clique tham lam
+QUICK_SEEDS = 4     # số điểm xuất phát khi chỉ cần cận nhanh (không nhánh cận)
+CHECK_EVERY = 1024  # số nút nhánh cận giữa 2 lần kiểm tra hết giờ
+
+
+class _Timeout(Exception):
+    pass
+
+
+def neighbor_masks(adj):
+    masks = []
+    for nbrs in adj:
+        m = 0
+        for w in nbrs:
+            m |= 1 << w
+        masks.append(m)
+    return masks
+
+
+def greedy_clique(masks, seeds):
+    """Clique lớn nhất tìm được khi bắt đầu từ từng đỉnh seed, mỗi bước thêm đỉnh
+    có nhiều hàng xóm nhất trong tập ứng viên còn lại"""
+    best = []
+    for seed in seeds:
+        clique = [seed]
+        cand = masks[seed]
+        while cand:
+            v, deg, m = -1, -1, cand
+            while m:
+                low = m & -m
+                w = low.bit_length() - 1
+                d = popcount(cand & masks[w])
+                if d > deg:
+                    v, deg = w, d
+                m ^= low
+            clique.append(v)
+            cand &= masks[v]
+        if len(clique) > len(best):
+            best = clique
+    return best
+
+
+def _color_sort(masks, cand):
+    """Tô màu tham lam tập cand, trả về (đỉnh, số màu tới đỉnh đó) theo thứ tự màu tăng dần"""
+    verts, bounds = [], []
+    color = 0
+    rest = cand
+    while rest:
+        color += 1
+        q = rest
+        while q:
+            low = q & -q
+            v = low.bit_length() - 1
+            rest &= ~low
+            q &= ~low & ~masks[v]
+            verts.append(v)
+            bounds.append(color)
+    return verts, bounds
+
+
+def max_clique(masks, initial=(), time_limit=1.0):
+    """Nhánh cận tìm clique lớn nhất, trả về (clique, đã chứng minh tối ưu hay chưa)"""
+    best = list(initial)
+    deadline = time.perf_counter() + time_limit
+    nodes = 0
+
+    def expand(clique, cand):
+        nonlocal best, nodes
+        nodes += 1
+        if nodes % CHECK_EVERY == 0 and time.perf_counter() > deadline:
+            raise _Timeout()
+        verts, bounds = _color_sort(masks, cand)
+        for i in range(len(verts) - 1, -1, -1):
+            # Số màu của phần còn lại chặn trên kích thước clique có thể thêm vào
+            if len(clique) + bounds[i] <= len(best):
+                return
+            v = verts[i]
+            sub = cand & masks[v]
+            clique.append(v)
+            if sub:
+                expand(clique, sub)
+            elif len(clique) > len(best):
+                best = list(clique)
+            clique.pop()
+            cand &= ~(1 << v)
+
+    try:
+        expand([], (1 << len(masks)) - 1)
+    except (_Timeout, RecursionError):
+        return best, False
+    return best, True
+
+
+def clique_lower_bound(adj, time_limit=1.0, seeds=GREEDY_SEEDS):
+    """Cận dưới số màu của đồ thị (danh sách kề theo chỉ số), trả về (clique, đã chứng minh tối ưu)
+
+    Clique tham lam (xuất phát từ seeds đỉnh bậc cao nhất) luôn có ngay;
+    phần nhánh cận chỉ chạy trong time_limit giây, time_limit <= 0 thì bỏ qua.
+    """
+    if not adj:
+        return [], True
+    masks = neighbor_masks(adj)
+    seeds = sorted(range(len(adj)), key=lambda v: -len(adj[v]))[:seeds]
+    clique = greedy_clique(masks, seeds)
+    if time_limit <= 0:
+        return clique, False
+    return max_clique(masks, clique, time_limit)
@@ -0,0 +1,160 @@
+"""Tô màu theo từng thành phần liên thông của đồ thị xung đột
+
+Các nhóm môn không có sinh viên chung (thường là các khoa khác nhau) tạo thành các
+thành phần liên thông độc lập: mỗi thành phần được tô riêng bắt đầu từ màu 0 rồi ghép
+lại, nên tổng số ca = số ca của thành phần cần nhiều ca nhất.
+- Thành phần nhỏ (<= EXACT_MAX_NODES đỉnh) được tô tối ưu bằng quay lui.
+- Thành phần lớn dùng DSatur; khi đồ thị đủ lớn thì chia cho nhiều tiến trình.
+counters (dict, tuỳ chọn) nhận bộ đếm của DSatur (xem dsatur_core), số nút quay lui
+(exact_nodes) và số thành phần đã tô (components).
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from clique_bound import clique_lower_bound
+from dsatur_core import add_counts, dsatur_buckets
+
+
+EXACT_MAX_NODES = 16           # thành phần nhỏ hơn ngưỡng này được tô tối ưu
+EXACT_NODE_LIMIT = 200000      # số nút quay lui tối đa, quá thì giữ kết quả DSatur
+PARALLEL_MIN_VERTICES = 2000   # đồ thị nhỏ hơn thì tô tuần tự (tạo tiến trình tốn hơn)
+
+
+def connected_components(adj):
+    """Các thành phần liên thông (list đỉnh tăng dần), thành phần lớn trước"""
+    n = len(adj)
+    seen = [False] * n
+    comps = []
+    for s in range(n):
+        if seen[s]:
+            continue
+        seen[s] = True
+        stack, comp = [s], []
+        while stack:
+            v = stack.pop()
+            comp.append(v)
+            for w in adj[v]:
+                if not seen[w]:
+                    seen[w] = True
+                    stack.append(w)
+        comp.sort()
+        comps.append(comp)
+    comps.sort(key=len, reverse=True)
+    return comps
+
+
+def subgraph(adj, verts):
+    """Danh sách kề của đồ thị con trên verts, đánh lại chỉ số 0..len(verts)-1"""
+    local = {v: i for i, v in enumerate(verts)}
+    return [[local[w] for w in adj[v]] for v in verts]
+
+
+def _k_color(adj, k, node_limit, counters=None):
+    """Quay lui tô k màu (chọn đỉnh bão hoà nhất trước); trả về list màu, False nếu không thể,
+    None nếu vượt quá node_limit"""
+    n = len(adj)
+    color = [-1] * n
+    nodes = 0
+
+    def pick():
+        best, best_key = -1, None
+        for v in range(n):
+            if color[v] < 0:
+                used = {color[w] for w in adj[v] if color[w] >= 0}
+                key = (len(used), len(adj[v]))
+                if best_key is None or key > best_key:
+                    best, best_key = v, key
+        return best
+
+    def solve(colored, used_colors):
+        nonlocal nodes
+        nodes += 1
+        if nodes > node_limit:
+            raise TimeoutError
+        if colored == n:
+            return True
+        v = pick()
+        forbidden = {color[w] for w in adj[v]}
+        # Chỉ thử thêm 1 màu mới (các màu chưa dùng là đối xứng nhau)
+        for c in range(min(k, used_colors + 1)):
+            if c not in forbidden:
+                color[v] = c
+                if solve(colored + 1, max(used_colors, c + 1)):
+                    return True
+                color[v] = -1
+        return False
+
+    try:
+        return list(color) if solve(0, 0) else False
+    except TimeoutError:
+        return None
+    finally:
+        if counters is not None:
+            add_counts(counters, exact_nodes=nodes)
+
+
+def exact_coloring(adj, node_limit=EXACT_NODE_LIMIT, counters=None):
+    """Tô số màu ít nhất cho đồ thị nhỏ; vượt node_limit thì trả về lời giải tốt nhất đã có"""
+    best = dsatur_buckets(adj, counters=counters)
+    if not adj:
+        return best
+    low = len(clique_lower_bound(adj, time_limit=0)[0])
+    for k in range(low, max(best) + 1):
+        result = _k_color(adj, k, node_limit, counters)
+        if result is None:
+            break
+        if result:
+            return result
+    return best
+
+
+def color_component(adj, counters=None):
+    """Tô 1 thành phần: tối ưu nếu nhỏ, DSatur nếu lớn"""
+    if counters is not None:
+        add_counts(counters, components=1)
+    if len(adj) <= EXACT_MAX_NODES:
+        return exact_coloring(adj, counters=counters)
+    return dsatur_buckets(adj, counters=counters)
+
+
+def _color_component_counted(adj):
+    """Chạy ở tiến trình con: trả về (màu, bộ đếm) vì tiến trình con không ghi được dict của cha"""
+    counters = {}
+    return color_component(adj, counters), counters
+
+
+def color_by_components(adj, workers=1, counters=None):
+    """Tô từng thành phần liên thông rồi ghép lại, trả về list màu (0-based) cho từng đỉnh
+
+    workers: số tiến trình (None = số CPU); chỉ dùng song song khi đồ thị có từ
+    PARALLEL_MIN_VERTICES đỉnh và có hơn 1 thành phần lớn.
+    counters: dict nhận bộ đếm (None = không đếm).
+    """
+    comps = connected_components(adj)
+    colors = [0] * len(adj)
+    if not comps:
+        return colors
+
+    # Đỉnh cô lập luôn nhận màu 0, không cần tô
+    comps = [c for c in comps if len(c) > 1]
+    subs = [subgraph(adj, comp) for comp in comps]
+
+    workers = workers or os.cpu_count() or 1
+    big = sum(1 for comp in comps if len(comp) > EXACT_MAX_NODES)
+    if workers > 1 and big > 1 and len(adj) >= PARALLEL_MIN_VERTICES:
+        with ProcessPoolExecutor(max_workers=min(workers, len(subs))) as pool:
+            if counters is None:
+                results = list(pool.map(color_component, subs))
+            else:
+                results = []
+                for local, counts in pool.map(_color_component_counted, subs):
+                    results.append(local)
+                    add_counts(counters, **counts)
+    else:
+        results = [color_component(sub, counters) for sub in subs]
+
+    for comp, local in zip(comps, results):
+        for v, c in zip(comp, local):
+            colors[v] = c
+    return colors
+
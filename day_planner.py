@@ -0,0 +1,131 @@
+"""Xếp các ca thi vào (ngày, ca trong ngày) để ít sinh viên phải thi dồn
+
+DSatur chỉ cho biết môn nào cùng ca; thứ tự các ca thì tuỳ ý. Ở đây hoán vị các ca
+lên các vị trí (ngày d, ca s) sao cho tổng phạt nhỏ nhất:
+- 2 môn của cùng 1 SV trong cùng ngày: PENALTY_SAME_DAY, thêm PENALTY_BACK_TO_BACK nếu 2 ca liền nhau
+- 2 môn ở 2 ngày liên tiếp: PENALTY_NEXT_DAY
+
+W[a, b] = số SV chung giữa ca a và ca b (tính 1 lần từ shared_counts). Với M = W @ Pen[:, vị trí]
+(chi phí đặt ca a vào vị trí q), độ lợi của mọi cặp đổi chỗ được tính cùng lúc bằng numpy;
+mỗi bước đổi cặp tốt nhất, kẹt thì xáo trộn ngẫu nhiên vài cặp rồi tiếp tục tới hết giờ.
+"""
+import time
+
+import numpy as np
+
+
+PENALTY_SAME_DAY = 3.0
+PENALTY_BACK_TO_BACK = 2.0
+PENALTY_NEXT_DAY = 1.0
+KICK_SWAPS = 3   # số cặp đổi ngẫu nhiên khi kẹt ở cực tiểu địa phương
+
+
+def slot_matrix(schedule, shared_counts, n_slots):
+    """Ma trận (n_slots, n_slots): số SV chung giữa 2 ca (chỉ số ca 0-based)"""
+    W = np.zeros((n_slots, n_slots))
+    if shared_counts:
+        pairs = np.array([(schedule[a] - 1, schedule[b] - 1, w)
+                          for (a, b), w in shared_counts.items()
+                          if a in schedule and b in schedule])
+        if len(pairs):
+            a, b = pairs[:, 0].astype(np.int64), pairs[:, 1].astype(np.int64)
+            np.add.at(W, (a, b), pairs[:, 2])
+            np.add.at(W, (b, a), pairs[:, 2])
+    np.fill_diagonal(W, 0)
+    return W
+
+
+def penalty_matrix(n_days, per_day):
+    """Pen[p, q]: phạt khi 1 SV thi ở vị trí p và q (vị trí p = ngày p // per_day, ca p % per_day)"""
+    pos = np.arange(n_days * per_day)
+    day, session = pos // per_day, pos % per_day
+    same = day[:, None] == day[None, :]
+    gap = np.abs(session[:, None] - session[None, :])
+    pen = (same * PENALTY_SAME_DAY
+           + (same & (gap == 1)) * PENALTY_BACK_TO_BACK
+           + (np.abs(day[:, None] - day[None, :]) == 1) * PENALTY_NEXT_DAY)
+    np.fill_diagonal(pen, 0)
+    return pen
+
+
+def day_penalties(W, pos, per_day):
+    """Số lượt SV (tính theo cặp môn) thi cùng ngày / 2 ca liền nhau / 2 ngày liên tiếp"""
+    pos = np.asarray(pos)
+    day, session = pos // per_day, pos % per_day
+    upper = np.triu(np.ones_like(W, dtype=bool), 1)
+    same = (day[:, None] == day[None, :]) & upper
+    back = same & (np.abs(session[:, None] - session[None, :]) == 1)
+    nxt = (np.abs(day[:, None] - day[None, :]) == 1) & upper
+    return {'same_day': int(W[same].sum()), 'back_to_back': int(W[back].sum()),
+            'next_day': int(W[nxt].sum())}
+
+
+def optimize_positions(W, pen, time_limit=2.0, seed=0, should_stop=None):
+    """Tìm hoán vị pos (ca a -> vị trí pos[a]) giảm 0.5 * sum W[a,b] * pen[pos[a], pos[b]]
+
+    W và pen cùng kích thước (vị trí trống = ca giả không có SV). Bắt đầu từ pos[a] = a
+    nên kết quả không bao giờ tệ hơn cách xếp tuần tự. Trả về (pos tốt nhất, thống kê).
+    """
+    rng = np.random.default_rng(seed)
+    n = len(W)
+    pos = np.arange(n)
+    M = W @ pen[:, pos].T  # M[a, q] = chi phí của ca a nếu đặt ở vị trí q
+    cost = 0.5 * float((W * pen[np.ix_(pos, pos)]).sum())
+    best_pos, best_cost = pos.copy(), cost
+    stats = {'before': cost, 'swaps': 0, 'kicks': 0}
+    deadline = time.perf_counter() + time_limit
+
+    def swap(a, b):
+        nonlocal M
+        pa, pb = pos[a], pos[b]
+        diff = pen[:, pb] - pen[:, pa]
+        M += np.outer(W[:, a], diff) - np.outer(W[:, b], diff)
+        pos[a], pos[b] = pb, pa
+
+    while n > 1 and time.perf_counter() < deadline:
+        if should_stop is not None and should_stop():
+            break
+        A = M[:, pos]
+        d = np.diag(A)
+        delta = A - d[:, None] + A.T - d[None, :] + 2 * W * pen[np.ix_(pos, pos)]
+        np.fill_diagonal(delta, 0)
+        a, b = divmod(int(delta.argmin()), n)
+        if delta[a, b] < -1e-9:
+            cost += float(delta[a, b])
+            swap(a, b)
+            stats['swaps'] += 1
+            if cost < best_cost - 1e-9:
+                best_pos, best_cost = pos.copy(), cost
+            continue
+        if best_cost <= 0:
+            break
+        # Cực tiểu địa phương: đổi ngẫu nhiên vài cặp rồi leo dốc tiếp
+        stats['kicks'] += 1
+        for _ in range(KICK_SWAPS):
+            a, b = rng.choice(n, size=2, replace=False)
+            swap(a, b)
+        cost = 0.5 * float((W * pen[np.ix_(pos, pos)]).sum())
+
+    stats['after'] = best_cost
+    return best_pos, stats
+
+
+def plan_days(schedule, shared_counts, per_day, time_limit=2.0, seed=0, should_stop=None):
+    """Gán mỗi ca thi (1..K) vào (chỉ số ngày 0-based, ca trong ngày 1-based)
+
+    Số ngày giữ nguyên ceil(K / per_day); trả về ({ca: (ngày, ca trong ngày)}, thống kê)
+    với thống kê gồm số lượt thi cùng ngày / liền ca / ngày liên tiếp trước và sau khi tối ưu.
+    """
+    n_slots = max(schedule.values(), default=0)
+    n_days = -(-n_slots // per_day)
+    size = n_days * per_day
+    W = np.zeros((size, size))
+    W[:n_slots, :n_slots] = slot_matrix(schedule, shared_counts, n_slots)
+    pen = penalty_matrix(n_days, per_day)
+
+    pos, stats = optimize_positions(W, pen, time_limit, seed, should_stop)
+    stats['before_counts'] = day_penalties(W, np.arange(size), per_day)
+    stats['after_counts'] = day_penalties(W, pos, per_day)
+    plan = {slot: (int(pos[slot - 1]) // per_day, int(pos[slot - 1]) % per_day + 1)
+            for slot in range(1, n_slots + 1)}
+    return plan, stats
@@ -0,0 +1,170 @@
+"""Lõi DSatur trên chỉ số nguyên (đỉnh 0..n-1, danh sách kề adj[v])
+
+Mỗi đỉnh giữ 1 bitmask các màu đã bị hàng xóm dùng (bit c = màu c bị cấm),
+cập nhật tăng dần khi hàng xóm được tô nên mỗi bước chỉ tốn O(bậc).
+Đỉnh được chọn qua các bucket độ bão hoà (mỗi bucket 1 heap số nguyên nhỏ) thay cho
+1 heap chung chứa tuple (saturation, bậc, đỉnh).
+dsatur_capacity thêm giới hạn tổng số SV mỗi ca (số chỗ ngồi của các phòng thi).
+Truyền counters (dict) để vòng lặp tự đếm pops / stale_pops / saturation_updates /
+neighbor_scans; counters=None (mặc định) thì không đếm gì.
+"""
+from heapq import heappop, heappush
+
+
+def first_free_color(mask):
+    """Màu nhỏ nhất (0-based) chưa có trong mask: bit 0 thấp nhất của mask"""
+    return ((~mask) & (mask + 1)).bit_length() - 1
+
+
+def to_adjacency(subjects, conflict_graph):
+    """Chuyển đồ thị {môn: set(môn)} sang danh sách kề theo chỉ số của subjects
+
+    View trên EnrollmentModel thì đọc thẳng mảng CSR của model.
+    """
+    model = getattr(conflict_graph, 'model', None)
+    if model is not None:
+        return model.adjacency(subjects)
+    index = {s: i for i, s in enumerate(subjects)}
+    return [[index[n] for n in conflict_graph.get(s, ())] for s in subjects]
+
+
+class SaturationQueue:
+    """Hàng đợi chọn đỉnh DSatur: mỗi độ bão hoà 1 heap nhỏ chứa thứ hạng (rank) các đỉnh
+
+    - forbidden[v]: bitmask các màu hàng xóm của v đã dùng, saturation[v] = số bit của nó.
+    - buckets[s]: heap các rank của đỉnh chưa tô có saturation = s. Thứ hạng sắp theo
+      (bậc giảm dần, chỉ số tăng dần) nên đỉnh ưu tiên nhất trong bucket là rank nhỏ nhất,
+      heap chỉ chứa số nguyên nên so sánh hoà rất rẻ.
+    - max_sat: bucket cao nhất có thể còn đỉnh, chỉ giảm khi bucket đó rỗng.
+    Khi saturation của đỉnh tăng, rank được đẩy vào bucket mới và phần tử ở bucket cũ thành
+    cũ (stale), bị bỏ qua khi pop. Mỗi đỉnh có tối đa 1 phần tử ở mỗi bucket nên tổng số
+    phần tử <= n + số lần cập nhật saturation, mỗi lần đẩy / lấy O(log kích thước bucket).
+    counters: dict nhận các bộ đếm của vòng lặp (None = không đếm).
+    """
+
+    def __init__(self, adj, order=None, counters=None):
+        n = len(adj)
+        self.adj = adj
+        self.counters = counters
+        if order is None:
+            order = sorted(range(n), key=lambda v: (-len(adj[v]), v))
+        self.vertex_at = list(order)
+        self.rank = [0] * n
+        for r, v in enumerate(self.vertex_at):
+            self.rank[v] = r
+
+        self.color = [-1] * n
+        self.forbidden = [0] * n
+        self.saturation = [0] * n
+        self.buckets = [list(range(n))]  # dãy tăng dần đã là 1 heap
+        self.max_sat = 0
+        self.remaining = n
+
+    def __len__(self):
+        return self.remaining
+
+    def pop(self):
+        """Lấy đỉnh chưa tô có saturation lớn nhất (hoà: bậc lớn hơn, rồi thứ hạng nhỏ hơn)"""
+        bucket = self.buckets[self.max_sat]
+        stale = 0
+        while True:
+            if bucket:
+                v = self.vertex_at[heappop(bucket)]
+                if self.color[v] < 0 and self.saturation[v] == self.max_sat:
+                    break
+                stale += 1
+            else:
+                self.max_sat -= 1
+                bucket = self.buckets[self.max_sat]
+        self.remaining -= 1
+        if self.counters is not None:
+            add_counts(self.counters, pops=stale + 1, stale_pops=stale)
+        return v
+
+    def assign(self, v, c):
+        """Tô đỉnh v màu c (v đã được pop) và cập nhật saturation của các hàng xóm chưa tô"""
+        self.color[v] = c
+        bit = 1 << c
+        color, forbidden, saturation = self.color, self.forbidden, self.saturation
+        updates = 0
+        for w in self.adj[v]:
+            if color[w] < 0 and not forbidden[w] & bit:
+                forbidden[w] |= bit
+                s = saturation[w] = saturation[w] + 1
+                if s == len(self.buckets):
+                    self.buckets.append([])
+                heappush(self.buckets[s], self.rank[w])
+                if s > self.max_sat:
+                    self.max_sat = s
+                updates += 1
+        if self.counters is not None:
+            add_counts(self.counters, saturation_updates=updates, neighbor_scans=len(self.adj[v]))
+
+    def first_free_color(self, v):
+        return first_free_color(self.forbidden[v])
+
+
+def dsatur_buckets(adj, order=None, counters=None):
+    """DSatur dùng SaturationQueue, trả về list màu (0-based) cho từng đỉnh
+
+    order: thứ tự ưu tiên khi hoà (mặc định bậc giảm dần, chỉ số tăng dần).
+    """
+    queue = SaturationQueue(adj, order, counters)
+    while len(queue):
+        v = queue.pop()
+        queue.assign(v, queue.first_free_color(v))
+    return queue.color
+
+
+def add_counts(counters, **values):
+    """Cộng dồn các bộ đếm vào dict counters"""
+    for name, value in values.items():
+        counters[name] = counters.get(name, 0) + value
+
+
+class SlotCapacity:
+    """Số chỗ còn trống của từng ca, mảng theo chỉ số ca nên kiểm tra 1 ca là O(1)
+
+    full: bitmask các ca không còn đủ chỗ cho môn nhỏ nhất, gộp vào mask màu bị cấm
+    để bỏ qua các ca đã đầy mà không cần kiểm tra từng ca.
+    """
+
+    def __init__(self, capacity, min_size=0):
+        self.capacity = capacity
+        self.min_size = min_size
+        self.remaining = []
+        self.full = 0
+
+    def fits(self, c, size):
+        return c >= len(self.remaining) or self.remaining[c] >= size
+
+    def take(self, c, size):
+        while c >= len(self.remaining):
+            self.remaining.append(self.capacity)
+        self.remaining[c] -= size
+        if self.remaining[c] < self.min_size:
+            self.full |= 1 << c
+
+
+def dsatur_capacity(adj, sizes, capacity, order=None, counters=None):
+    """DSatur với tổng sizes của mỗi màu không vượt quá capacity, trả về list màu (0-based)
+
+    Đỉnh được chọn như DSatur thường; màu là màu nhỏ nhất không bị hàng xóm dùng
+    và còn đủ chỗ, nếu không có thì mở màu mới.
+    """
+    for v, size in enumerate(sizes):
+        if size > capacity:
+            raise ValueError(f"Đỉnh {v} cần {size} chỗ, vượt quá sức chứa {capacity}")
+    queue = SaturationQueue(adj, order, counters)
+    slots = SlotCapacity(capacity, min(sizes, default=0))
+    while len(queue):
+        v = queue.pop()
+        size = sizes[v]
+        mask = queue.forbidden[v] | slots.full
+        c = first_free_color(mask)
+        while not slots.fits(c, size):
+            mask |= 1 << c
+            c = first_free_color(mask)
+        slots.take(c, size)
+        queue.assign(v, c)
+    return queue.color
@@ -0,0 +1,107 @@
+"""Cache dữ liệu đăng ký đã làm sạch trên đĩa, theo hash nội dung file Excel
+
+Khoá = sha256(nội dung workbook) + phiên bản bộ đọc, nên mở lại cùng 1 file
+(dù đổi tên/đường dẫn) sẽ bỏ qua bước đọc Excel. Mỗi mục là 1 file .npz
+lưu theo cột: MaSV dạng mảng chuỗi, HoTen và ChuongTrinh dạng mã số + danh mục.
+Tổng dung lượng bị giới hạn, vượt quá thì xoá mục dùng lâu nhất (LRU theo mtime).
+"""
+import hashlib
+import os
+import tempfile
+
+from xlsx_reader import PARSER_VERSION
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'exam_scheduler')
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def file_digest(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _encode(column):
+    import numpy as np
+    import pandas as pd
+
+    codes, categories = pd.factorize(column)
+    return codes.astype(np.int32), np.asarray(categories, dtype=str)
+
+
+class EnrollmentCache:
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or os.environ.get('EXAM_SCHEDULER_CACHE', DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes
+
+    def key(self, path):
+        return f"{file_digest(path)}-v{PARSER_VERSION}"
+
+    def _entry(self, key):
+        return os.path.join(self.cache_dir, key + '.npz')
+
+    def get(self, key):
+        """Trả về (data, n_sheets) nếu có trong cache, ngược lại None"""
+        entry = self._entry(key)
+        if not os.path.exists(entry):
+            return None
+        import numpy as np
+        import pandas as pd
+
+        with np.load(entry, allow_pickle=False) as npz:
+            data = pd.DataFrame({
+                'MaSV': npz['masv'],
+                'HoTen': pd.Categorical.from_codes(npz['hoten_codes'], npz['hoten_names']),
+                'ChuongTrinh': pd.Categorical.from_codes(npz['subject_codes'], npz['subject_names']),
+            })
+            n_sheets = int(npz['n_sheets'])
+        os.utime(entry)  # đánh dấu vừa dùng cho LRU
+        return data, n_sheets
+
+    def put(self, key, data, n_sheets):
+        import numpy as np
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        hoten_codes, hoten_names = _encode(data['HoTen'])
+        subject_codes, subject_names = _encode(data['ChuongTrinh'])
+
+        # Ghi ra file tạm rồi đổi tên để không bao giờ để lại mục cache hỏng
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f,
+                         masv=np.asarray(data['MaSV'], dtype=str),
+                         hoten_codes=hoten_codes, hoten_names=hoten_names,
+                         subject_codes=subject_codes, subject_names=subject_names,
+                         n_sheets=np.int64(n_sheets))
+            os.replace(tmp, self._entry(key))
+        except Exception:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self.evict()
+
+    def evict(self):
+        """Xoá các mục dùng lâu nhất cho tới khi tổng dung lượng <= max_bytes"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.npz'):
+                full = os.path.join(self.cache_dir, name)
+                st = os.stat(full)
+                entries.append((st.st_mtime, st.st_size, full))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, full in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(full)
+            total -= size
+
+    def clear(self):
+        if os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if name.endswith('.npz'):
+                    os.remove(os.path.join(self.cache_dir, name))
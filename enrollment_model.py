@@ -0,0 +1,405 @@
+"""Mô hình đăng ký gọn: MSSV và tên môn được mã hoá thành số int32 liên tục, lưu dạng CSR
+
+Thay cho các defaultdict(set) khoá bằng chuỗi (mỗi phần tử là 1 object Python):
+- student_indptr/student_indices: các môn (mã) của từng SV, SV sắp theo MSSV;
+- subject_indptr/subject_indices: các SV (mã) của từng môn, môn sắp theo tên;
+- adj_indptr/adj_indices/adj_shared: đồ thị xung đột đối xứng và số SV chung mỗi cạnh;
+- names: họ tên SV dạng pandas Categorical (mỗi tên khác nhau chỉ lưu 1 lần).
+
+Các hàm cũ vẫn dùng được qua view chỉ đọc (CsrView, SharedCounts, StudentNames) có cùng
+giao diện dict: view[môn] trả về CodeSet - len / in / & chạy trên mảng mã, không tạo set chuỗi.
+Các bước nặng (danh sách kề, kiểm tra lịch) đọc thẳng mảng qua thuộc tính .model của view.
+Cập nhật đăng ký tăng dần dùng OverlayView: chỉ các dòng bị sửa được chép ra set, phần còn
+lại vẫn đọc từ CSR.
+"""
+from collections.abc import ItemsView, Mapping, MutableMapping, Set
+
+import numpy as np
+
+
+def co_enrollment_edges(stu_codes, subj_codes, n_subjects):
+    """Tính cạnh xung đột = phần ngoài đường chéo của B^T B (B: ma trận liên thuộc sinh viên x môn)
+
+    stu_codes phải được sắp xếp tăng dần. Thay vì nhân ma trận, sinh trực tiếp mọi cặp môn
+    (i < j) trong nhóm của từng sinh viên rồi đếm bằng np.unique.
+    Trả về (u, v, shared): u < v, shared = số sinh viên chung của 2 môn
+    """
+    n = len(stu_codes)
+    empty = np.zeros(0, dtype=np.int64)
+    if n == 0:
+        return empty, empty, empty
+
+    # Vị trí kết thúc nhóm của mỗi dòng -> số môn đứng sau nó trong cùng sinh viên
+    starts = np.flatnonzero(np.r_[True, stu_codes[1:] != stu_codes[:-1]])
+    group_end = np.repeat(np.r_[starts[1:], n], np.diff(np.r_[starts, n]))
+    partners = group_end - np.arange(n) - 1
+
+    total = int(partners.sum())
+    if total == 0:
+        return empty, empty, empty
+
+    left = np.repeat(np.arange(n), partners)
+    # offset trong từng khối lặp: 1, 2, ..., partners[i]
+    block_start = np.repeat(np.cumsum(partners) - partners, partners)
+    right = left + (np.arange(total) - block_start) + 1
+
+    a = subj_codes[left]
+    b = subj_codes[right]
+    lo = np.minimum(a, b)
+    hi = np.maximum(a, b)
+    pair_keys, shared = np.unique(lo * n_subjects + hi, return_counts=True)
+    return pair_keys // n_subjects, pair_keys % n_subjects, shared
+
+
+def _csr(rows, cols, n_rows):
+    """(indptr int64, thứ tự sắp theo (rows, cols)) của ma trận thưa có n_rows dòng"""
+    order = np.lexsort((cols, rows))
+    return np.searchsorted(rows[order], np.arange(n_rows + 1)).astype(np.int64), order
+
+
+class CodeSet(Set):
+    """Tập chỉ đọc trên 1 đoạn mã đã sắp xếp của CSR; duyệt ra nhãn (MSSV / tên môn)"""
+
+    __slots__ = ('codes', 'labels', 'lookup')
+
+    def __init__(self, codes, labels, lookup):
+        self.codes = codes
+        self.labels = labels
+        self.lookup = lookup
+
+    @classmethod
+    def _from_iterable(cls, it):
+        return frozenset(it)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __iter__(self):
+        return iter(self.labels[self.codes].tolist())
+
+    def __contains__(self, label):
+        code = self.lookup(label)
+        if code < 0:
+            return False
+        i = np.searchsorted(self.codes, code)
+        return i < len(self.codes) and self.codes[i] == code
+
+    def __and__(self, other):
+        if isinstance(other, CodeSet) and other.labels is self.labels:
+            common = np.intersect1d(self.codes, other.codes, assume_unique=True)
+            return frozenset(self.labels[common].tolist())
+        return frozenset(x for x in other if x in self)
+
+    __rand__ = __and__
+
+    def __repr__(self):
+        return f"CodeSet({set(self)!r})"
+
+
+class CsrView(Mapping):
+    """Mapping chỉ đọc nhãn -> CodeSet trên 1 CSR, dùng thay cho defaultdict(set)"""
+
+    def __init__(self, model, keys, key_lookup, indptr, indices, labels, label_lookup):
+        self.model = model
+        self._keys = keys
+        self._key_lookup = key_lookup
+        self._indptr = indptr
+        self._indices = indices
+        self._labels = labels
+        self._label_lookup = label_lookup
+
+    def __getitem__(self, key):
+        i = self._key_lookup(key)
+        if i < 0:
+            raise KeyError(key)
+        return CodeSet(self._indices[self._indptr[i]:self._indptr[i + 1]], self._labels, self._label_lookup)
+
+    def __contains__(self, key):
+        return self._key_lookup(key) >= 0
+
+    def __iter__(self):
+        return iter(self._keys.tolist())
+
+    def __len__(self):
+        return len(self._keys)
+
+    def iter_items(self):
+        """(nhãn, frozenset nhãn) theo thứ tự dòng CSR: đổi mã ra nhãn 1 lần cho cả mảng"""
+        values = self._labels[self._indices].tolist()
+        bounds = self._indptr.tolist()
+        for i, key in enumerate(self._keys.tolist()):
+            yield key, frozenset(values[bounds[i]:bounds[i + 1]])
+
+    def items(self):
+        return _RowItems(self)
+
+
+class _RowItems(ItemsView):
+    def __iter__(self):
+        return self._mapping.iter_items()
+
+
+class SharedCounts(Mapping):
+    """Mapping chỉ đọc (môn a, môn b) -> số SV chung với a < b, đọc từ adj_shared"""
+
+    def __init__(self, model):
+        self.model = model
+
+    def __getitem__(self, pair):
+        m = self.model
+        a, b = m.subject_code(pair[0]), m.subject_code(pair[1])
+        if a >= 0 and b >= 0 and a < b:
+            start, stop = m.adj_indptr[a], m.adj_indptr[a + 1]
+            i = start + np.searchsorted(m.adj_indices[start:stop], b)
+            if i < stop and m.adj_indices[i] == b:
+                return int(m.adj_shared[i])
+        raise KeyError(pair)
+
+    def iter_items(self):
+        m = self.model
+        u, v, w = m.edges()
+        names = m.subjects
+        return (((names[a], names[b]), c) for a, b, c in zip(u.tolist(), v.tolist(), w.tolist()))
+
+    def __iter__(self):
+        return (pair for pair, _ in self.iter_items())
+
+    def __len__(self):
+        return len(self.model.adj_indices) // 2
+
+    def items(self):
+        return _RowItems(self)
+
+
+class StudentNames(Mapping):
+    """Mapping chỉ đọc MSSV -> họ tên, tên lấy từ Categorical của mô hình"""
+
+    def __init__(self, model):
+        self.model = model
+
+    def __getitem__(self, sid):
+        i = self.model.student_code(sid)
+        if i < 0:
+            raise KeyError(sid)
+        return self.model.names[i]
+
+    def __contains__(self, sid):
+        return self.model.student_code(sid) >= 0
+
+    def __iter__(self):
+        return iter(self.model.student_ids.tolist())
+
+    def __len__(self):
+        return len(self.model.student_ids)
+
+    def iter_items(self):
+        return zip(self.model.student_ids.tolist(), np.asarray(self.model.names).tolist())
+
+    def items(self):
+        return _RowItems(self)
+
+
+class OverlayView(MutableMapping):
+    """Mapping sửa được đặt trên 1 view chỉ đọc (CsrView / SharedCounts / StudentNames)
+
+    Dòng nào bị sửa mới được chép ra (mutable(key) chép dòng CSR thành set 1 lần, O(bậc));
+    dòng khác đọc thẳng từ view gốc. Không có thuộc tính .model vì mảng CSR không còn
+    phản ánh các thay đổi: các hàm dùng đường nhanh trên model sẽ đọc qua Mapping như dict.
+    """
+
+    def __init__(self, base):
+        self._base = base
+        self._changed = {}    # khoá -> giá trị mới (set đã chép / giá trị gán)
+        self._new = set()     # khoá không có trong view gốc
+        self._deleted = set()  # khoá của view gốc đã bị xoá
+
+    def __getitem__(self, key):
+        if key in self._changed:
+            return self._changed[key]
+        if key in self._deleted:
+            raise KeyError(key)
+        return self._base[key]
+
+    def mutable(self, key):
+        """set sửa được của key (như defaultdict(set)): chép dòng gốc ở lần sửa đầu tiên"""
+        row = self._changed.get(key)
+        if row is None:
+            row = set(self[key]) if key in self else set()
+            self[key] = row
+        return row
+
+    def __setitem__(self, key, value):
+        if key not in self._changed:
+            if key in self._deleted:
+                self._deleted.discard(key)
+            elif key not in self._base:
+                self._new.add(key)
+        self._changed[key] = value
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self._changed.pop(key, None)
+        if key in self._new:
+            self._new.discard(key)
+        else:
+            self._deleted.add(key)
+
+    def __contains__(self, key):
+        return key in self._changed or (key not in self._deleted and key in self._base)
+
+    def __iter__(self):
+        deleted = self._deleted
+        for key in self._base:
+            if key not in deleted:
+                yield key
+        yield from list(self._new)
+
+    def __len__(self):
+        return len(self._base) - len(self._deleted) + len(self._new)
+
+    def iter_items(self):
+        changed, deleted = self._changed, self._deleted
+        base = self._base.iter_items() if hasattr(self._base, 'iter_items') else self._base.items()
+        for key, value in base:
+            if key in changed:
+                yield key, changed[key]
+            elif key not in deleted:
+                yield key, value
+        for key in list(self._new):
+            yield key, changed[key]
+
+    def items(self):
+        return _RowItems(self)
+
+
+class EnrollmentModel:
+    """Dữ liệu đăng ký đã mã hoá: SV 0..n_students-1 (theo MSSV), môn 0..n_subjects-1 (theo tên)"""
+
+    def __init__(self, student_ids, subjects, names, stu_codes, subj_codes):
+        """stu_codes/subj_codes: các cặp (SV, môn) không trùng, sắp theo SV rồi môn"""
+        self.student_ids = student_ids
+        self.subjects = subjects
+        self.names = names
+        self._subject_labels = np.array(subjects, dtype=object)
+        self._subject_index = {s: i for i, s in enumerate(subjects)}
+        n_students, n_subjects = len(student_ids), len(subjects)
+
+        self.student_indptr = np.searchsorted(stu_codes, np.arange(n_students + 1)).astype(np.int64)
+        self.student_indices = subj_codes.astype(np.int32)
+        self.subject_indptr, order = _csr(subj_codes, stu_codes, n_subjects)
+        self.subject_indices = stu_codes[order].astype(np.int32)
+
+        u, v, shared = co_enrollment_edges(stu_codes, subj_codes, n_subjects)
+        self.adj_indptr, order = _csr(np.r_[u, v], np.r_[v, u], n_subjects)
+        self.adj_indices = np.r_[v, u][order].astype(np.int32)
+        self.adj_shared = np.r_[shared, shared][order].astype(np.int32)
+
+    @classmethod
+    def from_frame(cls, data):
+        """Xây từ DataFrame (MaSV, HoTen, ChuongTrinh); họ tên lấy ở dòng đầu tiên của mỗi MSSV"""
+        import pandas as pd
+
+        stu_codes, students = pd.factorize(data['MaSV'].astype(str).str.strip(), sort=True)
+        # Categorical thì factorize sắp theo thứ tự danh mục, không theo tên -> dùng mảng giá trị
+        subj_codes, subjects = pd.factorize(data['ChuongTrinh'].to_numpy(dtype=object), sort=True)
+        _, first = np.unique(stu_codes, return_index=True)
+        names = pd.Categorical(data['HoTen'].iloc[first]).remove_unused_categories()
+
+        # Bỏ cặp trùng (có thể xuất hiện sau khi strip MSSV), đồng thời sắp theo SV rồi môn
+        n_subjects = max(len(subjects), 1)
+        keys = np.unique(stu_codes.astype(np.int64) * n_subjects + subj_codes)
+        return cls(np.asarray(students, dtype=str), list(subjects), names,
+                   keys // n_subjects, keys % n_subjects)
+
+    def student_code(self, sid):
+        """Mã của MSSV (tìm nhị phân trên student_ids đã sắp), -1 nếu không có"""
+        if not isinstance(sid, str):
+            return -1
+        i = int(np.searchsorted(self.student_ids, sid))
+        return i if i < len(self.student_ids) and self.student_ids[i] == sid else -1
+
+    def subject_code(self, subj):
+        return self._subject_index.get(subj, -1)
+
+    def edges(self):
+        """Các cạnh (u, v, số SV chung) với u < v, theo mã môn"""
+        rows = np.repeat(np.arange(len(self.subjects)), np.diff(self.adj_indptr))
+        upper = rows < self.adj_indices
+        return rows[upper], self.adj_indices[upper], self.adj_shared[upper]
+
+    def adjacency(self, subjects=None):
+        """Danh sách kề theo chỉ số của subjects (mặc định thứ tự của mô hình)"""
+        bounds = self.adj_indptr.tolist()
+        rows = [self.adj_indices[bounds[i]:bounds[i + 1]].tolist() for i in range(len(self.subjects))]
+        if subjects is None or subjects is self.subjects or subjects == self.subjects:
+            return rows
+        codes = [self._subject_index[s] for s in subjects]
+        position = {c: i for i, c in enumerate(codes)}
+        return [[position[w] for w in rows[c] if w in position] for c in codes]
+
+    def student_rows(self, schedule, names=None, position=None):
+        """Sinh (MSSV, họ tên, ca, môn) theo MSSV rồi (ca, tên môn), như iter_student_rows
+
+        names: Mapping MSSV -> họ tên khác với tên trong mô hình (None = dùng self.names).
+        position: Mapping ca -> thứ tự ca khi xuất (None = theo mã số ca).
+        """
+        slots = [schedule.get(s, 0) for s in self.subjects]
+        keys = slots if position is None else [position.get(ca, 0) for ca in slots]
+        # Thứ hạng (ca, tên môn) của từng môn -> sắp các môn trong mỗi dòng CSR 1 lần bằng lexsort
+        rank = np.empty(len(self.subjects), dtype=np.int64)
+        rank[sorted(range(len(self.subjects)), key=lambda c: (keys[c], self.subjects[c]))] = \
+            np.arange(len(self.subjects))
+        rows = np.repeat(np.arange(len(self.student_ids)), np.diff(self.student_indptr))
+        codes = self.student_indices[np.lexsort((rank[self.student_indices], rows))].tolist()
+
+        ids = self.student_ids.tolist()
+        if names is None:
+            labels = np.asarray(self.names).tolist()
+        else:
+            labels = [names.get(sid, "N/A") for sid in ids]
+        bounds = self.student_indptr.tolist()
+        for i, sid in enumerate(ids):
+            name = labels[i]
+            for c in codes[bounds[i]:bounds[i + 1]]:
+                yield sid, name, slots[c] or None, self.subjects[c]
+
+    def same_slot_edges(self, schedule):
+        """Các cặp môn (a, b), a < b, có SV chung mà cùng ca (môn chưa xếp ca coi như cùng 1 ca)"""
+        slots = np.array([schedule.get(s, -1) for s in self.subjects] or [0], dtype=np.int64)
+        u, v, _ = self.edges()
+        bad = np.flatnonzero(slots[u] == slots[v])
+        return [(self.subjects[a], self.subjects[b]) for a, b in zip(u[bad].tolist(), v[bad].tolist())]
+
+    def graph(self):
+        """(subjects, student_subjects, subject_students, conflict_graph, shared_counts) dạng view
+
+        2 môn xung đột nếu có sinh viên chung; shared_counts = {(môn a, môn b): số sinh viên chung}
+        với a < b. Các view chỉ đọc, dùng như dict set.
+        """
+        students, subjects = self.student_ids, self._subject_labels
+        return (self.subjects,
+                CsrView(self, students, self.student_code, self.student_indptr, self.student_indices,
+                        subjects, self.subject_code),
+                CsrView(self, subjects, self.subject_code, self.subject_indptr, self.subject_indices,
+                        students, self.student_code),
+                CsrView(self, subjects, self.subject_code, self.adj_indptr, self.adj_indices,
+                        subjects, self.subject_code),
+                SharedCounts(self))
+
+    def name_index(self):
+        return StudentNames(self)
+
+    def overlay(self):
+        """Như graph() nhưng sửa được (cho cập nhật đăng ký tăng dần): OverlayView trên từng view
+
+        Chỉ chép list tên môn (O(số môn)); các dòng CSR chỉ được chép khi bị sửa.
+        """
+        subjects, *views = self.graph()
+        return (list(subjects), *(OverlayView(view) for view in views))
+
+    def nbytes(self):
+        """Dung lượng (byte) của các mảng và danh mục tên"""
+        arrays = (self.student_ids, self.student_indptr, self.student_indices, self.subject_indptr,
+                  self.subject_indices, self.adj_indptr, self.adj_indices, self.adj_shared)
+        return sum(a.nbytes for a in arrays) + int(self.names.memory_usage(deep=True))
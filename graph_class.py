@@ -1,19 +1,154 @@
-# graph_class.py
+import numpy as np
+
+
+# Số cạnh lẻ (add_edge) tối thiểu được giữ ngoài CSR trước khi gộp lại
+EXTRA_FLUSH_MIN = 1024
+
+
+class _ReadOnlyRows(tuple):
+    """Tuple chặn gán phần tử: ghi vào adj_matrix (bản sao) báo lỗi thay vì mất âm thầm"""
+
+    def __setitem__(self, key, value):
+        raise TypeError("adj_matrix chỉ đọc (được tạo lại từ CSR), hãy dùng add_edge / add_edges")
+
+
 class Graph:
+    """Đồ thị vô hướng lưu dạng CSR (indptr/indices) thay cho ma trận kề dày
+
+    - add_edges: lô cạnh được gom vào bộ đệm, gộp vào CSR ở lần truy vấn kế tiếp.
+    - add_edge: cạnh lẻ được giữ trong dict set ngoài CSR; neighbors / has_edge / degrees
+      đọc cả 2 phần nên xen kẽ thêm cạnh và truy vấn không phải dựng lại CSR mỗi lần.
+      Chỉ gộp khi số cạnh lẻ vượt 1/4 số cạnh của CSR (chi phí gộp được chia đều).
+    - csr / to_dense / num_edges / adj_matrix trả về cả đồ thị nên luôn gộp hết cạnh chờ.
+    """
+
     def __init__(self, num_vertices):
         self.num_vertices = num_vertices
-        self.adj_matrix = [[0 for _ in range(num_vertices)] for _ in range(num_vertices)]
+        self._indptr = np.zeros(num_vertices + 1, dtype=np.int64)
+        self._indices = np.zeros(0, dtype=np.int32)
+        self._extra = {}           # cạnh lẻ từ add_edge chưa có trong CSR: {u: set(v)}
+        self._extra_count = 0      # số phần tử trong _extra (mỗi cạnh 2 chiều)
+        self._pending_arrays = []  # các lô (u, v) từ add_edges
 
     def add_edge(self, u, v):
         """Thêm cạnh giữa đỉnh u và v"""
-        if u < self.num_vertices and v < self.num_vertices:
-            self.adj_matrix[u][v] = 1
-            self.adj_matrix[v][u] = 1  # Vì đồ thị vô hướng
-        else:
+        if not (0 <= u < self.num_vertices and 0 <= v < self.num_vertices):
             print("Lỗi: Chỉ số đỉnh không hợp lệ!")
+            return
+        u, v = int(u), int(v)
+        if v in self._extra.get(u, ()) or self._csr_has(u, v):
+            return
+        self._extra.setdefault(u, set()).add(v)
+        self._extra.setdefault(v, set()).add(u)
+        self._extra_count += 2
+        if self._extra_count > max(EXTRA_FLUSH_MIN, len(self._indices) // 4):
+            self._flush()
+
+    def add_edges(self, us, vs):
+        """Thêm nhiều cạnh cùng lúc từ 2 mảng đầu mút cùng độ dài"""
+        us = np.asarray(us, dtype=np.int64).ravel()
+        vs = np.asarray(vs, dtype=np.int64).ravel()
+        if len(us) != len(vs):
+            raise ValueError("us và vs phải có cùng độ dài")
+
+        valid = (us >= 0) & (us < self.num_vertices) & (vs >= 0) & (vs < self.num_vertices)
+        if not valid.all():
+            print(f"Lỗi: Bỏ qua {int((~valid).sum())} cạnh có chỉ số đỉnh không hợp lệ!")
+            us, vs = us[valid], vs[valid]
+        if len(us):
+            self._pending_arrays.append((us, vs))
+
+    def _flush(self):
+        """Gộp mọi cạnh đang chờ (cạnh lẻ và các lô) vào CSR (đối xứng, không trùng lặp)"""
+        if not self._extra and not self._pending_arrays:
+            return
+
+        n = self.num_vertices
+        rows = np.repeat(np.arange(n, dtype=np.int64), np.diff(self._indptr))
+        us = [rows]
+        vs = [self._indices.astype(np.int64)]
+        for u, nbrs in self._extra.items():
+            us.append(np.full(len(nbrs), u, dtype=np.int64))
+            vs.append(np.fromiter(nbrs, dtype=np.int64, count=len(nbrs)))
+        for u, v in self._pending_arrays:
+            us.append(u)
+            vs.append(v)
+        u = np.concatenate(us)
+        v = np.concatenate(vs)
+
+        # Đồ thị vô hướng: thêm cả chiều ngược, sắp xếp theo hàng rồi khử trùng
+        keys = np.concatenate([u * n + v, v * n + u])
+        keys.sort()
+        keys = keys[np.r_[True, keys[1:] != keys[:-1]]]
+        self._indices = (keys % n).astype(np.int32)
+        self._indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys // n, minlength=n), out=self._indptr[1:])
+
+        self._extra = {}
+        self._extra_count = 0
+        self._pending_arrays = []
+
+    def _flush_arrays(self):
+        """Chỉ gộp khi có lô cạnh từ add_edges (cạnh lẻ vẫn để ngoài CSR)"""
+        if self._pending_arrays:
+            self._flush()
+
+    def _csr_has(self, u, v):
+        row = self._indices[self._indptr[u]:self._indptr[u + 1]]
+        i = np.searchsorted(row, v)
+        return i < len(row) and row[i] == v
+
+    def neighbors(self, u):
+        """Danh sách đỉnh kề của u (mảng đã sắp xếp), O(bậc)"""
+        self._flush_arrays()
+        row = self._indices[self._indptr[u]:self._indptr[u + 1]]
+        extra = self._extra.get(u)
+        if extra:
+            row = np.union1d(row, np.fromiter(extra, dtype=np.int32, count=len(extra)))
+        return row
+
+    def has_edge(self, u, v):
+        self._flush_arrays()
+        return v in self._extra.get(u, ()) or bool(self._csr_has(u, v))
+
+    def degrees(self):
+        """Vector bậc của tất cả các đỉnh"""
+        self._flush_arrays()
+        deg = np.diff(self._indptr)
+        for u, nbrs in self._extra.items():
+            deg[u] += len(nbrs)
+        return deg
+
+    def num_edges(self):
+        self._flush()
+        loops = int(np.count_nonzero(self._indices == np.repeat(
+            np.arange(self.num_vertices), np.diff(self._indptr))))
+        return (len(self._indices) + loops) // 2
+
+    def csr(self):
+        """Trả về (indptr, indices) của đồ thị"""
+        self._flush()
+        return self._indptr, self._indices
+
+    def to_dense(self, dtype=np.int8):
+        """Xuất ma trận kề dày - chỉ nên dùng cho đồ thị nhỏ"""
+        self._flush()
+        mat = np.zeros((self.num_vertices, self.num_vertices), dtype=dtype)
+        rows = np.repeat(np.arange(self.num_vertices), np.diff(self._indptr))
+        mat[rows, self._indices] = 1
+        return mat
+
+    @property
+    def adj_matrix(self):
+        """Ma trận kề dạng tuple-of-tuples chỉ đọc (tương thích code cũ), tạo khi được gọi
+
+        Là bản sao nên không thể sửa đồ thị qua nó: `g.adj_matrix[u][v] = 1` báo TypeError,
+        hãy dùng g.add_edge(u, v).
+        """
+        return _ReadOnlyRows(_ReadOnlyRows(row) for row in self.to_dense().tolist())
 
     def display(self):
         """Hiển thị ma trận kề"""
         print("Ma trận kề:")
         for row in self.adj_matrix:
-            print(row)
+            print(list(row))
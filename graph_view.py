@@ -0,0 +1,179 @@
+"""Vẽ đồ thị xung đột thành ảnh PNG, chạy được ở thread nền (không dùng pyplot)
+
+- Layout (spring_layout) được cache theo cấu trúc đồ thị: chạy lại DSatur chỉ đổi màu
+  các đỉnh, không tính lại bố cục.
+- Đồ thị nhỏ vẽ đầy đủ từng môn; đồ thị lớn hoặc dày tự chuyển sang ma trận kề sắp theo ca
+  (gộp thành ô khi quá nhiều môn), lịch hợp lệ thì các khối trên đường chéo trống.
+"""
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from importlib.util import find_spec
+
+# networkx / matplotlib mất vài giây để import: lúc khởi động chỉ kiểm tra đã cài chưa,
+# import thật ở lần vẽ đầu tiên (load_backend) hoặc khi warmup nạp trước ở thread nền
+HAS_GRAPH = find_spec('networkx') is not None and find_spec('matplotlib') is not None
+nx = FigureCanvasAgg = LineCollection = Figure = None
+_backend_lock = threading.Lock()
+
+
+DETAIL_MAX_NODES = 150   # trên ngưỡng này vẽ ma trận kề thay cho từng đỉnh
+DETAIL_MAX_EDGES = 1500  # đồ thị quá dày cũng vẽ ma trận kề (các cạnh sẽ che hết đỉnh)
+LABEL_MAX_NODES = 60     # trên ngưỡng này không ghi tên môn
+HEATMAP_MAX_BINS = 400   # số ô tối đa mỗi chiều của ma trận kề
+SLOT_LINES_MAX = 60      # vẽ đường ranh giới giữa các ca khi số ca không quá ngưỡng này
+
+PALETTE = [
+    '#7c3aed', '#ec4899', '#10b981', '#f59e0b',
+    '#3b82f6', '#ef4444', '#8b5cf6', '#14b8a6',
+    '#f97316', '#06b6d4', '#84cc16', '#f43f5e',
+    '#6366f1', '#a855f7', '#22c55e', '#eab308'
+]
+
+
+def load_backend():
+    """Import networkx và matplotlib (Agg, không cần pyplot) nếu chưa có"""
+    global nx, FigureCanvasAgg, LineCollection, Figure
+    with _backend_lock:
+        if Figure is None:
+            import networkx
+            from matplotlib.backends.backend_agg import FigureCanvasAgg as canvas
+            from matplotlib.collections import LineCollection as lines
+            from matplotlib.figure import Figure as figure
+            nx, FigureCanvasAgg, LineCollection, Figure = networkx, canvas, lines, figure
+
+
+def edge_index(subjects, conflict_graph):
+    """Danh sách cạnh dạng chỉ số (i < j) theo thứ tự subjects"""
+    index = {s: i for i, s in enumerate(subjects)}
+    edges = [(index[u], index[v]) for u, vs in conflict_graph.items() for v in vs
+             if u in index and v in index and index[u] < index[v]]
+    edges.sort()
+    return edges
+
+
+def graph_key(subjects, edges):
+    """Khoá cache: hash của danh sách môn + danh sách cạnh (không phụ thuộc màu)"""
+    import numpy as np
+
+    h = hashlib.sha1()
+    for s in subjects:
+        h.update(str(s).encode('utf-8'))
+        h.update(b'\x00')
+    h.update(np.asarray(edges, dtype=np.int64).tobytes())
+    return h.hexdigest()
+
+
+class LayoutCache:
+    """Giữ layout của vài đồ thị gần nhất (LRU), dùng chung giữa các lần vẽ"""
+
+    def __init__(self, max_entries=8):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        pos = compute()
+        with self._lock:
+            self._entries[key] = pos
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return pos
+
+
+def spring_positions(n, edges):
+    """Toạ độ (n, 2) theo spring_layout với cùng tham số như trước"""
+    import numpy as np
+
+    G = nx.Graph()
+    G.add_nodes_from(range(n))
+    G.add_edges_from(edges)
+    if n < 20:
+        pos = nx.spring_layout(G, k=3, iterations=100, seed=42)
+    else:
+        pos = nx.spring_layout(G, k=2.5, iterations=80, seed=42)
+    return np.array([pos[i] for i in range(n)]) if n else np.zeros((0, 2))
+
+
+def draw_detail(ax, subjects, edges, pos, slots):
+    """Vẽ từng môn: đỉnh tô màu theo ca, chỉ ghi tên khi đồ thị nhỏ"""
+    import numpy as np
+
+    n = len(subjects)
+    if edges:
+        segments = pos[np.asarray(edges)]
+        ax.add_collection(LineCollection(segments, colors="#343453D5", linewidths=2 if n < 60 else 1,
+                                         alpha=0.4, zorder=1))
+    node_size = 2000 if n <= 20 else max(120, 40000 // n)
+    colors = [PALETTE[(slot - 1) % len(PALETTE)] for slot in slots]
+    ax.scatter(pos[:, 0], pos[:, 1], s=node_size, c=colors, edgecolors='gray', linewidths=1, zorder=2)
+    if n <= LABEL_MAX_NODES:
+        for (x, y), subj in zip(pos, subjects):
+            ax.text(x, y, str(subj), fontsize=8, fontweight='bold', ha='center', va='center', zorder=3)
+    ax.autoscale_view()
+    ax.margins(0.08)
+    ax.axis('off')
+    ax.set_title("ĐỒ THỊ XUNG ĐỘT - MỖI MÀU = 1 CA THI", fontsize=18, fontweight='bold', pad=20)
+
+
+def draw_heatmap(ax, subjects, edges, slots):
+    """Ma trận kề với môn sắp theo (ca, tên); quá HEATMAP_MAX_BINS môn thì gộp thành ô"""
+    import numpy as np
+
+    n = len(subjects)
+    order = sorted(range(n), key=lambda i: (slots[i], str(subjects[i])))
+    rank = np.empty(n, dtype=np.int64)
+    rank[order] = np.arange(n)
+
+    bins = min(n, HEATMAP_MAX_BINS)
+    cell = rank * bins // n
+    matrix = np.zeros((bins, bins))
+    if edges:
+        e = np.asarray(edges)
+        a, b = cell[e[:, 0]], cell[e[:, 1]]
+        np.add.at(matrix, (a, b), 1)
+        np.add.at(matrix, (b, a), 1)
+
+    ax.imshow(np.log1p(matrix), cmap='Purples', interpolation='nearest', extent=(0, n, n, 0))
+
+    # Ranh giới giữa các ca: lịch hợp lệ thì không có cạnh nào trong khối vuông trên đường chéo
+    sorted_slots = np.asarray(slots)[order]
+    bounds = np.flatnonzero(np.diff(sorted_slots)) + 1
+    if len(bounds) + 1 <= SLOT_LINES_MAX:
+        for x in bounds:
+            ax.axhline(x, color='#f59e0b', linewidth=0.5, alpha=0.6)
+            ax.axvline(x, color='#f59e0b', linewidth=0.5, alpha=0.6)
+
+    ax.set_xlabel("Môn học (sắp theo ca thi)")
+    ax.set_ylabel("Môn học (sắp theo ca thi)")
+    ax.set_title(f"MA TRẬN XUNG ĐỘT - {n} MÔN, {len(set(slots))} CA", fontsize=16, fontweight='bold', pad=15)
+
+
+def render_png(subjects, conflict_graph, schedule, size=(1200, 900), dpi=100, cache=None):
+    """Vẽ đồ thị (hoặc ma trận kề nếu đồ thị lớn) và trả về nội dung file PNG"""
+    load_backend()
+    subjects = list(subjects)
+    edges = edge_index(subjects, conflict_graph)
+    slots = [schedule.get(s, 1) for s in subjects]
+
+    fig = Figure(figsize=(size[0] / dpi, size[1] / dpi), dpi=dpi, facecolor='white')
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    ax.set_facecolor('#fafafa')
+
+    if len(subjects) <= DETAIL_MAX_NODES and len(edges) <= DETAIL_MAX_EDGES:
+        compute = lambda: spring_positions(len(subjects), edges)
+        pos = cache.get(graph_key(subjects, edges), compute) if cache is not None else compute()
+        draw_detail(ax, subjects, edges, pos, slots)
+    else:
+        draw_heatmap(ax, subjects, edges, slots)
+
+    fig.tight_layout()
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', dpi=dpi)
+    return buf.getvalue()
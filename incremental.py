@@ -0,0 +1,223 @@
+"""Cập nhật lịch thi khi có đăng ký bổ sung / huỷ môn mà không xếp lại từ đầu
+
+1. apply_enrollment_changes sửa trực tiếp student_subjects, subject_students,
+   conflict_graph và shared_counts: chỉ các cặp môn của SV bị thay đổi được cập nhật.
+2. repair_schedule chỉ đổi ca các môn vi phạm (cạnh mới nối 2 môn cùng ca, môn mới chưa có ca):
+   - chuyển sang ca khác không có môn xung đột nếu có;
+   - nếu không, đổi màu 1 chuỗi Kempe (các môn ca c/ca d liên thông) để giải phóng ca c;
+   - cuối cùng mới mở thêm ca mới.
+   Có giới hạn số chỗ mỗi ca thì mọi bước trên đều giữ tổng SV mỗi ca trong sức chứa.
+   Trả về các môn bị đổi ca, các môn khác giữ nguyên ca.
+"""
+from bisect import insort
+
+
+KEMPE_MAX_MOVES = 50  # chuỗi Kempe dài hơn thì bỏ qua (đổi quá nhiều môn)
+
+
+def _pair(a, b):
+    return (a, b) if a < b else (b, a)
+
+
+def _row(mapping, key):
+    """set sửa được của key: defaultdict(set) tạo mới nếu chưa có, OverlayView chép dòng CSR 1 lần"""
+    mutable = getattr(mapping, 'mutable', None)
+    return mutable(key) if mutable is not None else mapping[key]
+
+
+def apply_enrollment_changes(subjects, student_subjects, subject_students, conflict_graph,
+                             shared_counts, added=(), removed=()):
+    """Thêm/bỏ các cặp (MSSV, môn), cập nhật các cấu trúc tại chỗ
+
+    Trả về dict: new_edges / lost_edges (list cặp môn), new_subjects / empty_subjects (list môn).
+    Môn không còn SV nào bị xoá khỏi subjects và đồ thị.
+    Các mapping là defaultdict(set) hoặc OverlayView (chỉ các dòng bị sửa được chép ra).
+    """
+    new_edges, lost_edges = [], []
+    new_subjects, empty_subjects = [], []
+
+    for sid, subj in removed:
+        sid = str(sid).strip()
+        if subj not in student_subjects.get(sid, ()):
+            continue
+        _row(student_subjects, sid).discard(subj)
+        _row(subject_students, subj).discard(sid)
+        for other in student_subjects[sid]:
+            key = _pair(subj, other)
+            shared_counts[key] -= 1
+            if shared_counts[key] == 0:
+                del shared_counts[key]
+                _row(conflict_graph, subj).discard(other)
+                _row(conflict_graph, other).discard(subj)
+                lost_edges.append(key)
+        if not student_subjects[sid]:
+            del student_subjects[sid]
+        if not subject_students[subj]:
+            del subject_students[subj]
+            conflict_graph.pop(subj, None)
+            subjects.remove(subj)
+            empty_subjects.append(subj)
+
+    for sid, subj in added:
+        sid = str(sid).strip()
+        if subj in student_subjects.get(sid, ()):
+            continue
+        if subj not in subject_students:
+            insort(subjects, subj)
+            new_subjects.append(subj)
+        for other in student_subjects.get(sid, ()):
+            key = _pair(subj, other)
+            if key not in shared_counts:
+                shared_counts[key] = 0
+                _row(conflict_graph, subj).add(other)
+                _row(conflict_graph, other).add(subj)
+                new_edges.append(key)
+            shared_counts[key] += 1
+        _row(student_subjects, sid).add(subj)
+        _row(subject_students, subj).add(sid)
+
+    return {'new_edges': new_edges, 'lost_edges': lost_edges,
+            'new_subjects': new_subjects, 'empty_subjects': empty_subjects}
+
+
+def _kempe_chain(conflict_graph, schedule, starts, c, d, limit):
+    """Thành phần liên thông của các môn ca c/d chứa starts, None nếu dài hơn limit"""
+    chain = set(starts)
+    stack = list(starts)
+    while stack:
+        u = stack.pop()
+        want = d if schedule[u] == c else c
+        for w in conflict_graph[u]:
+            if w not in chain and schedule.get(w) == want:
+                chain.add(w)
+                if len(chain) > limit:
+                    return None
+                stack.append(w)
+    return chain
+
+
+def _fits(loads, slot, extra, capacity):
+    return not capacity or loads.get(slot, 0) + extra <= capacity
+
+
+def _place(subj, conflict_graph, schedule, n_slots, limit, sizes=None, capacity=None, loads=None):
+    """Chọn ca cho subj (đang chưa có ca); trả về {môn khác: ca mới} cần đổi theo (có thể rỗng)
+
+    capacity: số chỗ tối đa mỗi ca, loads = {ca: số SV} được cập nhật theo.
+    """
+    size = sizes[subj] if capacity else 0
+    used = {}
+    for w in conflict_graph[subj]:
+        slot = schedule.get(w)
+        if slot is not None:
+            used.setdefault(slot, []).append(w)
+
+    for slot in range(1, n_slots + 1):
+        if slot not in used and _fits(loads, slot, size, capacity):
+            return _assign(subj, slot, {}, schedule, sizes, capacity, loads)
+
+    # Đổi chuỗi Kempe (c, d) chứa các môn kề ở ca c: chúng sang ca d, các môn ca d trong chuỗi sang ca c
+    best = None
+    for c, blockers in used.items():
+        if best is not None and len(blockers) >= len(best[2]):
+            continue
+        for d in range(1, n_slots + 1):
+            if d == c:
+                continue
+            chain = _kempe_chain(conflict_graph, schedule, blockers, c, d,
+                                 limit if best is None else min(limit, len(best[2]) - 1))
+            # Môn kề ở ca d nằm trong chuỗi sẽ bị đổi sang ca c -> vẫn xung đột
+            if chain is None or any(w in chain for w in used.get(d, ())):
+                continue
+            if capacity:
+                # Số SV chuyển từ ca c sang ca d (âm: từ d sang c); subj vào ca c
+                shift = sum(sizes[w] if schedule[w] == c else -sizes[w] for w in chain)
+                if not (_fits(loads, c, size - shift, capacity) and _fits(loads, d, shift, capacity)):
+                    continue
+            if best is None or len(chain) < len(best[2]):
+                best = (c, d, chain)
+
+    if best is None:
+        return _assign(subj, n_slots + 1, {}, schedule, sizes, capacity, loads)
+    c, d, chain = best
+    moves = {w: d if schedule[w] == c else c for w in chain}
+    return _assign(subj, c, moves, schedule, sizes, capacity, loads)
+
+
+def _assign(subj, slot, moves, schedule, sizes, capacity, loads):
+    if capacity:
+        for w, new in moves.items():
+            loads[schedule[w]] -= sizes[w]
+            loads[new] = loads.get(new, 0) + sizes[w]
+        loads[slot] = loads.get(slot, 0) + sizes[subj]
+    schedule.update(moves)
+    schedule[subj] = slot
+    return moves
+
+
+def _overloaded(schedule, sizes, capacity, loads):
+    """Gỡ ca của các môn ở ca vượt sức chứa (SV đăng ký thêm làm môn đông lên), trả về list môn bị gỡ"""
+    members = {}
+    for subj, slot in schedule.items():
+        members.setdefault(slot, []).append(subj)
+    removed = []
+    for slot, load in loads.items():
+        if load <= capacity:
+            continue
+        # Gỡ môn nhỏ nhất đủ đưa ca về dưới sức chứa, không có thì gỡ môn lớn nhất rồi lặp lại
+        subjs = sorted(members[slot], key=lambda s: sizes[s])
+        while load > capacity:
+            excess = load - capacity
+            subj = next((s for s in subjs if sizes[s] >= excess), subjs[-1])
+            subjs.remove(subj)
+            load -= sizes[subj]
+            removed.append(subj)
+        loads[slot] = load
+    for subj in removed:
+        del schedule[subj]
+    return removed
+
+
+def repair_schedule(conflict_graph, schedule, new_edges=(), new_subjects=(), removed_subjects=(),
+                    kempe_limit=KEMPE_MAX_MOVES, sizes=None, capacity=None):
+    """Sửa lịch tại chỗ sau apply_enrollment_changes, trả về {môn: (ca cũ, ca mới)} các môn bị đổi
+
+    Ca cũ = None với môn mới. Chỉ các môn nằm trên cạnh mới bị trùng ca mới được xếp lại.
+    capacity: số chỗ tối đa mỗi ca (sizes = {môn: số SV} sau thay đổi); các môn ở ca bị vượt
+    sức chứa cũng được xếp lại, không đổi ca nào thành vượt sức chứa.
+    """
+    if capacity:
+        too_big = [s for s, size in sizes.items() if size > capacity]
+        if too_big:
+            raise ValueError(f"Môn {too_big[0]} có {sizes[too_big[0]]} SV, vượt quá sức chứa 1 ca ({capacity} chỗ)")
+    for subj in removed_subjects:
+        schedule.pop(subj, None)
+    old = dict(schedule)
+
+    # Mỗi cạnh mới bị trùng ca: gỡ ca của 1 đầu (đầu ít môn kề hơn, dễ xếp lại hơn)
+    dirty = [s for s in new_subjects if s not in schedule]
+    unplaced = set(dirty)
+    for a, b in new_edges:
+        if a in unplaced or b in unplaced or schedule.get(a) != schedule.get(b):
+            continue
+        subj = a if len(conflict_graph[a]) <= len(conflict_graph[b]) else b
+        del schedule[subj]
+        unplaced.add(subj)
+        dirty.append(subj)
+
+    loads = None
+    if capacity:
+        loads = {}
+        for subj, slot in schedule.items():
+            loads[slot] = loads.get(slot, 0) + sizes[subj]
+        dirty.extend(_overloaded(schedule, sizes, capacity, loads))
+
+    n_slots = max(schedule.values(), default=0)
+    # Xếp môn có nhiều ca bị chặn trước (giống DSatur)
+    dirty.sort(key=lambda s: (-len({schedule[w] for w in conflict_graph[s] if w in schedule}),
+                              -len(conflict_graph[s])))
+    for subj in dirty:
+        _place(subj, conflict_graph, schedule, n_slots, kempe_limit, sizes, capacity, loads)
+        n_slots = max(n_slots, schedule[subj])
+
+    return {s: (old.get(s), slot) for s, slot in schedule.items() if old.get(s) != slot}
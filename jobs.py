@@ -0,0 +1,120 @@
+"""Chạy các bước nặng (tải file, xếp lịch, vẽ đồ thị, xuất file) ở thread nền
+
+Thread nền không được đụng vào widget Tk: nó chỉ đẩy tiến độ vào hàng đợi,
+thread Tk đọc hàng đợi bằng root.after và chỉ áp dụng kết quả khi job xong.
+"""
+import queue
+import threading
+
+
+class JobCancelled(BaseException):
+    """Job bị người dùng huỷ
+
+    Kế thừa BaseException (giống KeyboardInterrupt) để không bị các khối
+    `except Exception` bỏ qua lỗi từng sheet nuốt mất.
+    """
+
+
+class Job:
+    """Đối tượng truyền cho hàm chạy nền: báo tiến độ và kiểm tra huỷ"""
+
+    def __init__(self, name):
+        self.name = name
+        self._cancel = threading.Event()
+        self._updates = queue.Queue()
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def check(self):
+        """Gọi ở các điểm an toàn trong hàm chạy nền; ném JobCancelled nếu đã bị huỷ"""
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def progress(self, fraction=None, message=None, check=True):
+        """Báo tiến độ (0..1, None = không xác định) kèm thông điệp; đồng thời kiểm tra huỷ
+
+        check=False dùng cho job tự xử lý huỷ (dừng sớm nhưng vẫn trả về kết quả đang có).
+        """
+        self._updates.put((fraction, message))
+        if check:
+            self.check()
+
+    def log(self, message):
+        self.progress(None, message)
+
+
+class JobRunner:
+    """Mỗi lúc chỉ chạy 1 job. Các callback on_progress/on_done/on_error chạy trên thread Tk"""
+
+    def __init__(self, root, on_progress=None, on_state=None, poll_ms=50):
+        self.root = root
+        self.on_progress = on_progress   # (tên job, fraction, message)
+        self.on_state = on_state         # (đang bận: bool)
+        self.poll_ms = poll_ms
+        self.job = None
+
+    @property
+    def busy(self):
+        return self.job is not None
+
+    def submit(self, name, work, on_done=None, on_error=None):
+        """Chạy work(job) ở thread nền; trả về False nếu đang có job khác chạy"""
+        if self.job is not None:
+            return False
+
+        job = Job(name)
+        box = {}
+
+        def target():
+            try:
+                box['result'] = work(job)
+            except JobCancelled:
+                box['cancelled'] = True
+            except Exception as e:
+                box['error'] = e
+
+        self.job = job
+        thread = threading.Thread(target=target, name=f"job-{name}", daemon=True)
+        thread.start()
+        if self.on_state:
+            self.on_state(True)
+        self.root.after(self.poll_ms, self._poll, job, thread, box, on_done, on_error)
+        return True
+
+    def cancel(self):
+        if self.job is not None:
+            self.job.cancel()
+
+    def _drain(self, job):
+        while True:
+            try:
+                fraction, message = job._updates.get_nowait()
+            except queue.Empty:
+                return
+            if self.on_progress:
+                self.on_progress(job.name, fraction, message)
+
+    def _poll(self, job, thread, box, on_done, on_error):
+        self._drain(job)
+        if thread.is_alive():
+            self.root.after(self.poll_ms, self._poll, job, thread, box, on_done, on_error)
+            return
+
+        self.job = None
+        if self.on_state:
+            self.on_state(False)
+
+        # Job trả về bình thường dù đã bấm huỷ (dừng sớm) thì vẫn dùng kết quả
+        if box.get('cancelled'):
+            if self.on_progress:
+                self.on_progress(job.name, None, "Đã huỷ")
+        elif 'error' in box:
+            if on_error:
+                on_error(box['error'])
+        elif on_done:
+            on_done(box.get('result'))
@@ -0,0 +1,149 @@
+"""Số liệu của 1 lần chạy: thời gian từng bước, bộ đếm, bộ nhớ đỉnh, số dòng đọc được mỗi sheet
+
+Dùng chung cho giao diện (hiện trong ô thống kê), CLI và file log JSON ghi cạnh file xuất.
+RunStats(enabled=False) biến mọi hàm thành no-op: stage() trả về context manager rỗng,
+các bộ đếm không được tính (DSatur chỉ đếm trong vòng lặp khi được truyền dict counters).
+"""
+import importlib
+import json
+import os
+import platform
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+# Đo bộ nhớ đỉnh của tiến trình: resource (Linux/macOS) hoặc psapi (Windows)
+try:
+    import resource
+    HAS_RESOURCE = True
+except ImportError:
+    HAS_RESOURCE = False
+
+
+def peak_rss_mb():
+    """Bộ nhớ đỉnh (MB) của tiến trình hiện tại, None nếu không đo được"""
+    if HAS_RESOURCE:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux trả về KB, macOS trả về byte
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class Counters(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                        ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                        ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+        counters = Counters()
+        counters.cb = ctypes.sizeof(Counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize / (1024 * 1024)
+    except (AttributeError, OSError):
+        pass
+    return None
+
+
+# Thời gian khởi động giao diện: 'window' (dựng cửa sổ) và 'import <module>' cho các thư viện
+# nặng được import muộn (xem warmup), dùng chung cho mọi RunStats trong tiến trình
+STARTUP = {}
+
+
+def timed_import(name):
+    """importlib.import_module có đo thời gian, lần import đầu tiên được ghi vào STARTUP"""
+    module = sys.modules.get(name)
+    if module is None:
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        STARTUP.setdefault(f"import {name}", time.perf_counter() - start)
+    return module
+
+
+def run_log_path(export_path):
+    """LichThi.xlsx -> LichThi_runlog.json (cùng thư mục với file xuất)"""
+    return f"{os.path.splitext(export_path)[0]}_runlog.json"
+
+
+class RunStats:
+    """Gom số liệu của 1 lần chạy (tải file -> xếp lịch -> xuất)
+
+    - stages: {bước: {'seconds', 'calls', 'peak_mb'}}, peak_mb = bộ nhớ đỉnh sau bước đó
+    - counters: {tên: số}, ví dụ dsatur.saturation_updates, improve.tabu_moves
+    - sheet_rows: {sheet: số dòng MSSV hợp lệ đọc được}
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.started = datetime.now()
+        self.stages = {}
+        self.counters = {}
+        self.sheet_rows = {}
+        self.info = {}
+
+    def stage(self, name):
+        return self._stage(name) if self.enabled else nullcontext()
+
+    @contextmanager
+    def _stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry = self.stages.setdefault(name, {'seconds': 0.0, 'calls': 0, 'peak_mb': None})
+            entry['seconds'] += time.perf_counter() - start
+            entry['calls'] += 1
+            entry['peak_mb'] = peak_rss_mb()
+
+    def add(self, name, value=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def update(self, counters, prefix=''):
+        """Ghi đè các bộ đếm (số liệu của lần chạy gần nhất, ví dụ khi xếp lịch lại)"""
+        if self.enabled:
+            for name, value in counters.items():
+                self.counters[prefix + name] = value
+
+    def to_dict(self):
+        return {
+            'started': self.started.isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'info': self.info,
+            'stages': self.stages,
+            'counters': self.counters,
+            'sheet_rows': self.sheet_rows,
+            'startup': dict(STARTUP),
+            'peak_mb': peak_rss_mb(),
+        }
+
+    def report(self):
+        """Bảng text ngắn cho ô thống kê / CLI"""
+        if not self.enabled:
+            return ""
+        lines = [f"{'bước':<14} {'giây':>9} {'RSS MB':>8}"]
+        for name, entry in self.stages.items():
+            peak = f"{entry['peak_mb']:>8.0f}" if entry['peak_mb'] else f"{'-':>8}"
+            lines.append(f"{name:<14} {entry['seconds']:>9.3f} {peak}")
+        for name, value in self.counters.items():
+            lines.append(f"{name:<30} {value:>12,}")
+        if self.sheet_rows:
+            rows = sorted(self.sheet_rows.values())
+            lines.append(f"{'sheet có dữ liệu':<30} {len(rows):>12,}")
+            spread = f"{rows[0]:,}/{sum(rows) // len(rows):,}/{rows[-1]:,}"
+            lines.append(f"{'dòng/sheet (min/tb/max)':<30} {spread:>12}")
+        for name, secs in list(STARTUP.items()):
+            lines.append(f"{name:<36} {secs:>6.3f}s")
+        return "\n".join(lines)
+
+    def write_json(self, path):
+        if not self.enabled:
+            return None
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+        return path
@@ -0,0 +1,81 @@
+"""Xếp lịch thi từ dòng lệnh (không cần màn hình)
+
+Ví dụ:
+    python scheduler_cli.py DangKy.xlsx -o LichThi.xlsx
+    python scheduler_cli.py DangKy.xlsx -o LichThi.xlsx -o LichThi.csv
+"""
+import argparse
+import os
+import sys
+from datetime import datetime
+
+from enrollment_cache import EnrollmentCache
+from run_stats import RunStats
+from scheduler_engine import SchedulingEngine, worker_report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Xếp lịch thi bằng DSatur (không giao diện)")
+    parser.add_argument('workbook', help="File Excel đăng ký (.xlsx)")
+    parser.add_argument('-o', '--output', action='append',
+                        help="File kết quả .xlsx / .csv / .parquet, có thể lặp lại "
+                             "(mặc định: LichThi_<thời gian>.xlsx cạnh file nhập)")
+    parser.add_argument('-j', '--jobs', type=int, default=0,
+                        help="Số tiến trình song song khi đọc sheet / tối ưu (0 = số CPU, 1 = tuần tự)")
+    parser.add_argument('--cache-dir', help="Thư mục cache dữ liệu đã đọc (mặc định ~/.cache/exam_scheduler)")
+    parser.add_argument('--no-cache', action='store_true', help="Luôn đọc lại file Excel, không dùng cache")
+    parser.add_argument('--improve', type=float, default=0, metavar='GIÂY',
+                        help="Dành thêm GIÂY giây để giảm số ca (DSatur ngẫu nhiên + tabu, dùng -j tiến trình)")
+    parser.add_argument('--capacity', type=int, default=0, metavar='CHỖ',
+                        help="Số chỗ ngồi tối đa mỗi ca (tổng SV các môn cùng ca), 0 = không giới hạn")
+    parser.add_argument('--stats', action='store_true',
+                        help="Đo thời gian, bộ đếm, bộ nhớ từng bước; ghi thêm <file xuất>_runlog.json")
+    parser.add_argument('-q', '--quiet', action='store_true', help="Không in log từng sheet")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    out_paths = args.output or [os.path.join(
+        os.path.dirname(os.path.abspath(args.workbook)),
+        f"LichThi_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx")]
+
+    engine = SchedulingEngine(log=(lambda msg: None) if args.quiet else print,
+                              workers=args.jobs or None,
+                              cache=None if args.no_cache else EnrollmentCache(args.cache_dir),
+                              capacity=args.capacity or None,
+                              stats=RunStats(enabled=args.stats))
+    try:
+        num_slots = engine.run_all(args.workbook, out_paths, improve_budget=args.improve,
+                                   improve_workers=args.jobs or None)
+    except Exception as e:
+        print(f"Lỗi: {e}", file=sys.stderr)
+        return 1
+
+    print(f"Sinh viên: {len(engine.student_subjects):,}")
+    print(f"Môn học:   {len(engine.subjects):,}")
+    print(f"Xung đột:  {engine.edge_count():,} cạnh")
+    print(f"Số ca thi: {num_slots} (cận dưới {engine.bound}{', tối ưu' if engine.is_optimal() else ''})")
+    if engine.capacity:
+        print(f"Sức chứa:  ca đông nhất {engine.max_load():,} / {engine.capacity:,} chỗ")
+    for out_path in engine.outputs:
+        print(f"Đã xuất:   {out_path}")
+    if engine.improve_stats:
+        print("\nTỐI ƯU SỐ CA")
+        print(worker_report(engine.improve_stats))
+    print("\nTHỜI GIAN TỪNG BƯỚC")
+    print(engine.timing_report())
+    if engine.stats.enabled:
+        print("\nĐO ĐẠC")
+        print(engine.stats.report())
+        if engine.run_log:
+            print(f"Log:       {engine.run_log}")
+
+    if engine.conflicts:
+        print(f"\nCÓ {len(engine.conflicts)} SINH VIÊN BỊ TRÙNG CA!", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
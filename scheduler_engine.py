@@ -0,0 +1,607 @@
+"""Lõi xếp lịch thi DSatur - không phụ thuộc Tkinter (dùng cho CLI / chạy trên server)"""
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from itertools import islice
+
+from anytime_solver import improve_coloring
+from clique_bound import QUICK_SEEDS, clique_lower_bound
+from component_solver import (EXACT_MAX_NODES, color_by_components, connected_components,
+                              exact_coloring, subgraph)
+from dsatur_core import dsatur_capacity, to_adjacency
+from enrollment_model import EnrollmentModel, OverlayView
+from incremental import apply_enrollment_changes, repair_schedule
+from run_stats import RunStats, run_log_path
+from table_writers import write_tables
+from xlsx_reader import is_masv_col, read_enrollments_parallel, read_enrollments_streaming
+
+
+def read_sheet(excel, sheet):
+    """Đọc 1 sheet, trả về DataFrame (MaSV, HoTen, ChuongTrinh) hoặc None nếu không có dữ liệu"""
+    import pandas as pd
+
+    df = pd.read_excel(excel, sheet_name=sheet, header=None, dtype=str, engine='openpyxl')
+    df = df.fillna('')
+
+    # Tìm dòng header (chứa "Mã SV" hoặc "MSSV") trong 5 dòng đầu
+    header_row = None
+    for idx in range(min(5, len(df))):
+        row_text = ' '.join(df.iloc[idx].astype(str).str.lower().tolist())
+        if is_masv_col(row_text):
+            header_row = idx
+            break
+
+    if header_row is None:
+        return None
+
+    # Tên môn học: ô đầu tiên phía trên header, nếu không có thì dùng tên sheet
+    subject_name = sheet
+    if header_row > 0:
+        first_cell = str(df.iloc[0, 0]).strip()
+        if first_cell:
+            subject_name = first_cell
+
+    df.columns = df.iloc[header_row]
+    df = df.iloc[header_row + 1:].reset_index(drop=True)
+
+    masv_col = None
+    hoten_col = None
+    for col in df.columns:
+        col_str = str(col).lower().strip()
+        if is_masv_col(col_str):
+            masv_col = col
+        if 'họ' in col_str and 'tên' in col_str:
+            hoten_col = col
+        elif 'tên' in col_str and hoten_col is None:
+            hoten_col = col
+
+    if masv_col is None:
+        return None
+
+    if hoten_col:
+        df_clean = df[[masv_col, hoten_col]].copy()
+        df_clean.columns = ['MaSV', 'HoTen']
+    else:
+        df_clean = df[[masv_col]].copy()
+        df_clean.columns = ['MaSV']
+        df_clean['HoTen'] = 'N/A'
+
+    df_clean['MaSV'] = df_clean['MaSV'].astype(str).str.strip()
+    df_clean = df_clean.loc[df_clean['MaSV'].str.match(r'^\d+$', na=False)].copy()
+
+    if len(df_clean) == 0:
+        return None
+    df_clean['ChuongTrinh'] = subject_name
+    return df_clean
+
+
+def read_enrollments(path, log=print, streaming=True, workers=1, progress=None, sheet_rows=None,
+                     check=None):
+    """Đọc toàn bộ workbook, trả về (DataFrame đăng ký, số sheet). DataFrame là None nếu không có dữ liệu
+
+    streaming=True đọc từng dòng trực tiếp từ XML (ít bộ nhớ, nhanh hơn),
+    streaming=False đọc mỗi sheet thành DataFrame đầy đủ bằng pandas như cũ.
+    workers: số tiến trình đọc song song các sheet (1 = tuần tự, None = số CPU).
+    progress(số sheet đã đọc, tổng số sheet) được gọi sau mỗi sheet nếu có.
+    sheet_rows: dict nhận {sheet: số dòng đọc được} nếu có.
+    check(): gọi định kỳ khi chờ tiến trình đọc song song, ném ngoại lệ để huỷ.
+    """
+    # pandas chỉ cần từ bước tải file: import ở đây để giao diện / CLI khởi động nhanh
+    import pandas as pd
+
+    if streaming and workers != 1:
+        all_dfs, n_sheets = read_enrollments_parallel(path, workers=workers, log=log, progress=progress,
+                                                      sheet_rows=sheet_rows, check=check)
+    elif streaming:
+        all_dfs, n_sheets = read_enrollments_streaming(path, log=log, progress=progress,
+                                                       sheet_rows=sheet_rows)
+    else:
+        all_dfs = []
+        excel = pd.ExcelFile(path, engine='openpyxl')
+        n_sheets = len(excel.sheet_names)
+        for done, sheet in enumerate(excel.sheet_names, 1):
+            try:
+                df_clean = read_sheet(excel, sheet)
+                if df_clean is not None:
+                    all_dfs.append(df_clean)
+                    log(f"✓ Đọc thành công sheet '{sheet}': {len(df_clean)} sinh viên")
+                    if sheet_rows is not None:
+                        sheet_rows[sheet] = len(df_clean)
+            except Exception as e:
+                # Sheet lỗi thì bỏ qua, không dừng cả quá trình
+                log(f"Lỗi đọc sheet {sheet}: {str(e)}")
+            if progress:
+                progress(done, n_sheets)
+
+    if not all_dfs:
+        return None, n_sheets
+
+    data = pd.concat(all_dfs, ignore_index=True)
+    data.drop_duplicates(subset=['MaSV', 'ChuongTrinh'], inplace=True)
+    # Họ tên / tên môn lặp lại rất nhiều: lưu dạng category thay cho chuỗi object
+    return data.astype({'HoTen': 'category', 'ChuongTrinh': 'category'}), n_sheets
+
+
+def load_enrollments(path, log=print, workers=1, cache=None, progress=None, sheet_rows=None,
+                     check=None):
+    """Như read_enrollments nhưng tra cache (EnrollmentCache) theo nội dung file trước
+
+    Lỗi đọc/ghi cache chỉ được ghi log, không làm hỏng việc tải dữ liệu.
+    """
+    key = None
+    if cache is not None:
+        try:
+            key = cache.key(path)
+            hit = cache.get(key)
+            if hit is not None:
+                log(f"✓ Dùng dữ liệu đã cache cho {os.path.basename(path)}")
+                return hit
+        except Exception as e:
+            log(f"Lỗi đọc cache: {e}")
+
+    data, n_sheets = read_enrollments(path, log=log, workers=workers, progress=progress,
+                                      sheet_rows=sheet_rows, check=check)
+    if data is not None and key is not None:
+        try:
+            cache.put(key, data, n_sheets)
+        except Exception as e:
+            log(f"Lỗi ghi cache: {e}")
+    return data, n_sheets
+
+
+def build_model(data):
+    """Mã hoá dữ liệu đăng ký thành EnrollmentModel (MSSV / môn -> int32, CSR 2 chiều)"""
+    return EnrollmentModel.from_frame(data)
+
+
+def dsatur(subjects, conflict_graph, workers=1, sizes=None, capacity=None, counters=None):
+    """Tô màu đồ thị bằng DSatur, trả về {môn: ca} với ca bắt đầu từ 1
+
+    Mỗi thành phần liên thông được tô riêng (thành phần nhỏ tô tối ưu), workers > 1 thì
+    các thành phần lớn được tô song song.
+    capacity: số chỗ tối đa mỗi ca, tổng sizes[môn] của 1 ca không vượt quá capacity
+    (các thành phần dùng chung chỗ ngồi nên khi đó tô cả đồ thị 1 lần).
+    counters: dict nhận bộ đếm do chính vòng lặp DSatur ghi (None = không đếm).
+    """
+    adj = to_adjacency(subjects, conflict_graph)
+    if capacity:
+        too_big = [s for s in subjects if sizes[s] > capacity]
+        if too_big:
+            raise ValueError(f"{len(too_big)} môn có số SV vượt quá sức chứa 1 ca ({capacity} chỗ), "
+                             f"ví dụ: {too_big[0]} ({sizes[too_big[0]]} SV)")
+        colors = dsatur_capacity(adj, [sizes[s] for s in subjects], capacity, counters=counters)
+    else:
+        colors = color_by_components(adj, workers, counters)
+    return {subj: c + 1 for subj, c in zip(subjects, colors)}
+
+
+def lower_bound(subjects, conflict_graph, time_limit=1.0, sizes=None, capacity=None, quick=False):
+    """Cận dưới số ca thi = clique lớn nhất tìm được, trả về (cận dưới, list môn của clique, chắc chắn là clique lớn nhất)
+
+    Có capacity thì cận dưới còn ít nhất là ceil(tổng số chỗ cần / capacity).
+    quick=True: chỉ clique tham lam từ vài đỉnh bậc cao nhất, không nhánh cận - đủ nhanh để
+    hiển thị sau mỗi lần xếp lịch; cận đầy đủ chỉ cần khi tối ưu số ca.
+    """
+    adj = to_adjacency(subjects, conflict_graph)
+    if quick:
+        clique, exact = clique_lower_bound(adj, time_limit=0, seeds=QUICK_SEEDS)
+    else:
+        clique, exact = clique_lower_bound(adj, time_limit)
+    bound = len(clique)
+    seats = seat_bound(subjects, sizes, capacity)
+    if seats > bound:
+        bound, exact = seats, False
+    return bound, [subjects[v] for v in clique], exact
+
+
+def seat_bound(subjects, sizes, capacity):
+    """Số ca tối thiểu để đủ chỗ: ceil(tổng số SV dự thi / capacity), 0 nếu không giới hạn"""
+    if not capacity:
+        return 0
+    return -(-sum(sizes[s] for s in subjects) // capacity)
+
+
+def slot_loads(schedule, sizes):
+    """Tổng số SV dự thi của từng ca: {ca: số SV}"""
+    loads = defaultdict(int)
+    for subj, slot in schedule.items():
+        loads[slot] += sizes[subj]
+    return dict(loads)
+
+
+def improve_schedule(subjects, conflict_graph, schedule, budget=10.0, workers=None,
+                     on_improve=None, should_stop=None, bound=None):
+    """Tìm lịch ít ca hơn trong budget giây (DSatur ngẫu nhiên + tabu, chạy song song)
+
+    Trả về ({môn: ca}, thống kê từng worker); không tìm được lịch tốt hơn thì giữ schedule.
+    on_improve(số ca, worker) được gọi mỗi khi có lịch tốt hơn.
+    bound: cận dưới số ca (None = tự tính); đạt cận dưới thì dừng ngay.
+    Chỉ các thành phần liên thông đang cần nhiều ca nhất mới được tối ưu (giảm các thành
+    phần khác không làm giảm tổng số ca), mỗi thành phần chỉ cần giảm tới số ca của
+    thành phần đứng sau.
+    """
+    adj = to_adjacency(subjects, conflict_graph)
+    if bound is None:
+        bound = len(clique_lower_bound(adj)[0])
+    if schedule:
+        colors = [schedule[s] - 1 for s in subjects]
+    else:
+        colors = color_by_components(adj, workers)
+        schedule = {subj: c + 1 for subj, c in zip(subjects, colors)}
+
+    comps = connected_components(adj)
+    slots = [max(colors[v] for v in comp) + 1 for comp in comps]
+    target = max(slots, default=0)
+    floor = max([bound] + [k for k in slots if k < target])
+    hard = [i for i, k in enumerate(slots) if k == target and k > floor]
+
+    deadline = time.time() + budget
+    all_stats = []
+    for pos, i in enumerate(hard):
+        comp = comps[i]
+        sub = subgraph(adj, comp)
+        local = [colors[v] for v in comp]
+        if len(comp) <= EXACT_MAX_NODES:
+            result, stats = exact_coloring(sub), []
+        else:
+            # Chia đều thời gian còn lại cho các thành phần chưa tối ưu
+            share = max(0.0, deadline - time.time()) / (len(hard) - pos)
+            rest = max((k for j, k in enumerate(slots) if j != i), default=0)
+            report = None
+            if on_improve is not None:
+                report = lambda k, worker, rest=rest: on_improve(max(k, rest), worker)
+            result, stats = improve_coloring(sub, budget=share, workers=workers, initial=local,
+                                             on_improve=report, should_stop=should_stop,
+                                             lower_bound=floor)
+        all_stats.extend(stats)
+        if result is not None and max(result) < max(local):
+            for v, c in zip(comp, result):
+                colors[v] = c
+            slots[i] = max(result) + 1
+        if should_stop is not None and should_stop():
+            break
+
+    if not hard:
+        return dict(schedule), all_stats
+    return {subj: c + 1 for subj, c in zip(subjects, colors)}, all_stats
+
+
+def improve_counters(stats):
+    """Tổng các bộ đếm của mọi worker improve_schedule"""
+    return {key: sum(s[key] for s in stats)
+            for key in ('restarts', 'tabu_runs', 'tabu_moves', 'improvements')}
+
+
+def worker_report(stats):
+    """Bảng thống kê từng worker của improve_schedule, dạng text"""
+    lines = [f"{'worker':<7} {'ca':>4} {'restart':>8} {'tabu':>6} {'bước/s':>9}"]
+    for s in sorted(stats, key=lambda s: s['worker']):
+        lines.append(f"{s['worker']:<7} {s['best_slots']:>4} {s['restarts']:>8} "
+                     f"{s['tabu_runs']:>6} {s['moves_per_s']:>9.0f}")
+    return "\n".join(lines)
+
+
+def conflicting_edges(conflict_graph, schedule):
+    """Kiểm tra lịch trong O(E): trả về list cặp môn (a, b), a < b, có SV chung nhưng cùng ca
+
+    SV bị trùng ca <=> SV đó học 2 môn là 1 cạnh cùng ca, nên list rỗng nghĩa là lịch hợp lệ
+    mà không cần duyệt từng sinh viên.
+    """
+    model = getattr(conflict_graph, 'model', None)
+    if model is not None:
+        return model.same_slot_edges(schedule)
+    bad = []
+    for a, neighs in conflict_graph.items():
+        ca = schedule.get(a)
+        for b in neighs:
+            if a < b and schedule.get(b) == ca:
+                bad.append((a, b))
+    return bad
+
+
+def iter_conflicts(student_subjects, subject_students, schedule, bad_edges):
+    """Sinh lần lượt (sid, {ca: [môn, ...]}) cho SV bị trùng ca, chỉ xét SV của các cạnh vi phạm"""
+    seen = set()
+    for a, b in bad_edges:
+        for sid in sorted(subject_students[a] & subject_students[b]):
+            if sid in seen:
+                continue
+            seen.add(sid)
+            ca_dict = defaultdict(list)
+            for sub in sorted(student_subjects[sid]):
+                ca_dict[schedule.get(sub)].append(sub)
+            yield sid, {ca: subj_list for ca, subj_list in ca_dict.items() if len(subj_list) > 1}
+
+
+def find_conflicts(student_subjects, subject_students, conflict_graph, schedule, limit=None):
+    """Tìm sinh viên bị trùng ca, trả về list (sid, {ca: [môn, ...]}) chỉ gồm các ca bị trùng
+
+    limit: chỉ lấy tối đa limit sinh viên đầu tiên (đủ để hiển thị), None = tất cả.
+    """
+    bad_edges = conflicting_edges(conflict_graph, schedule)
+    if not bad_edges:
+        return []
+    return list(islice(iter_conflicts(student_subjects, subject_students, schedule, bad_edges), limit))
+
+
+def conflict_report(student_subjects, subject_students, conflict_graph, schedule, limit=None):
+    """Như find_conflicts nhưng trả thêm tổng số sinh viên bị trùng ca: (list tối đa limit SV, tổng)
+
+    Tổng đếm trực tiếp từ các cạnh vi phạm (SV chung của 2 môn cùng ca), không dựng chi tiết cho mọi SV.
+    """
+    bad_edges = conflicting_edges(conflict_graph, schedule)
+    if not bad_edges:
+        return [], 0
+    offenders = set()
+    for a, b in bad_edges:
+        offenders.update(subject_students[a] & subject_students[b])
+    found = list(islice(iter_conflicts(student_subjects, subject_students, schedule, bad_edges), limit))
+    return found, len(offenders)
+
+
+def iter_student_rows(student_names, student_subjects, schedule, order=None):
+    """Sinh dòng (MSSV, họ tên, ca, môn) đã sắp theo MSSV rồi ca, không tạo bảng trung gian
+
+    order: Mapping ca -> khóa sắp xếp (vd. (ngày, ca trong ngày) sau day_planner); None = theo mã số ca.
+    """
+    position = None
+    if order is not None:
+        position = {ca: i for i, ca in enumerate(sorted(order, key=order.__getitem__), 1)}
+    model = getattr(student_subjects, 'model', None)
+    if model is not None:
+        own_names = getattr(student_names, 'model', None) is model
+        return model.student_rows(schedule, None if own_names else student_names, position)
+    return _iter_student_rows(student_names, student_subjects, schedule, position)
+
+
+def _iter_student_rows(student_names, student_subjects, schedule, position=None):
+    for sid in sorted(student_subjects):
+        name = student_names.get(sid, "N/A")
+        subs = student_subjects[sid]
+        # Sắp theo (thứ tự ca, tên môn); môn chưa xếp (không có ca) đứng đầu
+        slots = sorted((schedule.get(s, 0), s) for s in subs)
+        if position is not None:
+            slots.sort(key=lambda item: position.get(item[0], 0))
+        for ca, s in slots:
+            yield sid, name, ca or None, s
+
+
+def schedule_tables(student_names, subjects, student_subjects, subject_students, conflict_graph, schedule):
+    """Các bảng kết quả (tên sheet, header, iterable dòng) dùng chung cho mọi định dạng xuất"""
+    return [
+        ("LichThi", ("Ca thi", "Môn học", "Số SV"),
+         ((ca, subj, len(subject_students[subj]))
+          for subj, ca in sorted(schedule.items(), key=lambda x: (x[1], x[0]))),
+         ('int32', 'string', 'int32')),
+        # Ca thi = None với môn chưa xếp ca (ô trống)
+        ("LichSinhVien", ("MSSV", "Họ tên", "Ca thi", "Môn học"),
+         iter_student_rows(student_names, student_subjects, schedule),
+         ('string', 'string', 'int32', 'string')),
+        ("ThongKe", ("Chỉ số", "Giá trị"), [
+            ("Tổng số môn học", len(subjects)),
+            ("Tổng số sinh viên", len(student_subjects)),
+            ("Số ca thi", max(schedule.values())),
+            ("Số xung đột", sum(len(v) for v in conflict_graph.values()) // 2),
+        ], ('string', 'int64')),
+    ]
+
+
+def export_schedule(path, student_names, subjects, student_subjects, subject_students, conflict_graph, schedule):
+    """Xuất 3 bảng LichThi, LichSinhVien, ThongKe, trả về list file đã tạo
+
+    .xlsx: 1 file 3 sheet; .csv / .parquet: mỗi bảng 1 file <tên>_<bảng>.<đuôi>.
+    Các dòng được ghi dần (streaming) nên bộ nhớ không tăng theo số sinh viên.
+    """
+    tables = schedule_tables(student_names, subjects, student_subjects, subject_students,
+                             conflict_graph, schedule)
+    return write_tables(path, tables)
+
+
+class SchedulingEngine:
+    """Pipeline xếp lịch: load -> process -> schedule -> check -> export, có đo thời gian từng bước"""
+
+    def __init__(self, log=print, workers=1, cache=None, capacity=None, stats=None):
+        self.log = log
+        self.workers = workers
+        self.cache = cache
+        self.capacity = capacity  # số chỗ tối đa mỗi ca (None = không giới hạn)
+        self.stats = stats if stats is not None else RunStats(enabled=False)
+        self.run_log = None       # file log JSON ghi cạnh file xuất (khi bật stats)
+        self.data = None
+        self.model = None  # EnrollmentModel; None sau khi chuyển sang dict set để cập nhật tăng dần
+        self.n_sheets = 0
+        self.subjects = []
+        self.student_subjects = defaultdict(set)
+        self.subject_students = defaultdict(set)
+        self.conflict_graph = defaultdict(set)
+        self.shared_counts = {}
+        self.student_names = {}
+        self.schedule = {}
+        self.conflicts = []
+        self.improve_stats = []  # thống kê từng worker của bước improve
+        self.bound = 0           # cận dưới số ca (kích thước clique)
+        self.bound_clique = []
+        self.bound_exact = False  # clique đã chứng minh là lớn nhất
+        self.bound_full = False   # đã chạy nhánh cận (False: chỉ clique tham lam)
+        self.outputs = []  # các file đã xuất
+        self.timings = {}
+
+    @contextmanager
+    def stage(self, name):
+        """Đo thời gian chạy của 1 bước (giây)"""
+        start = time.perf_counter()
+        try:
+            with self.stats.stage(name):
+                yield
+        finally:
+            self.timings[name] = time.perf_counter() - start
+
+    def load(self, path):
+        with self.stage('load'):
+            self.data, self.n_sheets = load_enrollments(
+                path, log=self.log, workers=self.workers, cache=self.cache,
+                sheet_rows=self.stats.sheet_rows if self.stats.enabled else None)
+        if self.data is None:
+            raise ValueError("Không tìm thấy dữ liệu hợp lệ!")
+        self.stats.info.update(file=os.path.abspath(path), sheets=self.n_sheets, rows=len(self.data))
+        return self.data
+
+    def process(self):
+        with self.stage('process'):
+            self.model = build_model(self.data)
+            (self.subjects, self.student_subjects, self.subject_students,
+             self.conflict_graph, self.shared_counts) = self.model.graph()
+            self.student_names = self.model.name_index()
+        # Mọi bước sau chạy trên model (apply_changes: OverlayView trên model), không giữ DataFrame nữa
+        self.data = None
+        self.stats.info.update(students=len(self.student_subjects), subjects=len(self.subjects),
+                               edges=self.edge_count(), model_mb=self.model.nbytes() / 2**20)
+
+    def run(self):
+        if not self.subjects:
+            raise ValueError("Chưa tải dữ liệu!")
+        counters = {} if self.stats.enabled else None
+        with self.stage('dsatur'):
+            self.schedule = dsatur(self.subjects, self.conflict_graph, self.workers,
+                                   self.subject_sizes(), self.capacity, counters)
+        self.update_bound(quick=True)
+        if self.stats.enabled:
+            self.stats.update(counters, 'dsatur.')
+            self.stats.info.update(slots=max(self.schedule.values()), bound=self.bound)
+        return self.schedule
+
+    def update_bound(self, quick=False):
+        """Tính lại cận dưới số ca; quick=True chỉ dùng clique tham lam (không nhánh cận)"""
+        with self.stage('bound'):
+            self.bound, self.bound_clique, self.bound_exact = lower_bound(
+                self.subjects, self.conflict_graph, sizes=self.subject_sizes(),
+                capacity=self.capacity, quick=quick)
+        self.bound_full = not quick
+        return self.bound
+
+    def subject_sizes(self):
+        return {s: len(self.subject_students[s]) for s in self.subjects}
+
+    def max_load(self):
+        """Số SV của ca đông nhất"""
+        return max(slot_loads(self.schedule, self.subject_sizes()).values(), default=0)
+
+    def is_optimal(self):
+        """Số ca đã bằng cận dưới thì không thể giảm thêm"""
+        return bool(self.schedule) and max(self.schedule.values()) <= self.bound
+
+    def improve(self, budget, workers=None):
+        """Giảm số ca bằng tìm kiếm nhiều lần khởi động + tabu trong budget giây"""
+        if not self.schedule:
+            raise ValueError("Chưa chạy thuật toán!")
+        before = max(self.schedule.values())
+        if self.is_optimal():
+            self.log(f"{before} ca = cận dưới, bỏ qua bước tối ưu")
+            return self.schedule
+        if self.capacity:
+            # Tabu chỉ tránh xung đột, không giữ được giới hạn số chỗ
+            self.log("Bước tối ưu chưa hỗ trợ giới hạn số chỗ mỗi ca, bỏ qua")
+            return self.schedule
+        if not self.bound_full:
+            # Cận từ run() chỉ là clique tham lam: tìm clique lớn hơn trước khi tốn thời gian tối ưu
+            self.update_bound()
+            if self.is_optimal():
+                self.log(f"{before} ca = cận dưới, bỏ qua bước tối ưu")
+                return self.schedule
+        with self.stage('improve'):
+            self.schedule, self.improve_stats = improve_schedule(
+                self.subjects, self.conflict_graph, self.schedule, budget=budget, workers=workers,
+                on_improve=lambda k, worker: self.log(f"Worker {worker}: {k} ca (trước {before})"),
+                bound=self.bound)
+        self.stats.update(improve_counters(self.improve_stats), 'improve.')
+        self.stats.info.update(slots=max(self.schedule.values()), bound=self.bound)
+        return self.schedule
+
+    def apply_changes(self, added=(), removed=()):
+        """Đăng ký bổ sung / huỷ môn sau khi đã xếp lịch: cập nhật đồ thị tại chỗ và chỉ
+        đổi ca các môn bị ảnh hưởng. Trả về {môn: (ca cũ, ca mới)}
+
+        added: list (MSSV, môn) hoặc (MSSV, môn, họ tên) - họ tên dùng cho SV chưa có trong dữ liệu;
+        removed: list (MSSV, môn).
+        Lần đầu, các view CSR được bọc trong OverlayView (chỉ chép list tên môn, O(số môn)); mỗi
+        thay đổi chỉ chép các dòng bị sửa. Sau đó các bước khác đọc đồ thị qua Mapping thay vì
+        mảng CSR: cận dưới nhanh (clique tham lam) chạy lại sau mỗi lần cập nhật tốn O(số cạnh).
+        """
+        if not self.schedule:
+            raise ValueError("Chưa chạy thuật toán!")
+        with self.stage('incremental'):
+            if self.model is not None:
+                (self.subjects, self.student_subjects, self.subject_students,
+                 self.conflict_graph, self.shared_counts) = self.model.overlay()
+                self.student_names = OverlayView(self.student_names)
+                self.model = None
+            pairs = []
+            for sid, subj, *name in added:
+                sid = str(sid).strip()
+                pairs.append((sid, subj))
+                if name and sid not in self.student_names:
+                    self.student_names[sid] = name[0]
+            delta = apply_enrollment_changes(self.subjects, self.student_subjects, self.subject_students,
+                                             self.conflict_graph, self.shared_counts, pairs, removed)
+            moved = repair_schedule(self.conflict_graph, self.schedule, delta['new_edges'],
+                                    delta['new_subjects'], delta['empty_subjects'],
+                                    sizes=self.subject_sizes(), capacity=self.capacity)
+        # Cạnh mới không phá clique cũ nên nó vẫn là cận dưới: chỉ tìm lại clique (O(số cạnh)) khi
+        # clique mất cạnh / mất môn, lúc đó cận cũ có thể lớn hơn số ca tối ưu mới
+        clique = set(self.bound_clique)
+        if clique & set(delta['empty_subjects']) or any(a in clique and b in clique
+                                                        for a, b in delta['lost_edges']):
+            self.update_bound(quick=True)
+        else:
+            self.bound = max(len(clique), seat_bound(self.subjects, self.subject_sizes(), self.capacity))
+            self.bound_exact = self.bound_full = False
+        self.stats.info.update(slots=max(self.schedule.values(), default=0), bound=self.bound)
+        self.log(f"+{len(added)} / -{len(removed)} đăng ký: {len(delta['new_edges'])} cạnh mới, "
+                 f"{len(moved)} môn đổi ca")
+        return moved
+
+    def check(self):
+        with self.stage('check'):
+            self.conflicts = find_conflicts(self.student_subjects, self.subject_students,
+                                            self.conflict_graph, self.schedule)
+        return self.conflicts
+
+    def export(self, path):
+        """Xuất kết quả theo đuôi file (.xlsx / .csv / .parquet), trả về list file đã tạo"""
+        if not self.schedule:
+            raise ValueError("Chưa chạy thuật toán!")
+        ext = os.path.splitext(path)[1].lower() or 'export'
+        with self.stage(f"export{ext}"):
+            paths = export_schedule(path, self.student_names, self.subjects, self.student_subjects,
+                                    self.subject_students, self.conflict_graph, self.schedule)
+        self.outputs.extend(paths)
+        self.stats.info['outputs'] = self.outputs
+        self.run_log = self.stats.write_json(run_log_path(path)) or self.run_log
+        return paths
+
+    def run_all(self, path, out_paths=(), improve_budget=0, improve_workers=None):
+        """Chạy toàn bộ pipeline và xuất ra từng file trong out_paths, trả về số ca thi
+
+        improve_budget > 0: dành thêm chừng ấy giây để giảm số ca trước khi kiểm tra/xuất.
+        """
+        if isinstance(out_paths, str):
+            out_paths = [out_paths]
+        self.load(path)
+        self.process()
+        self.run()
+        if improve_budget > 0:
+            self.improve(improve_budget, improve_workers)
+        self.check()
+        for out_path in out_paths:
+            self.export(out_path)
+        return max(self.schedule.values())
+
+    def edge_count(self):
+        return len(self.shared_counts)
+
+    def timing_report(self):
+        """Bảng thời gian từng bước, dạng text"""
+        lines = [f"{name:<12} {secs:>9.3f}s" for name, secs in self.timings.items()]
+        lines.append(f"{'TỔNG':<12} {sum(self.timings.values()):>9.3f}s")
+        return "\n".join(lines)
@@ -0,0 +1,135 @@
+"""Tìm kiếm sinh viên theo MSSV / họ tên có dấu hoặc không dấu
+
+- StudentSearchIndex: chỉ mục trigram trên chuỗi đã bỏ dấu ("Nguyễn" -> "nguyen"),
+  truy vấn chỉ kiểm tra lại các ứng viên có đủ mọi trigram của từ khoá.
+- DebouncedSearch: gom các phím gõ liên tiếp, chạy truy vấn ở thread nền và
+  bỏ kết quả của truy vấn cũ khi người dùng đã gõ tiếp.
+"""
+import threading
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+
+
+class SearchCancelled(Exception):
+    pass
+
+
+def fold(text):
+    """Chữ thường, bỏ dấu tiếng Việt (đ -> d)"""
+    text = unicodedata.normalize('NFD', str(text).lower().replace('đ', 'd'))
+    return ''.join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class StudentSearchIndex:
+    CHECK_EVERY = 2048  # số ứng viên giữa 2 lần kiểm tra huỷ
+
+    def __init__(self, student_names):
+        # Chỉ giữ tham chiếu; việc bỏ dấu và lập chỉ mục làm ở lần tìm đầu tiên (thread nền)
+        self.student_names = student_names
+        self.ids = []
+        self.texts = []
+        self._grams = None
+        self._lock = threading.Lock()
+
+    def build(self):
+        """Bỏ dấu và lập chỉ mục trigram (chỉ làm 1 lần)"""
+        with self._lock:
+            if self._grams is None:
+                self.ids = list(self.student_names)
+                # MSSV và tên nối bằng ký tự không gõ được để từ khoá không khớp qua ranh giới
+                self.texts = [fold(sid) + '\x00' + fold(self.student_names[sid]) for sid in self.ids]
+                grams = {}
+                for i, text in enumerate(self.texts):
+                    for g in _trigrams(text):
+                        grams.setdefault(g, []).append(i)
+                self._grams = grams
+        return self._grams
+
+    def search(self, query, is_cancelled=None):
+        """Trả về list MSSV khớp (theo thứ tự ban đầu), None nếu từ khoá rỗng"""
+        q = fold(query)
+        if not q:
+            return None
+
+        grams = self.build()
+        if len(q) < 3:
+            candidates = range(len(self.texts))
+        else:
+            postings = []
+            for g in _trigrams(q):
+                if g not in grams:
+                    return []
+                postings.append(grams[g])
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for p in postings[1:]:
+                candidates.intersection_update(p)
+                if not candidates:
+                    return []
+            candidates = sorted(candidates)
+
+        result = []
+        texts = self.texts
+        for n, i in enumerate(candidates):
+            if is_cancelled is not None and n % self.CHECK_EVERY == 0 and is_cancelled():
+                raise SearchCancelled()
+            if q in texts[i]:
+                result.append(self.ids[i])
+        return result
+
+
+class DebouncedSearch:
+    """Chạy index.search ở thread nền sau delay_ms kể từ phím gõ cuối cùng
+
+    on_result(kết quả) luôn được gọi trên thread Tk, và chỉ cho truy vấn mới nhất.
+    """
+
+    def __init__(self, root, on_result, delay_ms=150, poll_ms=15):
+        self.root = root
+        self.on_result = on_result
+        self.delay_ms = delay_ms
+        self.poll_ms = poll_ms
+        self.index = None
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._after_id = None
+        self._generation = 0
+
+    def set_index(self, index):
+        self.index = index
+        self._generation += 1  # kết quả đang chạy thuộc dữ liệu cũ
+        if index is not None:
+            self._executor.submit(index.build)  # lập chỉ mục sẵn ở thread nền
+
+    def request(self, query):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+        self._generation += 1
+        self._after_id = self.root.after(self.delay_ms, self._start, query, self._generation)
+
+    def _start(self, query, generation):
+        self._after_id = None
+        if generation != self._generation:
+            return
+        if self.index is None:
+            self.on_result(None)
+            return
+        index = self.index
+        cancelled = lambda: generation != self._generation
+        future = self._executor.submit(index.search, query, cancelled)
+        self.root.after(self.poll_ms, self._poll, future, generation)
+
+    def _poll(self, future, generation):
+        if not future.done():
+            self.root.after(self.poll_ms, self._poll, future, generation)
+            return
+        if generation != self._generation or future.cancelled():
+            return
+        try:
+            result = future.result()
+        except SearchCancelled:
+            return
+        self.on_result(result)
@@ -0,0 +1,120 @@
+"""Sinh file Excel đăng ký thi giả lập (nhiều sheet, mỗi sheet 1 môn) để đo hiệu năng
+
+Phân bố gần với dữ liệu thật:
+- Số môn mỗi SV lệch phải: đa số 3-6 môn, 1 số ít học rất nhiều môn (tối đa MAX_COURSES).
+- Sĩ số môn lệch: vài môn đại cương rất đông (LARGE_SHARE số môn), còn lại là môn nhỏ.
+- Bố cục sheet thay đổi như file thật: có/không có dòng tên môn, dòng trống trước header,
+  thêm vài sheet không có dữ liệu (hướng dẫn, ghi chú).
+
+Ví dụ:
+    python synthetic_data.py DangKy_20k.xlsx --students 20000 --subjects 300
+"""
+import argparse
+
+import numpy as np
+
+from table_writers import XlsxStreamWriter
+
+
+MAX_COURSES = 12      # số môn tối đa của 1 SV
+LARGE_SHARE = 0.05    # tỉ lệ môn đại cương (sĩ số lớn)
+LARGE_WEIGHT = 25.0   # môn đại cương đông hơn môn thường bao nhiêu lần (trung bình)
+CHUNK = 2000          # số SV được chọn môn cùng lúc
+
+HO = ["Nguyễn", "Trần", "Lê", "Phạm", "Hoàng", "Huỳnh", "Phan", "Vũ", "Võ", "Đặng", "Bùi", "Đỗ"]
+DEM = ["Văn", "Thị", "Hữu", "Đức", "Minh", "Ngọc", "Thanh", "Quốc", "Gia", "Hoài"]
+TEN = ["An", "Bình", "Cường", "Dũng", "Giang", "Hà", "Hùng", "Khánh", "Linh", "Mai",
+       "Nam", "Phương", "Quân", "Sơn", "Thảo", "Trang", "Tuấn", "Vy", "Yến", "Long"]
+TOPICS = ["Giải tích", "Đại số", "Vật lý", "Lập trình", "Kinh tế", "Triết học", "Tiếng Anh",
+          "Mạng máy tính", "Cơ sở dữ liệu", "Xác suất", "Hoá học", "Pháp luật"]
+
+
+def course_weights(n_subjects, rng):
+    """Độ phổ biến (xác suất được chọn) của từng môn: lognormal, nhân thêm cho môn đại cương"""
+    weights = rng.lognormal(mean=0.0, sigma=1.0, size=n_subjects)
+    n_large = max(1, int(n_subjects * LARGE_SHARE))
+    weights[rng.choice(n_subjects, size=n_large, replace=False)] *= LARGE_WEIGHT
+    return weights / weights.sum()
+
+
+def courses_per_student(n_students, n_subjects, rng):
+    """Số môn của từng SV: 1 + nhị thức âm (trung bình ~5.5, đuôi dài), tối đa MAX_COURSES"""
+    counts = 1 + rng.negative_binomial(3, 0.4, size=n_students)
+    return np.minimum(counts, min(MAX_COURSES, n_subjects))
+
+
+def enrollments(n_students, n_subjects, seed=0):
+    """Danh sách SV của từng môn: list[np.ndarray chỉ số SV]
+
+    Mỗi SV chọn k môn không lặp theo độ phổ biến (Gumbel top-k, tính theo từng khối SV).
+    """
+    rng = np.random.default_rng(seed)
+    log_p = np.log(course_weights(n_subjects, rng))
+    counts = courses_per_student(n_students, n_subjects, rng)
+    k_max = int(counts.max(initial=1))
+
+    students, courses = [], []
+    for start in range(0, n_students, CHUNK):
+        stop = min(start + CHUNK, n_students)
+        keys = log_p + rng.gumbel(size=(stop - start, n_subjects))
+        top = np.argpartition(-keys, k_max - 1, axis=1)[:, :k_max]
+        # Trong k_max môn có key lớn nhất, giữ counts[sv] môn lớn nhất
+        order = np.argsort(-np.take_along_axis(keys, top, axis=1), axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        keep = np.arange(k_max) < counts[start:stop, None]
+        students.append(np.broadcast_to(np.arange(start, stop)[:, None], top.shape)[keep])
+        courses.append(top[keep])
+
+    students = np.concatenate(students) if students else np.zeros(0, dtype=np.int64)
+    courses = np.concatenate(courses) if courses else np.zeros(0, dtype=np.int64)
+    order = np.argsort(courses, kind='stable')
+    bounds = np.searchsorted(courses[order], np.arange(n_subjects + 1))
+    return [students[order[bounds[j]:bounds[j + 1]]] for j in range(n_subjects)]
+
+
+def student_name(i):
+    return f"{HO[i % len(HO)]} {DEM[(i // 7) % len(DEM)]} {TEN[(i // 3) % len(TEN)]}"
+
+
+def _sheet_rows(j, members, first_id):
+    """Các dòng của sheet môn j; bố cục đổi theo j để giống các file thật"""
+    # Dòng đầu đủ 4 ô: XlsxStreamWriter lấy số cột theo dòng đầu tiên
+    title = [f"Môn học {j:04d} - {TOPICS[j % len(TOPICS)]}", None, None, None]
+    layout = j % 4
+    if layout == 1:
+        yield title
+        yield []
+    elif layout != 3:
+        yield title
+    # layout 3: không có dòng tên môn -> dùng tên sheet làm tên môn
+    yield ["STT", "Mã SV" if j % 2 else "MSSV", "Họ và tên", "Lớp"]
+    for k, s in enumerate(members.tolist(), 1):
+        yield [k, str(first_id + s), student_name(s), f"K{60 + s % 6}-{s % 9 + 1:02d}"]
+
+
+def write_workbook(path, n_students, n_subjects, seed=0, first_id=20000000):
+    """Ghi file .xlsx giả lập, trả về (số dòng đăng ký, số sheet)"""
+    groups = enrollments(n_students, n_subjects, seed)
+    with XlsxStreamWriter(path) as writer:
+        writer.write_sheet("HuongDan", ["Danh sách đăng ký thi (dữ liệu giả lập)"], [])
+        for j, members in enumerate(groups):
+            rows = _sheet_rows(j, members, first_id)
+            header = next(rows)
+            writer.write_sheet(f"MH{j:04d}", header, rows)
+        writer.write_sheet("GhiChu", ["Ghi chú"], [["Sheet không có cột Mã SV"]])
+    return sum(len(g) for g in groups), n_subjects + 2
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sinh file Excel đăng ký thi giả lập")
+    parser.add_argument('output', help="File .xlsx kết quả")
+    parser.add_argument('--students', type=int, default=20000)
+    parser.add_argument('--subjects', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    rows, sheets = write_workbook(args.output, args.students, args.subjects, args.seed)
+    print(f"Đã ghi {args.output}: {rows:,} đăng ký, {sheets} sheet")
+
+
+if __name__ == "__main__":
+    main()
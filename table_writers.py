@@ -0,0 +1,279 @@
+"""Ghi các bảng kết quả ra .xlsx / .csv / .parquet theo kiểu streaming
+
+Mỗi bảng là (tên, header, iterable các dòng) hoặc (tên, header, dòng, kiểu từng cột);
+kiểu cột ('int32', 'int64', 'string') chỉ dùng cho schema Parquet, ô None là ô trống.
+Các dòng được ghi ngay khi sinh ra,
+không gom vào DataFrame hay workbook trong bộ nhớ, nên bộ nhớ gần như không đổi
+theo số dòng và thời gian tỉ lệ với kích thước file kết quả.
+
+.xlsx được ghi trực tiếp thành XML trong file zip (ngược với xlsx_reader), ô chuỗi
+dùng inlineStr nên không cần bảng chuỗi dùng chung.
+Mỗi file được ghi vào <tên>.tmp rồi mới đổi tên: lỗi giữa chừng không để lại file dở.
+"""
+import csv
+import numbers
+import os
+import re
+import zipfile
+from contextlib import contextmanager
+from importlib.util import find_spec
+from xml.sax.saxutils import escape, quoteattr
+
+# Parquet là tuỳ chọn, chỉ cần khi xuất .parquet
+# pyarrow chỉ được import khi thật sự xuất .parquet (import mất nhiều thời gian lúc khởi động)
+HAS_PARQUET = find_spec('pyarrow') is not None
+
+
+FORMATS = ('.xlsx', '.csv', '.parquet')
+FLUSH_ROWS = 2000       # số dòng gom lại trước mỗi lần ghi xuống file
+PARQUET_BATCH = 50000   # số dòng mỗi row group parquet
+
+# Ký tự điều khiển không hợp lệ trong XML
+_ILLEGAL_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '{sheets}</Types>')
+_SHEET_TYPE = ('<Override PartName="/xl/worksheets/sheet{n}.xml" '
+               'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>')
+
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/></Relationships>')
+
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets>{sheets}</sheets></workbook>')
+
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '{sheets}<Relationship Id="rIdStyles" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/></Relationships>')
+_SHEET_REL = ('<Relationship Id="rId{n}" '
+              'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+              'Target="worksheets/sheet{n}.xml"/>')
+
+# Style 0 = mặc định, style 1 = chữ đậm cho dòng header
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>')
+
+_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>')
+_SHEET_TAIL = '</sheetData></worksheet>'
+
+
+def _column_letter(col):
+    """0 -> 'A', 27 -> 'AB'"""
+    letters = ''
+    col += 1
+    while col:
+        col, rem = divmod(col - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _cell(ref, value, style=''):
+    if value is None or value == '':
+        return ''
+    if isinstance(value, bool):
+        value = str(value)
+    if isinstance(value, numbers.Real):
+        if value != value or value in (float('inf'), float('-inf')):
+            value = str(value)
+        else:
+            return f'<c r="{ref}"{style}><v>{value}</v></c>'
+    text = escape(_ILLEGAL_XML.sub('', str(value)))
+    return f'<c r="{ref}"{style} t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+@contextmanager
+def _replacing(path):
+    """Trả về file tạm để ghi; xong thì đổi tên thành path, lỗi thì xoá file tạm"""
+    tmp = path + '.tmp'
+    try:
+        yield tmp
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    os.replace(tmp, path)
+
+
+def _tables(tables):
+    """(tên, header, rows, kiểu cột hoặc None) cho cả bảng 3 và 4 phần tử"""
+    for table in tables:
+        name, header, rows = table[:3]
+        yield name, header, rows, table[3] if len(table) > 3 else None
+
+
+class XlsxStreamWriter:
+    """Ghi workbook từng sheet một; mỗi sheet được ghi theo từng nhóm FLUSH_ROWS dòng
+
+    Dùng với `with`: có lỗi thì file tạm bị xoá, không tạo file .xlsx hỏng.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.tmp = path + '.tmp'
+        self.zf = zipfile.ZipFile(self.tmp, 'w', compression=zipfile.ZIP_DEFLATED)
+        self.sheet_names = []
+
+    def write_sheet(self, name, header, rows):
+        n = len(self.sheet_names) + 1
+        self.sheet_names.append(name)
+        letters = [_column_letter(i) for i in range(len(header))]
+
+        with self.zf.open(f'xl/worksheets/sheet{n}.xml', 'w', force_zip64=True) as f:
+            f.write(_SHEET_HEAD.encode('utf-8'))
+            cells = ''.join(_cell(f'{col}1', h, ' s="1"') for col, h in zip(letters, header))
+            buf = [f'<row r="1">{cells}</row>']
+            for r, row in enumerate(rows, 2):
+                cells = ''.join(_cell(f'{col}{r}', v) for col, v in zip(letters, row))
+                buf.append(f'<row r="{r}">{cells}</row>')
+                if len(buf) >= FLUSH_ROWS:
+                    f.write(''.join(buf).encode('utf-8'))
+                    buf.clear()
+            buf.append(_SHEET_TAIL)
+            f.write(''.join(buf).encode('utf-8'))
+
+    def close(self):
+        count = range(1, len(self.sheet_names) + 1)
+        self.zf.writestr('[Content_Types].xml',
+                         _CONTENT_TYPES.format(sheets=''.join(_SHEET_TYPE.format(n=n) for n in count)))
+        self.zf.writestr('_rels/.rels', _ROOT_RELS)
+        self.zf.writestr('xl/workbook.xml', _WORKBOOK.format(sheets=''.join(
+            f'<sheet name={quoteattr(name[:31])} sheetId="{n}" r:id="rId{n}"/>'
+            for n, name in zip(count, self.sheet_names))))
+        self.zf.writestr('xl/_rels/workbook.xml.rels',
+                         _WORKBOOK_RELS.format(sheets=''.join(_SHEET_REL.format(n=n) for n in count)))
+        self.zf.writestr('xl/styles.xml', _STYLES)
+        self.zf.close()
+        os.replace(self.tmp, self.path)
+
+    def discard(self):
+        self.zf.close()
+        os.remove(self.tmp)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+def write_xlsx(path, tables):
+    """Ghi mỗi bảng (tên, header, rows) thành 1 sheet"""
+    with XlsxStreamWriter(path) as writer:
+        for name, header, rows, _ in _tables(tables):
+            writer.write_sheet(name, header, rows)
+    return [path]
+
+
+def table_path(path, name):
+    """LichThi.csv + bảng 'LichSinhVien' -> LichThi_LichSinhVien.csv"""
+    stem, ext = os.path.splitext(path)
+    return f"{stem}_{name}{ext}"
+
+
+def write_csv(path, tables):
+    """Ghi mỗi bảng ra 1 file CSV riêng (UTF-8 có BOM để Excel hiển thị đúng tiếng Việt)"""
+    paths = []
+    for name, header, rows, _ in _tables(tables):
+        out = table_path(path, name)
+        with _replacing(out) as tmp, open(tmp, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+        paths.append(out)
+    return paths
+
+
+def _parquet_schema(header, types):
+    import pyarrow as pa
+
+    return pa.schema([pa.field(col, getattr(pa, kind)(), nullable=True) for col, kind in zip(header, types)])
+
+
+def _parquet_batch(header, batch, schema):
+    import pyarrow as pa
+
+    columns = list(zip(*batch)) if batch else [[] for _ in header]
+    return pa.Table.from_pydict(dict(zip(header, map(list, columns))), schema=schema)
+
+
+def write_parquet(path, tables):
+    """Ghi mỗi bảng ra 1 file Parquet riêng, theo từng row group PARQUET_BATCH dòng
+
+    Bảng có kiểu cột thì dùng schema cố định đó cho mọi row group (cột số cho phép None);
+    không có thì schema được suy ra từ row group đầu tiên.
+    """
+    if not HAS_PARQUET:
+        raise RuntimeError("Cần cài đặt pyarrow để xuất file .parquet!")
+    import pyarrow.parquet as pq
+
+    paths = []
+    for name, header, rows, types in _tables(tables):
+        out = table_path(path, name)
+        schema = _parquet_schema(header, types) if types else None
+        with _replacing(out) as tmp:
+            writer = None
+            batch = []
+            try:
+                for row in rows:
+                    batch.append(tuple(row))
+                    if len(batch) >= PARQUET_BATCH:
+                        table = _parquet_batch(header, batch, schema)
+                        schema = table.schema
+                        writer = writer or pq.ParquetWriter(tmp, schema)
+                        writer.write_table(table)
+                        batch.clear()
+                if batch or writer is None:
+                    table = _parquet_batch(header, batch, schema)
+                    writer = writer or pq.ParquetWriter(tmp, table.schema)
+                    writer.write_table(table)
+            finally:
+                if writer is not None:
+                    writer.close()
+        paths.append(out)
+    return paths
+
+
+def write_tables(path, tables):
+    """Chọn cách ghi theo đuôi file, trả về list file đã tạo"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.csv':
+        return write_csv(path, tables)
+    if ext == '.parquet':
+        return write_parquet(path, tables)
+    if ext == '.xlsx':
+        return write_xlsx(path, tables)
+    raise ValueError(f"Không hỗ trợ định dạng {ext or '(không có đuôi)'}, chỉ hỗ trợ {', '.join(FORMATS)}")
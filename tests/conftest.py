@@ -0,0 +1,86 @@
+"""Dữ liệu nhỏ cố định dùng chung cho các test (chạy: python -m pytest -q ở thư mục gốc)"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic_data import enrollments  # noqa: E402
+
+
+def valid_coloring(adj, colors):
+    """Không có cạnh nào 2 đầu cùng màu"""
+    return all(colors[u] != colors[v] for u, nbrs in enumerate(adj) for v in nbrs)
+
+
+def random_adjacency(n, p, seed):
+    """Đồ thị ngẫu nhiên G(n, p) dạng danh sách kề theo chỉ số"""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    adj = [[] for _ in range(n)]
+    for u in range(n):
+        for v in range(u + 1, n):
+            if rng.random() < p:
+                adj[u].append(v)
+                adj[v].append(u)
+    return adj
+
+
+GRAPHS = [(12, 0.3, 0), (14, 0.5, 1), (15, 0.7, 2), (40, 0.2, 3), (60, 0.1, 4)]
+
+
+@pytest.fixture(scope='session')
+def enrollment_frame():
+    """DataFrame (MaSV, HoTen, ChuongTrinh): 300 SV, 20 môn, có cả dòng trùng"""
+    import pandas as pd
+
+    rows = []
+    for j, members in enumerate(enrollments(300, 20, seed=7)):
+        for s in members.tolist():
+            rows.append((str(21000000 + s), f"SV {s}", f"Môn {j:02d}"))
+    rows.extend(rows[:5])
+    return pd.DataFrame(rows, columns=['MaSV', 'HoTen', 'ChuongTrinh'])
+
+
+@pytest.fixture(scope='session')
+def workbook(tmp_path_factory):
+    """File .xlsx nhỏ với các bố cục sheet khác nhau (dòng trống, không có tên môn, không có header)"""
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = 'Toan'
+    ws.append(['Toán cao cấp'])
+    ws.append([])
+    ws.append(['STT', 'Mã SV', 'Họ và tên'])
+    ws.append([1, '20210001', 'Nguyễn An'])
+    ws.append([2, 20210002, 'Trần Bình'])
+    ws.append([])
+    ws.append([3, '20210003', 'Lê Chi'])
+
+    ws = wb.create_sheet('Ly')  # dòng trống đầu sheet không được ghi vào XML
+    ws['A3'] = 'Vật lý'
+    ws['B5'] = 'MSSV'
+    ws['C5'] = 'Họ tên'
+    ws['B6'] = '20210001'
+    ws['C6'] = 'Nguyễn An'
+    ws['B8'] = '20210004'
+    ws['C8'] = 'Phạm Dung'
+
+    ws = wb.create_sheet('Hoa')  # ô đầu trống -> tên môn là tên sheet
+    ws['A2'] = 'Mã SV'
+    ws['A3'] = '20210002'
+    ws['A4'] = 'abc'
+
+    ws = wb.create_sheet('TreHeader')  # header sau 5 dòng đầu -> bỏ qua
+    ws['A7'] = 'Mã SV'
+    ws['A8'] = '20210009'
+
+    ws = wb.create_sheet('GhiChu')
+    ws.append(['Không có cột mã sinh viên'])
+
+    path = tmp_path_factory.mktemp('xlsx') / 'dangky.xlsx'
+    wb.save(path)
+    return str(path)
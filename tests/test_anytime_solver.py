@@ -0,0 +1,54 @@
+import time
+
+import numpy as np
+import pytest
+
+from anytime_solver import improve_coloring, search, tabucol
+from conftest import GRAPHS, random_adjacency, valid_coloring
+from dsatur_core import dsatur_buckets
+
+
+@pytest.mark.parametrize('n, p, seed', GRAPHS)
+def test_tabu_is_valid(n, p, seed):
+    adj = random_adjacency(n, p, seed)
+    nbrs = [np.asarray(a, dtype=np.int64) for a in adj]
+    start = dsatur_buckets(adj)
+    k = max(start) + 1
+    colors, _ = tabucol(nbrs, start, k, np.random.default_rng(seed))
+    assert colors is not None and max(colors) < k
+    assert valid_coloring(adj, colors)
+
+
+def test_tabu_gives_up_below_chromatic_number():
+    triangle = [np.array([1, 2]), np.array([0, 2]), np.array([0, 1])]
+    colors, steps = tabucol(triangle, [0, 1, 2], 2, np.random.default_rng(0), max_iters=200)
+    assert colors is None and steps == 200
+
+
+@pytest.mark.parametrize('n, p, seed', GRAPHS[3:])
+def test_search_never_worse_than_initial(n, p, seed):
+    adj = random_adjacency(n, p, seed)
+    start = dsatur_buckets(adj)
+    colors, stats = search(adj, seed, time.time() + 0.3, initial=start)
+    assert valid_coloring(adj, colors) and max(colors) <= max(start)
+    assert stats['restarts'] >= 1
+
+
+def test_improve_coloring_parallel():
+    adj = random_adjacency(60, 0.1, 4)
+    start = dsatur_buckets(adj)
+    reports = []
+    colors, stats = improve_coloring(adj, budget=0.5, workers=2, initial=start,
+                                     on_improve=lambda k, worker: reports.append(k))
+    assert valid_coloring(adj, colors) and max(colors) <= max(start)
+    assert len(stats) == 2
+    assert reports == sorted(reports, reverse=True)
+    if reports:
+        assert reports[-1] == max(colors) + 1
+
+
+def test_improve_coloring_stops_at_lower_bound():
+    adj = random_adjacency(40, 0.2, 3)
+    start = dsatur_buckets(adj)
+    colors, stats = improve_coloring(adj, budget=5, workers=2, initial=start, lower_bound=max(start) + 1)
+    assert colors == start and stats == []
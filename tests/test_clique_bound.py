@@ -0,0 +1,77 @@
+import pytest
+
+from clique_bound import clique_lower_bound
+from conftest import GRAPHS, random_adjacency
+from scheduler_engine import lower_bound
+
+
+def chromatic_number(adj):
+    """Số màu nhỏ nhất bằng quay lui (chỉ cho đồ thị rất nhỏ)"""
+    n = len(adj)
+    order = sorted(range(n), key=lambda v: -len(adj[v]))
+
+    def colorable(k):
+        color = [-1] * n
+
+        def place(i):
+            if i == n:
+                return True
+            v = order[i]
+            used = {color[w] for w in adj[v]}
+            for c in range(min(k, max(color) + 2)):
+                if c not in used:
+                    color[v] = c
+                    if place(i + 1):
+                        return True
+            color[v] = -1
+            return False
+
+        return place(0)
+
+    return next(k for k in range(1, n + 1) if colorable(k)) if n else 0
+
+
+def is_clique(adj, clique):
+    return all(v in adj[u] for u in clique for v in clique if u != v)
+
+
+@pytest.mark.parametrize('n, p, seed', GRAPHS[:3])
+def test_clique_bound_at_most_chromatic_number(n, p, seed):
+    adj = random_adjacency(n, p, seed)
+    chromatic = chromatic_number(adj)
+    for time_limit in (0, 1.0):
+        clique, exact = clique_lower_bound(adj, time_limit=time_limit)
+        assert is_clique(adj, clique)
+        assert len(clique) <= chromatic
+    assert exact  # đồ thị nhỏ: nhánh cận chạy xong trong thời gian cho phép
+
+
+def test_branch_and_bound_finds_planted_clique():
+    adj = random_adjacency(40, 0.15, 5)
+    planted = [3, 8, 17, 22, 31, 36]
+    for u in planted:
+        for v in planted:
+            if u != v and v not in adj[u]:
+                adj[u].append(v)
+    clique, exact = clique_lower_bound(adj, time_limit=2.0)
+    assert exact and is_clique(adj, clique) and len(clique) >= len(planted)
+
+
+@pytest.mark.parametrize('n, p, seed', GRAPHS)
+def test_quick_bound_not_above_full(n, p, seed):
+    adj = random_adjacency(n, p, seed)
+    subjects = [f"M{v:02d}" for v in range(n)]
+    graph = {subjects[u]: {subjects[v] for v in nbrs} for u, nbrs in enumerate(adj)}
+    quick, quick_clique, _ = lower_bound(subjects, graph, quick=True)
+    full, clique, _ = lower_bound(subjects, graph)
+    assert quick == len(quick_clique) <= full == len(clique)
+
+
+def test_capacity_raises_bound():
+    # 6 môn không xung đột, mỗi môn 10 SV, 25 chỗ mỗi ca -> cần ít nhất 3 ca
+    subjects = [f"M{v}" for v in range(6)]
+    graph = {s: set() for s in subjects}
+    sizes = {s: 10 for s in subjects}
+    assert lower_bound(subjects, graph, quick=True)[0] == 1
+    bound, _, exact = lower_bound(subjects, graph, sizes=sizes, capacity=25)
+    assert bound == 3 and not exact
@@ -0,0 +1,67 @@
+import pytest
+
+import component_solver
+from component_solver import color_by_components, connected_components, exact_coloring, subgraph
+from conftest import GRAPHS, random_adjacency, valid_coloring
+
+
+def cycle(n):
+    return [[(v - 1) % n, (v + 1) % n] for v in range(n)]
+
+
+def grotzsch():
+    """Đồ thị Grötzsch: không có tam giác (clique 2) nhưng cần 4 màu"""
+    outer = cycle(5)
+    adj = [list(nbrs) for nbrs in outer] + [[] for _ in range(6)]
+    for v in range(5):
+        for w in outer[v]:
+            adj[5 + v].append(w)
+            adj[w].append(5 + v)
+        adj[5 + v].append(10)
+        adj[10].append(5 + v)
+    return adj
+
+
+def disjoint_union(*graphs):
+    adj, offset = [], 0
+    for g in graphs:
+        adj.extend([w + offset for w in nbrs] for nbrs in g)
+        offset += len(g)
+    return adj
+
+
+@pytest.mark.parametrize('adj, chromatic', [
+    (cycle(6), 2), (cycle(7), 3), ([[w for w in range(5) if w != v] for v in range(5)], 5), (grotzsch(), 4),
+])
+def test_exact_coloring_is_optimal(adj, chromatic):
+    colors = exact_coloring(adj)
+    assert valid_coloring(adj, colors)
+    assert max(colors) + 1 == chromatic
+
+
+def test_components_and_subgraph():
+    adj = disjoint_union(cycle(5), [[]], cycle(4))
+    comps = connected_components(adj)
+    assert comps == [[0, 1, 2, 3, 4], [6, 7, 8, 9], [5]]
+    assert subgraph(adj, comps[1]) == cycle(4)
+
+
+@pytest.mark.parametrize('n, p, seed', GRAPHS)
+def test_color_by_components_is_valid(n, p, seed):
+    adj = disjoint_union(random_adjacency(n, p, seed), grotzsch(), [[]], cycle(7))
+    colors = color_by_components(adj)
+    assert valid_coloring(adj, colors)
+    # Thành phần nhỏ được tô tối ưu: Grötzsch dùng đúng 4 màu, chu trình lẻ đúng 3 màu
+    assert max(colors[n:n + 11]) + 1 == 4
+    assert max(colors[n + 12:]) + 1 == 3
+
+
+def test_color_by_components_parallel(monkeypatch):
+    monkeypatch.setattr(component_solver, 'PARALLEL_MIN_VERTICES', 0)
+    adj = disjoint_union(*(random_adjacency(40, 0.2, seed) for seed in range(3)))
+    counters, serial = {}, {}
+    colors = color_by_components(adj, workers=2, counters=counters)
+    assert valid_coloring(adj, colors)
+    assert colors == color_by_components(adj, workers=1, counters=serial)
+    # Bộ đếm của tiến trình con được cộng về tiến trình chính
+    assert counters == serial and counters['components'] == 3
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from conftest import GRAPHS, random_adjacency, valid_coloring
+from dsatur_core import SaturationQueue, dsatur_buckets, dsatur_capacity, first_free_color
+
+
+def test_first_free_color():
+    assert first_free_color(0) == 0
+    assert first_free_color(0b1011) == 2
+    assert first_free_color((1 << 70) - 1) == 70
+
+
+@pytest.mark.parametrize('n, p, seed', GRAPHS)
+def test_dsatur_is_valid(n, p, seed):
+    adj = random_adjacency(n, p, seed)
+    colors = dsatur_buckets(adj)
+    assert len(colors) == n
+    assert valid_coloring(adj, colors)
+    assert max(colors) <= max(map(len, adj))
+
+
+def test_queue_pops_highest_saturation_first():
+    # Đường đi 0-1-2-3: sau khi tô 1, đỉnh 0 và 2 có độ bão hoà 1 -> chọn 2 (bậc lớn hơn)
+    adj = [[1], [0, 2], [1, 3], [2]]
+    queue = SaturationQueue(adj)
+    assert queue.pop() == 1
+    queue.assign(1, 0)
+    assert queue.pop() == 2
+    assert queue.first_free_color(2) == 1
+    queue.assign(2, 1)
+    assert [queue.pop(), queue.pop()] == [0, 3] and len(queue) == 0
+
+
+@pytest.mark.parametrize('n, p, seed', GRAPHS)
+def test_dsatur_capacity_respects_seats(n, p, seed):
+    adj = random_adjacency(n, p, seed)
+    sizes = [(7 * v) % 23 + 1 for v in range(n)]
+    colors = dsatur_capacity(adj, sizes, capacity=40)
+    assert valid_coloring(adj, colors)
+    assert np.bincount(colors, weights=sizes).max() <= 40
+
+
+def test_counters_come_from_the_loop():
+    adj = random_adjacency(40, 0.2, 3)
+    counters = {}
+    dsatur_buckets(adj, counters=counters)
+    assert counters['pops'] - counters['stale_pops'] == len(adj)
+    assert counters['neighbor_scans'] == sum(map(len, adj))
+    assert 0 < counters['saturation_updates'] <= counters['neighbor_scans']
@@ -0,0 +1,61 @@
+import os
+
+import pandas as pd
+
+import enrollment_cache
+from enrollment_cache import EnrollmentCache
+from scheduler_engine import load_enrollments
+
+
+def small_frame(tag):
+    return pd.DataFrame({'MaSV': ['001', '002', '003'],
+                         'HoTen': ['An', 'Bình', 'An'],
+                         'ChuongTrinh': [f'Môn {tag}', f'Môn {tag}', 'Chung']})
+
+
+def test_put_then_get_round_trip(tmp_path):
+    cache = EnrollmentCache(str(tmp_path))
+    data = small_frame('A')
+    cache.put('k', data, 4)
+    hit, n_sheets = cache.get('k')
+    assert n_sheets == 4
+    assert hit.astype(str).values.tolist() == data.values.tolist()
+    assert cache.get('khac') is None
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+
+
+def test_key_follows_content_and_parser_version(tmp_path, monkeypatch):
+    a, b, c = tmp_path / 'a.xlsx', tmp_path / 'b.xlsx', tmp_path / 'c.xlsx'
+    a.write_bytes(b'cung noi dung')
+    b.write_bytes(b'cung noi dung')
+    c.write_bytes(b'noi dung khac')
+    cache = EnrollmentCache(str(tmp_path / 'cache'))
+    assert cache.key(str(a)) == cache.key(str(b)) != cache.key(str(c))
+
+    old = cache.key(str(a))
+    monkeypatch.setattr(enrollment_cache, 'PARSER_VERSION', enrollment_cache.PARSER_VERSION + 1)
+    assert cache.key(str(a)) != old
+
+
+def test_lru_eviction(tmp_path):
+    cache = EnrollmentCache(str(tmp_path))
+    for i, key in enumerate('abc'):
+        cache.put(key, small_frame(key), 1)
+        os.utime(os.path.join(tmp_path, key + '.npz'), (1000 + i, 1000 + i))
+    size = os.path.getsize(os.path.join(tmp_path, 'a.npz'))
+
+    cache.get('a')  # 'a' vừa dùng -> 'b' là mục dùng lâu nhất
+    cache.max_bytes = 2 * size + size // 2
+    cache.evict()
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+
+
+def test_load_enrollments_uses_cache(workbook, tmp_path):
+    cache = EnrollmentCache(str(tmp_path))
+    logs = []
+    first, n_sheets = load_enrollments(workbook, log=logs.append, cache=cache)
+    second, n_again = load_enrollments(workbook, log=logs.append, cache=cache)
+    assert n_again == n_sheets
+    assert second.astype(str).values.tolist() == first.astype(str).values.tolist()
+    assert any('cache' in msg for msg in logs)
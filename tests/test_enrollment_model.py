@@ -0,0 +1,58 @@
+from collections import defaultdict
+
+from scheduler_engine import build_model, iter_student_rows
+
+
+def reference_graph(data):
+    """Đồ thị xung đột dạng dict set tính trực tiếp từ DataFrame"""
+    student_subjects = defaultdict(set)
+    for sid, subj in zip(data['MaSV'], data['ChuongTrinh']):
+        student_subjects[sid].add(subj)
+    graph = defaultdict(set)
+    shared = defaultdict(int)
+    for subs in student_subjects.values():
+        subs = sorted(subs)
+        for i, a in enumerate(subs):
+            for b in subs[i + 1:]:
+                graph[a].add(b)
+                graph[b].add(a)
+                shared[a, b] += 1
+    return student_subjects, graph, dict(shared)
+
+
+def test_csr_views_match_dict_of_sets(enrollment_frame):
+    subjects, student_subjects, subject_students, conflict_graph, shared_counts = \
+        build_model(enrollment_frame).graph()
+    ref_students, ref_graph, ref_shared = reference_graph(enrollment_frame)
+
+    assert subjects == sorted(set(enrollment_frame['ChuongTrinh']))
+    assert {s: set(v) for s, v in student_subjects.items()} == dict(ref_students)
+    assert {s: set(conflict_graph[s]) for s in subjects} == {s: ref_graph[s] for s in subjects}
+    assert dict(shared_counts.items()) == ref_shared
+    for subj in subjects:
+        assert set(subject_students[subj]) == {sid for sid, subs in ref_students.items() if subj in subs}
+
+
+
+def test_student_rows_and_names(enrollment_frame):
+    model = build_model(enrollment_frame)
+    _, student_subjects, _, _, _ = model.graph()
+    names = model.name_index()
+    schedule = {s: i % 4 + 1 for i, s in enumerate(model.subjects)}
+    rows = list(model.student_rows(schedule))
+    expected = [(sid, names[sid], schedule[s], s) for sid in sorted(student_subjects)
+                for s in sorted(student_subjects[sid], key=lambda s: (schedule[s], s))]
+    assert rows == expected
+    assert names['21000000'] == 'SV 0' and 'khong co' not in names
+
+
+def test_student_rows_follow_day_order(enrollment_frame):
+    model = build_model(enrollment_frame)
+    _, student_subjects, _, _, _ = model.graph()
+    schedule = {s: i % 4 + 1 for i, s in enumerate(model.subjects)}
+    order = {1: (1, 2), 2: (0, 1), 3: (1, 1), 4: (0, 2)}  # ca -> (ngày, ca trong ngày)
+    names = model.name_index()
+    expected = [(sid, names[sid], schedule[s], s) for sid in sorted(student_subjects)
+                for s in sorted(student_subjects[sid], key=lambda s: (order[schedule[s]], s))]
+    assert list(iter_student_rows(names, student_subjects, schedule, order=order)) == expected
+    assert list(iter_student_rows(names, dict(student_subjects), schedule, order=order)) == expected
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from graph_class import Graph
+
+
+def test_csr_matches_dict_of_sets():
+    rng = np.random.default_rng(3)
+    n = 60
+    g = Graph(n)
+    ref = {u: set() for u in range(n)}
+    for step in range(400):
+        if step % 50 == 0:
+            us, vs = rng.integers(0, n, 30), rng.integers(0, n, 30)
+            g.add_edges(us, vs)
+            pairs = zip(us.tolist(), vs.tolist())
+        else:
+            u, v = rng.integers(0, n, 2).tolist()
+            g.add_edge(u, v)
+            pairs = [(u, v)]
+        for u, v in pairs:
+            ref[u].add(v)
+            ref[v].add(u)
+        u, v = rng.integers(0, n, 2).tolist()
+        assert g.has_edge(u, v) == (v in ref[u])
+
+    for u in range(n):
+        assert g.neighbors(u).tolist() == sorted(ref[u])
+    assert g.degrees().tolist() == [len(ref[u]) for u in range(n)]
+    loops = sum(u in ref[u] for u in range(n))
+    assert g.num_edges() == (sum(map(len, ref.values())) + loops) // 2
+
+    indptr, indices = g.csr()
+    for u in range(n):
+        assert indices[indptr[u]:indptr[u + 1]].tolist() == sorted(ref[u])
+
+
+def test_adj_matrix_is_read_only():
+    g = Graph(3)
+    g.add_edge(0, 1)
+    assert g.adj_matrix[0][1] == 1 and g.adj_matrix[1][0] == 1
+    with pytest.raises(TypeError):
+        g.adj_matrix[0][2] = 1
+    assert not g.has_edge(0, 2)
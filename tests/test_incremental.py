@@ -0,0 +1,119 @@
+import pytest
+
+from scheduler_engine import SchedulingEngine, slot_loads
+
+
+def make_engine(data, capacity=None):
+    engine = SchedulingEngine(log=lambda msg: None, capacity=capacity)
+    engine.data = data.copy()
+    engine.process()
+    engine.run()
+    return engine
+
+
+def assert_valid(engine):
+    assert engine.check() == []
+    assert set(engine.schedule) == {s for s in engine.subjects if engine.subject_students[s]}
+    if engine.capacity:
+        assert engine.max_load() <= engine.capacity
+
+
+def test_apply_changes_keeps_schedule_valid(enrollment_frame):
+    engine = make_engine(enrollment_frame)
+    students = sorted(engine.student_subjects)
+    subjects = list(engine.subjects)
+
+    # Mỗi SV đăng ký thêm 1 môn -> nhiều cạnh mới; thêm 1 môn mới hoàn toàn
+    added = [(sid, subjects[(i * 7) % len(subjects)]) for i, sid in enumerate(students[:60])]
+    added.append((students[0], 'Môn mới'))
+    moved = engine.apply_changes(added=added)
+    assert moved['Môn mới'][0] is None
+    assert_valid(engine)
+
+    removed = [(sid, subj) for sid in students[:40] for subj in sorted(engine.student_subjects[sid])[:1]]
+    engine.apply_changes(removed=removed)
+    assert_valid(engine)
+    assert engine.bound <= max(engine.schedule.values())
+
+
+def test_apply_changes_respects_capacity(enrollment_frame):
+    sizes = enrollment_frame.drop_duplicates().groupby('ChuongTrinh').size()
+    capacity = int(sizes.max()) + 20
+    engine = make_engine(enrollment_frame, capacity=capacity)
+    assert_valid(engine)
+
+    students = sorted(engine.student_subjects)
+    subjects = list(engine.subjects)
+    for round_ in range(5):
+        added = [(sid, subjects[(i + round_) % len(subjects)]) for i, sid in enumerate(students[round_::5])]
+        engine.apply_changes(added=added)
+        assert_valid(engine)
+        loads = slot_loads(engine.schedule, engine.subject_sizes())
+        assert max(loads.values()) <= capacity
+
+
+def test_apply_changes_rejects_oversized_subject(enrollment_frame):
+    engine = make_engine(enrollment_frame, capacity=int(
+        enrollment_frame.drop_duplicates().groupby('ChuongTrinh').size().max()))
+    subj = max(engine.subjects, key=lambda s: len(engine.subject_students[s]))
+    outsider = next(sid for sid in sorted(engine.student_subjects) if subj not in engine.student_subjects[sid])
+    with pytest.raises(ValueError):
+        engine.apply_changes(added=[(outsider, subj)])
+
+
+def test_overlay_matches_rebuilt_model(enrollment_frame):
+    import pandas as pd
+
+    from scheduler_engine import build_model, iter_student_rows
+
+    engine = make_engine(enrollment_frame)
+    students = sorted(engine.student_subjects)
+    last = engine.subjects[-1]
+    added = [(students[1], engine.subjects[0]), (students[2], 'Môn mới'), ('29999999', 'Môn mới', 'SV Mới')]
+    removed = [(sid, last) for sid in engine.subject_students[last]]  # huỷ hết 1 môn
+    engine.apply_changes(added=added, removed=removed)
+
+    data = enrollment_frame.drop_duplicates(subset=['MaSV', 'ChuongTrinh'])
+    data = data[data['ChuongTrinh'] != last]
+    names = dict(zip(data['MaSV'], data['HoTen']))
+    extra = [(sid, names.get(sid, 'SV Mới'), subj) for sid, subj, *_ in added]
+    data = pd.concat([data, pd.DataFrame(extra, columns=data.columns)], ignore_index=True)
+    data = data.drop_duplicates(subset=['MaSV', 'ChuongTrinh'])
+    subjects, student_subjects, subject_students, conflict_graph, shared_counts = build_model(data).graph()
+
+    assert engine.subjects == subjects
+    assert len(engine.conflict_graph) == len(subjects) and last not in engine.conflict_graph
+    assert {s: set(engine.conflict_graph[s]) for s in subjects} == {s: set(conflict_graph[s]) for s in subjects}
+    assert dict(engine.shared_counts.items()) == dict(shared_counts.items())
+    assert len(engine.shared_counts) == len(shared_counts)
+    assert {s: set(v) for s, v in engine.subject_students.items()} == \
+        {s: set(v) for s, v in subject_students.items()}
+    assert dict(engine.student_names.items())['29999999'] == 'SV Mới'
+    rows = list(iter_student_rows(engine.student_names, engine.student_subjects, engine.schedule))
+    assert ('29999999', 'SV Mới', engine.schedule['Môn mới'], 'Môn mới') in rows
+    assert len(rows) == len(data)
+
+
+def test_overlay_copies_only_touched_rows(enrollment_frame):
+    engine = make_engine(enrollment_frame)
+    sid = sorted(engine.student_subjects)[0]
+    subj = next(s for s in engine.subjects if s not in engine.student_subjects[sid])
+    engine.apply_changes(added=[(sid, subj)])
+    touched = set(engine.student_subjects[sid])
+    assert set(engine.conflict_graph._changed) <= touched
+    assert set(engine.student_subjects._changed) == {sid}
+    assert set(engine.subject_students._changed) == {subj}
+
+
+def test_bound_clique_stays_valid(enrollment_frame):
+    engine = make_engine(enrollment_frame)
+    students = sorted(engine.student_subjects)
+    for round_ in range(4):
+        # Huỷ các đăng ký nối 2 môn đầu của clique (làm mất cạnh của clique), rồi thêm vài đăng ký
+        a, b = engine.bound_clique[:2]
+        removed = [(sid, a) for sid in engine.subject_students[a] & engine.subject_students[b]]
+        added = [(sid, engine.subjects[(i + round_) % len(engine.subjects)]) for i, sid in enumerate(students[:20])]
+        engine.apply_changes(added=added, removed=removed)
+        clique = engine.bound_clique
+        assert all(v in engine.conflict_graph[u] for u in clique for v in clique if u != v)
+        assert len(clique) <= engine.bound <= max(engine.schedule.values())
@@ -0,0 +1,52 @@
+import pytest
+
+from scheduler_engine import (build_model, conflict_report, conflicting_edges, dsatur, find_conflicts,
+                              slot_loads)
+
+
+@pytest.fixture
+def graph(enrollment_frame):
+    subjects, _, subject_students, conflict_graph, _ = build_model(enrollment_frame).graph()
+    sizes = {s: len(subject_students[s]) for s in subjects}
+    return subjects, conflict_graph, sizes
+
+
+def test_dsatur_schedule(graph):
+    subjects, conflict_graph, _ = graph
+    schedule = dsatur(subjects, conflict_graph)
+    assert set(schedule) == set(subjects) and min(schedule.values()) == 1
+    assert conflicting_edges(conflict_graph, schedule) == []
+
+
+def test_dsatur_schedule_with_capacity(graph):
+    subjects, conflict_graph, sizes = graph
+    capacity = max(sizes.values()) + 10
+    schedule = dsatur(subjects, conflict_graph, sizes=sizes, capacity=capacity)
+    assert conflicting_edges(conflict_graph, schedule) == []
+    assert max(slot_loads(schedule, sizes).values()) <= capacity
+    assert max(schedule.values()) >= -(-sum(sizes.values()) // capacity)
+
+    with pytest.raises(ValueError):
+        dsatur(subjects, conflict_graph, sizes=sizes, capacity=max(sizes.values()) - 1)
+
+
+
+
+def test_same_slot_edges(enrollment_frame):
+    model = build_model(enrollment_frame)
+    subjects, _, _, conflict_graph, _ = model.graph()
+    schedule = {s: i % 3 for i, s in enumerate(subjects)}
+    expected = sorted((a, b) for a in subjects for b in conflict_graph[a]
+                      if a < b and schedule[a] == schedule[b])
+    assert sorted(model.same_slot_edges(schedule)) == expected
+
+
+def test_conflict_report_counts_all(enrollment_frame):
+    model = build_model(enrollment_frame)
+    subjects, student_subjects, subject_students, conflict_graph, _ = model.graph()
+    schedule = {s: i % 3 for i, s in enumerate(subjects)}
+    everyone = find_conflicts(student_subjects, subject_students, conflict_graph, schedule)
+    found, total = conflict_report(student_subjects, subject_students, conflict_graph, schedule, limit=5)
+    assert total == len(everyone) > 5 and found == everyone[:5]
+    assert conflict_report(student_subjects, subject_students, conflict_graph,
+                           dsatur(subjects, conflict_graph)) == ([], 0)
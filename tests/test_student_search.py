@@ -0,0 +1,46 @@
+import pytest
+
+from student_search import SearchCancelled, StudentSearchIndex, fold
+
+NAMES = {
+    '20210001': 'Nguyễn Văn An',
+    '20210002': 'Trần Thị Bình',
+    '20210003': 'Đặng Đức Anh',
+    '20210104': 'Lê Nguyên',
+}
+
+
+def test_fold_removes_diacritics():
+    assert fold('Nguyễn Đức ANH') == 'nguyen duc anh'
+    assert fold('Trần Thị Bình') == 'tran thi binh'
+    assert fold(20210001) == '20210001'
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('nguyen', ['20210001', '20210104']),
+    ('Nguyễn', ['20210001', '20210104']),
+    ('duc anh', ['20210003']),
+    ('ĐẶNG', ['20210003']),
+    ('2021000', ['20210001', '20210002', '20210003']),
+    ('an', ['20210001', '20210002', '20210003']),  # từ khoá < 3 ký tự: duyệt tuần tự
+    ('xyz', []),
+    ('0001nguyen', []),                 # không khớp qua ranh giới MSSV / họ tên
+])
+def test_trigram_search(query, expected):
+    assert StudentSearchIndex(NAMES).search(query) == expected
+
+
+def test_search_matches_linear_scan():
+    names = {str(20200000 + i): f"{['Nguyễn', 'Trần', 'Lê'][i % 3]} Văn {i}" for i in range(300)}
+    index = StudentSearchIndex(names)
+    for query in ('van 1', 'tran', 'le van 29', '2020012', 'guy'):
+        q = fold(query)
+        assert index.search(query) == [sid for sid, name in names.items()
+                                       if q in fold(sid) + '\x00' + fold(name)]
+
+
+def test_empty_query_and_cancel():
+    index = StudentSearchIndex(NAMES)
+    assert index.search('  '.strip()) is None
+    with pytest.raises(SearchCancelled):
+        index.search('an', is_cancelled=lambda: True)
@@ -0,0 +1,63 @@
+import csv
+import os
+
+import pytest
+from openpyxl import load_workbook
+
+from table_writers import HAS_PARQUET, table_path, write_tables
+
+TABLES = [
+    ('LichThi', ['Ca', 'Môn', 'Số SV'], [(1, 'Toán', 120), (2, 'Lý <A&B>', 80)]),
+    ('LichSinhVien', ['MSSV', 'Họ tên', 'Ca', 'Môn'],
+     [('001', 'Nguyễn An', 1, 'Toán'), ('002', 'Trần\x01 Bình', None, 'Lý')]),
+]
+
+
+def failing_rows():
+    yield ('001', 'Nguyễn An', 1, 'Toán')
+    raise RuntimeError("lỗi giữa chừng")
+
+
+def leftovers(folder):
+    return [name for name in os.listdir(folder) if name.endswith('.tmp')]
+
+
+def test_xlsx_round_trip(tmp_path):
+    path = str(tmp_path / 'LichThi.xlsx')
+    assert write_tables(path, TABLES) == [path]
+    wb = load_workbook(path, read_only=True)
+    assert wb.sheetnames == ['LichThi', 'LichSinhVien']
+    rows = [list(r) for r in wb['LichThi'].iter_rows(values_only=True)]
+    assert rows == [['Ca', 'Môn', 'Số SV'], [1, 'Toán', 120], [2, 'Lý <A&B>', 80]]
+    rows = [list(r) for r in wb['LichSinhVien'].iter_rows(values_only=True)]
+    assert rows[2] == ['002', 'Trần Bình', None, 'Lý']  # ký tự điều khiển bị bỏ
+    wb.close()
+    assert not leftovers(tmp_path)
+
+
+def test_csv_round_trip(tmp_path):
+    path = str(tmp_path / 'LichThi.csv')
+    paths = write_tables(path, TABLES)
+    assert paths == [table_path(path, 'LichThi'), table_path(path, 'LichSinhVien')]
+    with open(paths[0], encoding='utf-8-sig', newline='') as f:
+        assert list(csv.reader(f)) == [['Ca', 'Môn', 'Số SV'], ['1', 'Toán', '120'], ['2', 'Lý <A&B>', '80']]
+    assert not leftovers(tmp_path)
+
+
+@pytest.mark.parametrize('ext', ['.xlsx', '.csv'] + (['.parquet'] if HAS_PARQUET else []))
+def test_failed_write_leaves_no_partial_file(tmp_path, ext):
+    path = str(tmp_path / f'LichThi{ext}')
+    target = path if ext == '.xlsx' else table_path(path, 'LichSinhVien')
+    with open(target, 'w') as f:
+        f.write('bản cũ')
+
+    with pytest.raises(RuntimeError):
+        write_tables(path, [('LichSinhVien', ['MSSV', 'Họ tên', 'Ca', 'Môn'], failing_rows())])
+    assert not leftovers(tmp_path)
+    with open(target) as f:
+        assert f.read() == 'bản cũ'
+
+
+def test_unknown_extension(tmp_path):
+    with pytest.raises(ValueError):
+        write_tables(str(tmp_path / 'LichThi.txt'), TABLES)
@@ -0,0 +1,13 @@
+from virtual_tree import natural_key
+
+
+def test_natural_key_orders_numbers_by_value():
+    slots = ['Ca 10', 'Ca 2', 'Ca 1', 'Ca 11', 'Ca 9']
+    assert sorted(slots, key=natural_key) == ['Ca 1', 'Ca 2', 'Ca 9', 'Ca 10', 'Ca 11']
+    assert sorted(['123', '45', '9'], key=natural_key) == ['9', '45', '123']
+
+
+def test_natural_key_mixed_values():
+    values = ['Nguyễn B', 'An', 'Ca 3', 7, '']
+    assert sorted(values, key=natural_key) == ['', 7, 'An', 'Ca 3', 'Nguyễn B']
+    assert natural_key('Ca 02') == natural_key('Ca 2')
@@ -0,0 +1,68 @@
+import zipfile
+
+import pandas as pd
+import pytest
+
+from scheduler_engine import read_enrollments, read_sheet
+from xlsx_reader import iter_sheet_rows, list_sheets, read_sheet_streaming, read_shared_strings
+
+
+def test_blank_rows_keep_their_index(workbook):
+    with zipfile.ZipFile(workbook) as zf:
+        member = dict(list_sheets(zf))['Ly']
+        rows = list(iter_sheet_rows(zf, member, read_shared_strings(zf)))
+    assert rows[:2] == [[], []]
+    assert rows[2] == ['Vật lý']
+    assert rows[4][1:] == ['MSSV', 'Họ tên']
+
+
+def test_streaming_matches_pandas_per_sheet(workbook):
+    excel = pd.ExcelFile(workbook, engine='openpyxl')
+    with zipfile.ZipFile(workbook) as zf:
+        shared = read_shared_strings(zf)
+        for sheet, member in list_sheets(zf):
+            expected = read_sheet(excel, sheet)
+            got = read_sheet_streaming(zf, member, sheet, shared)
+            if expected is None:
+                assert got is None, sheet
+            else:
+                assert got.values.tolist() == expected.values.tolist(), sheet
+
+
+def test_subject_names(workbook):
+    data, n_sheets = read_enrollments(workbook, log=lambda msg: None)
+    assert n_sheets == 5
+    # Tên môn chỉ lấy ở ô A1: sheet 'Ly' có dòng đầu trống nên dùng tên sheet (như pandas)
+    assert sorted(set(data['ChuongTrinh'])) == ['Hoa', 'Ly', 'Toán cao cấp']
+    assert '20210009' not in set(data['MaSV'])
+
+
+def frame(workbook, **kw):
+    data, n_sheets = read_enrollments(workbook, log=lambda msg: None, **kw)
+    rows = sorted(map(tuple, data[['MaSV', 'HoTen', 'ChuongTrinh']].astype(str).values.tolist()))
+    return rows, n_sheets
+
+
+def test_streaming_matches_pandas_workbook(workbook):
+    assert frame(workbook, streaming=True) == frame(workbook, streaming=False)
+
+
+def test_parallel_matches_sequential(workbook):
+    sheet_rows = {}
+    assert frame(workbook, workers=2, sheet_rows=sheet_rows) == frame(workbook, workers=1)
+    assert sheet_rows == {'Toan': 3, 'Ly': 2, 'Hoa': 1}
+
+
+def test_parallel_load_can_be_cancelled(workbook):
+    class Cancelled(BaseException):
+        pass
+
+    done = []
+
+    def progress(n, total):
+        done.append(n)
+        raise Cancelled()
+
+    with pytest.raises(Cancelled):
+        read_enrollments(workbook, log=lambda msg: None, workers=2, progress=progress)
+    assert done == [1]
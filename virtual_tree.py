@@ -0,0 +1,155 @@
+"""Treeview ảo: chỉ tạo các dòng đang nhìn thấy (cộng 1 ít dòng đệm)
+
+Toàn bộ dữ liệu nằm trong list tuple ở bộ nhớ; Treeview chỉ giữ 1 nhóm item cố định
+và được gán lại giá trị khi cuộn, nên số dòng lớn cỡ nào thì cuộn/sắp xếp/lọc vẫn nhanh.
+"""
+import re
+from tkinter import ttk
+
+_DIGITS = re.compile(r'(\d+)')
+
+
+def natural_key(value):
+    """Khoá sắp xếp tự nhiên: phần số so theo giá trị ("Ca 2" < "Ca 10")"""
+    parts = _DIGITS.split(str(value))
+    parts[1::2] = map(int, parts[1::2])
+    return parts
+
+
+class VirtualTreeview(ttk.Frame):
+    def __init__(self, master, columns, buffer=5, **tree_kw):
+        super().__init__(master)
+        self.columns = tuple(columns)
+        self.buffer = buffer
+
+        self.tree = ttk.Treeview(self, columns=self.columns, show='headings', **tree_kw)
+        self.scrollbar = ttk.Scrollbar(self, orient='vertical', command=self._on_scrollbar)
+        self.tree.pack(side='left', fill='both', expand=True)
+        self.scrollbar.pack(side='right', fill='y')
+
+        self._rows = []       # toàn bộ dữ liệu
+        self._view = []       # chỉ số các dòng đang hiển thị (sau lọc + sắp xếp)
+        self._filter = None   # None = không lọc
+        self._sort_col = None
+        self._sort_desc = False
+        self._sort_keys = {}  # cột -> khoá sắp xếp tự nhiên của từng dòng (tính 1 lần)
+        self._offset = 0      # dòng đầu tiên đang nhìn thấy
+        self._pool = []       # các item Treeview được dùng lại
+        self._visible = 1
+
+        for col in self.columns:
+            self.tree.heading(col, command=lambda c=col: self.sort_by(c))
+
+        self.tree.bind('<Configure>', self._on_resize)
+        self.tree.bind('<MouseWheel>', self._on_wheel)
+        self.tree.bind('<Button-4>', lambda e: self.scroll(-3))
+        self.tree.bind('<Button-5>', lambda e: self.scroll(3))
+        self.tree.bind('<Up>', lambda e: self._on_key(-1))
+        self.tree.bind('<Down>', lambda e: self._on_key(1))
+        self.tree.bind('<Prior>', lambda e: self._on_key(-self._visible))
+        self.tree.bind('<Next>', lambda e: self._on_key(self._visible))
+
+    # --- Dữ liệu ---
+
+    def set_rows(self, rows):
+        """Thay toàn bộ dữ liệu (list tuple theo thứ tự columns), giữ cách sắp xếp, bỏ lọc"""
+        self._rows = rows
+        self._sort_keys = {}
+        self._filter = None
+        self._rebuild_view()
+
+    def set_filter(self, indices):
+        """Chỉ hiển thị các dòng có chỉ số trong indices (None = hiện tất cả)"""
+        self._filter = None if indices is None else list(indices)
+        self._rebuild_view()
+
+    def sort_by(self, column):
+        """Sắp xếp theo cột; bấm lại cùng cột thì đảo chiều"""
+        if self._sort_col == column:
+            self._sort_desc = not self._sort_desc
+        else:
+            self._sort_col = column
+            self._sort_desc = False
+        self._rebuild_view()
+
+    def __len__(self):
+        return len(self._view)
+
+    def row_count(self):
+        return len(self._rows)
+
+    def _rebuild_view(self):
+        view = list(range(len(self._rows))) if self._filter is None else self._filter
+        if self._sort_col is not None:
+            keys = self._sort_keys.get(self._sort_col)
+            if keys is None:
+                col = self.columns.index(self._sort_col)
+                keys = self._sort_keys[self._sort_col] = [natural_key(row[col]) for row in self._rows]
+            view = sorted(view, key=keys.__getitem__, reverse=self._sort_desc)
+        self._view = view
+        self._offset = 0
+        self.refresh()
+
+    # --- Hiển thị ---
+
+    def _row_height(self):
+        style = ttk.Style()
+        return int(style.lookup(self.tree.cget('style') or 'Treeview', 'rowheight') or 20)
+
+    def _on_resize(self, event=None):
+        visible = max(1, self.tree.winfo_height() // self._row_height())
+        if visible != self._visible:
+            self._visible = visible
+            self.refresh()
+
+    def refresh(self):
+        """Gán lại giá trị cho nhóm item từ vị trí _offset"""
+        total = len(self._view)
+        self._offset = max(0, min(self._offset, total - self._visible))
+        need = min(total - self._offset, self._visible + self.buffer)
+
+        while len(self._pool) < need:
+            self._pool.append(self.tree.insert('', 'end'))
+        for i, iid in enumerate(self._pool):
+            if i < need:
+                self.tree.move(iid, '', i)  # gắn lại nếu trước đó bị detach
+                self.tree.item(iid, values=self._rows[self._view[self._offset + i]])
+            else:
+                self.tree.detach(iid)
+
+        if total:
+            self.scrollbar.set(self._offset / total, min(1.0, (self._offset + self._visible) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def scroll(self, delta):
+        self._offset += delta
+        self.refresh()
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == 'moveto':
+            self._offset = int(float(value) * len(self._view))
+        elif action == 'scroll':
+            step = self._visible if unit == 'pages' else 1
+            self._offset += int(value) * step
+        self.refresh()
+
+    def _on_wheel(self, event):
+        self.scroll(-3 if event.delta > 0 else 3)
+        return 'break'
+
+    def _on_key(self, delta):
+        """Di chuyển dòng chọn; khi chạm mép thì cuộn dữ liệu"""
+        sel = self.tree.selection()
+        pos = self.tree.index(sel[0]) if sel else 0
+        target = pos + delta
+        if 0 <= target < min(self._visible, len(self._view) - self._offset):
+            self.tree.selection_set(self._pool[target])
+        else:
+            self.scroll(delta)
+        return 'break'
+
+    def selected_rows(self):
+        """Trả về dữ liệu gốc của các dòng đang chọn"""
+        return [self._rows[self._view[self._offset + self.tree.index(iid)]]
+                for iid in self.tree.selection()]
@@ -0,0 +1,36 @@
+"""Nạp trước các thư viện nặng ở thread nền sau khi cửa sổ đã hiện
+
+numpy / pandas chỉ được import ở bước tải file, networkx / matplotlib ở lần vẽ đồ thị đầu tiên,
+nên cửa sổ mở ra ngay. WarmUp import sẵn chúng ở thread nền để lần bấm đầu tiên không
+phải chờ; thời gian import từng module được ghi vào run_stats.STARTUP.
+"""
+import threading
+
+from run_stats import timed_import
+
+
+HEAVY_MODULES = ('numpy', 'pandas', 'networkx', 'matplotlib.figure', 'matplotlib.backends.backend_agg')
+
+
+class WarmUp:
+    def __init__(self, modules=HEAVY_MODULES):
+        self.modules = modules
+        self.errors = {}  # module -> lỗi import (thư viện tuỳ chọn chưa cài)
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='warmup', daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        for name in self.modules:
+            try:
+                timed_import(name)
+            except Exception as e:
+                # Bỏ qua: bước cần thư viện đó sẽ tự báo lỗi khi chạy
+                self.errors[name] = str(e)
+
+    @property
+    def done(self):
+        return self._thread is not None and not self._thread.is_alive()
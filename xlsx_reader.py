@@ -0,0 +1,309 @@
+"""Đọc file đăng ký .xlsx theo kiểu streaming, trực tiếp từ XML trong file zip
+
+File .xlsx là 1 file zip: xl/sharedStrings.xml chứa bảng chuỗi dùng chung,
+xl/worksheets/sheetN.xml chứa các dòng. Mỗi sheet được đọc từng dòng bằng iterparse:
+chỉ dò header trong vài dòng đầu, sheet không có header thì bỏ qua ngay mà không
+đọc hết; với sheet hợp lệ chỉ giữ cột MSSV và họ tên.
+"""
+import os
+import posixpath
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, wait
+from xml.etree.ElementTree import iterparse
+
+
+# Tăng khi thay đổi cách đọc/làm sạch dữ liệu để vô hiệu hoá cache cũ
+PARSER_VERSION = 2
+
+REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+HEADER_KEYS = ('mã sv', 'mssv', 'ma sv')
+HEADER_SCAN_ROWS = 5
+PARALLEL_MIN_SHEETS = 8
+CANCEL_POLL_SECONDS = 0.1
+MASV_PATTERN = re.compile(r'\d+')
+
+
+def is_masv_col(text):
+    return any(key in text for key in HEADER_KEYS)
+
+
+def find_columns(header):
+    """Tìm vị trí cột Mã SV và Họ tên trong dòng header, trả về (masv_col, hoten_col)"""
+    masv_col = None
+    hoten_col = None
+    for i, col in enumerate(header):
+        col_str = str(col).lower().strip()
+        if is_masv_col(col_str):
+            masv_col = i
+        if 'họ' in col_str and 'tên' in col_str:
+            hoten_col = i
+        elif 'tên' in col_str and hoten_col is None:
+            hoten_col = i
+    return masv_col, hoten_col
+
+
+def cell_text(value):
+    """Chuyển giá trị ô sang chuỗi giống pandas dtype=str (số nguyên không có '.0')"""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def parse_rows(rows, sheet):
+    """Lấy (MaSV, HoTen, tên môn) từ iterator các dòng của 1 sheet, None nếu sheet không hợp lệ"""
+    head = []
+    header_row = None
+    for idx, row in enumerate(rows):
+        row = [cell_text(v) for v in row]
+        head.append(row)
+        if is_masv_col(' '.join(row).lower()):
+            header_row = idx
+            break
+        if idx + 1 >= HEADER_SCAN_ROWS:
+            break
+
+    if header_row is None:
+        return None
+
+    subject_name = sheet
+    if header_row > 0 and head[0]:
+        first_cell = head[0][0].strip()
+        if first_cell:
+            subject_name = first_cell
+
+    masv_col, hoten_col = find_columns(head[header_row])
+    if masv_col is None:
+        return None
+
+    ids = []
+    names = []
+    for row in rows:
+        if masv_col >= len(row):
+            continue
+        sid = cell_text(row[masv_col]).strip()
+        if not MASV_PATTERN.fullmatch(sid):
+            continue
+        ids.append(sid)
+        if hoten_col is None:
+            names.append('N/A')
+        else:
+            names.append(cell_text(row[hoten_col]) if hoten_col < len(row) else '')
+
+    if not ids:
+        return None
+    return ids, names, subject_name
+
+
+def _local(tag):
+    """Bỏ namespace khỏi tên thẻ XML"""
+    return tag.rsplit('}', 1)[-1]
+
+
+_column_cache = {}
+
+
+def _column_index(ref):
+    """'AB12' -> 27 (chỉ số cột 0-based)"""
+    letters = ref.rstrip('0123456789')
+    col = _column_cache.get(letters)
+    if col is None:
+        col = 0
+        for ch in letters.upper():
+            col = col * 26 + (ord(ch) - 64)
+        col -= 1
+        _column_cache[letters] = col
+    return col
+
+
+def _inline_text(elem):
+    return ''.join(t.text or '' for t in elem.iter() if t.tag.endswith('}t') or t.tag == 't')
+
+
+def read_shared_strings(zf):
+    """Đọc bảng chuỗi dùng chung (xl/sharedStrings.xml)"""
+    if 'xl/sharedStrings.xml' not in zf.namelist():
+        return []
+    shared = []
+    with zf.open('xl/sharedStrings.xml') as f:
+        for _, elem in iterparse(f):
+            if _local(elem.tag) == 'si':
+                shared.append(_inline_text(elem))
+                elem.clear()
+    return shared
+
+
+def list_sheets(zf):
+    """Trả về list (tên sheet, đường dẫn XML trong zip) theo thứ tự trong workbook"""
+    with zf.open('xl/_rels/workbook.xml.rels') as f:
+        targets = {}
+        for _, elem in iterparse(f):
+            if _local(elem.tag) == 'Relationship':
+                target = elem.get('Target')
+                if target.startswith('/'):
+                    target = target[1:]
+                else:
+                    target = posixpath.normpath(posixpath.join('xl', target))
+                targets[elem.get('Id')] = target
+
+    sheets = []
+    with zf.open('xl/workbook.xml') as f:
+        for _, elem in iterparse(f):
+            if _local(elem.tag) == 'sheet':
+                sheets.append((elem.get('name'), targets.get(elem.get(REL_NS + 'id'))))
+    return sheets
+
+
+def iter_sheet_rows(zf, member, shared):
+    """Sinh từng dòng (list giá trị) của 1 sheet, ô trống là None
+
+    Dòng trống không có trong XML được sinh ra là [] theo thuộc tính r của <row>, nên chỉ số
+    dòng khớp với pandas (header=None) - việc dò header trong HEADER_SCAN_ROWS dòng đầu và
+    lấy tên môn ở ô đầu tiên cho cùng kết quả.
+    """
+    with zf.open(member) as f:
+        row = []
+        next_row = 1  # số thứ tự (1-based) của dòng sẽ sinh tiếp theo
+        for _, elem in iterparse(f):
+            tag = elem.tag
+            # So sánh đuôi thẻ thay cho tách namespace - vòng này chạy cho mọi ô
+            if tag.endswith('}c') or tag == 'c':
+                ref = elem.get('r')
+                col = _column_index(ref) if ref else len(row)
+                kind = elem.get('t')
+                if kind == 'inlineStr':
+                    value = _inline_text(elem)
+                else:
+                    value = None
+                    for child in elem:
+                        if child.tag.endswith('}v') or child.tag == 'v':
+                            value = child.text
+                            break
+                    if value is not None:
+                        if kind == 's':
+                            value = shared[int(value)]
+                        elif kind is None or kind == 'n':
+                            value = float(value)
+                if col >= len(row):
+                    row.extend([None] * (col + 1 - len(row)))
+                row[col] = value
+                elem.clear()
+            elif tag.endswith('}row') or tag == 'row':
+                ref = elem.get('r')
+                if ref:
+                    for _ in range(int(ref) - next_row):
+                        yield []
+                    next_row = int(ref)
+                yield row
+                next_row += 1
+                row = []
+                elem.clear()
+
+
+def read_sheet_streaming(zf, member, sheet, shared):
+    """Đọc 1 sheet theo streaming, trả về DataFrame (MaSV, HoTen, ChuongTrinh) hoặc None"""
+    return _to_frame(parse_rows(iter_sheet_rows(zf, member, shared), sheet))
+
+
+def _to_frame(parsed):
+    if parsed is None:
+        return None
+    import pandas as pd
+
+    ids, names, subject_name = parsed
+    return pd.DataFrame({'MaSV': ids, 'HoTen': names, 'ChuongTrinh': subject_name})
+
+
+def read_enrollments_streaming(path, log=print, progress=None, sheet_rows=None):
+    """Đọc toàn bộ workbook theo streaming, trả về (list DataFrame từng sheet, số sheet)
+
+    progress(số sheet đã đọc, tổng số sheet) được gọi sau mỗi sheet nếu có.
+    sheet_rows: dict nhận {sheet: số dòng đọc được} nếu có.
+    """
+    with zipfile.ZipFile(path) as zf:
+        shared = read_shared_strings(zf)
+        sheets = list_sheets(zf)
+        all_dfs = []
+        for done, (sheet, member) in enumerate(sheets, 1):
+            try:
+                df_clean = read_sheet_streaming(zf, member, sheet, shared)
+                if df_clean is not None:
+                    all_dfs.append(df_clean)
+                    log(f"✓ Đọc thành công sheet '{sheet}': {len(df_clean)} sinh viên")
+                    if sheet_rows is not None:
+                        sheet_rows[sheet] = len(df_clean)
+            except Exception as e:
+                log(f"Lỗi đọc sheet {sheet}: {str(e)}")
+            if progress:
+                progress(done, len(sheets))
+        return all_dfs, len(sheets)
+
+
+# --- Đọc song song nhiều sheet bằng process pool ---
+# Mỗi tiến trình con mở file zip và đọc bảng chuỗi dùng chung đúng 1 lần (initializer),
+# sau đó chỉ trả về các mảng gọn (MaSV, HoTen, tên môn) cho tiến trình chính ghép lại.
+
+_worker_zip = None
+_worker_shared = None
+
+
+def _init_worker(path):
+    global _worker_zip, _worker_shared
+    _worker_zip = zipfile.ZipFile(path)
+    _worker_shared = read_shared_strings(_worker_zip)
+
+
+def _parse_sheet_job(job):
+    """Chạy trong tiến trình con: đọc 1 sheet, trả về (sheet, parsed, lỗi)"""
+    sheet, member = job
+    try:
+        return sheet, parse_rows(iter_sheet_rows(_worker_zip, member, _worker_shared), sheet), None
+    except Exception as e:
+        return sheet, None, str(e)
+
+
+def read_enrollments_parallel(path, workers=None, log=print, progress=None, sheet_rows=None, check=None):
+    """Như read_enrollments_streaming nhưng chia các sheet cho nhiều tiến trình
+
+    Workbook ít sheet (dưới PARALLEL_MIN_SHEETS) hoặc workers <= 1 thì đọc tuần tự,
+    vì chi phí khởi động tiến trình lớn hơn phần tiết kiệm được.
+    check(): gọi định kỳ trong lúc chờ tiến trình con, ném ngoại lệ để huỷ (vd Job.check).
+    Khi bị huỷ (progress hoặc check ném ngoại lệ) các sheet chưa đọc bị bỏ, không chờ đọc hết.
+    """
+    workers = workers or os.cpu_count() or 1
+    with zipfile.ZipFile(path) as zf:
+        sheets = list_sheets(zf)
+    if workers <= 1 or len(sheets) < PARALLEL_MIN_SHEETS:
+        return read_enrollments_streaming(path, log=log, progress=progress, sheet_rows=sheet_rows)
+
+    workers = min(workers, len(sheets))
+    all_dfs = []
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(path,))
+    try:
+        # Gửi từng sheet riêng (không dùng pool.map) để huỷ được các sheet chưa chạy
+        futures = [pool.submit(_parse_sheet_job, job) for job in sheets]
+        for done, future in enumerate(futures, 1):
+            while not wait([future], timeout=CANCEL_POLL_SECONDS).done:
+                if check:
+                    check()
+            sheet, parsed, error = future.result()
+            if error is not None:
+                # Sheet lỗi thì bỏ qua, không dừng cả quá trình
+                log(f"Lỗi đọc sheet {sheet}: {error}")
+            else:
+                df_clean = _to_frame(parsed)
+                if df_clean is not None:
+                    all_dfs.append(df_clean)
+                    log(f"✓ Đọc thành công sheet '{sheet}': {len(df_clean)} sinh viên")
+                    if sheet_rows is not None:
+                        sheet_rows[sheet] = len(df_clean)
+            if progress:
+                progress(done, len(sheets))
+    except BaseException:
+        # Huỷ / lỗi: bỏ các sheet đang chờ và trả quyền ngay, tiến trình con tự thoát sau sheet đang đọc
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    pool.shutdown()
+    return all_dfs, len(sheets)